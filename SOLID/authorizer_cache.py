@@ -0,0 +1,113 @@
+"""This module caches successful verifications so repeat checkouts skip the provider"""
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Callable, Optional, Union
+
+from SOLID.dependency_inversion_after import Authorizer
+from SOLID.interface_segregation_after import SMSAuthorizer
+
+
+class VerificationCache:
+    """Remembers successful verifications per (principal, code) for ttl seconds
+
+    Holds at most maxsize entries and evicts the least recently used one first.
+    """
+
+    def __init__(
+        self,
+        ttl: float = 300.0,
+        maxsize: int = 10_000,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        if ttl <= 0 or maxsize < 1:
+            raise ValueError("ttl and maxsize must be positive")
+        self.ttl = ttl
+        self.maxsize = maxsize
+        self.clock = clock
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self._expiry: OrderedDict[tuple[str, str], float] = OrderedDict()
+        self._codes: dict[str, set[str]] = {}
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._expiry)
+
+    def _forget(self, key: tuple[str, str]) -> None:
+        """Removes one entry and its principal index entry"""
+        del self._expiry[key]
+        principal, code = key
+        codes = self._codes[principal]
+        codes.discard(code)
+        if not codes:
+            del self._codes[principal]
+
+    def get(self, principal: str, code: str) -> bool:
+        """Returns true if the code was verified for principal within the ttl"""
+        key = (principal, code)
+        with self._lock:
+            expires = self._expiry.get(key)
+            if expires is not None and expires <= self.clock():
+                self._forget(key)
+                self.expirations += 1
+                expires = None
+            if expires is None:
+                self.misses += 1
+                return False
+            self._expiry.move_to_end(key)
+            self.hits += 1
+            return True
+
+    def add(self, principal: str, code: str) -> None:
+        """Records a successful verification"""
+        key = (principal, code)
+        with self._lock:
+            if key in self._expiry:
+                self._expiry.move_to_end(key)
+            elif len(self._expiry) >= self.maxsize:
+                self._forget(next(iter(self._expiry)))
+                self.evictions += 1
+            self._expiry[key] = self.clock() + self.ttl
+            self._codes.setdefault(principal, set()).add(code)
+
+    def invalidate(self, principal: str, code: Optional[str] = None) -> None:
+        """Forgets one code of a principal, or all of them when code is None"""
+        with self._lock:
+            codes = [code] if code is not None else list(self._codes.get(principal, ()))
+            for each in codes:
+                if (principal, each) in self._expiry:
+                    self._forget((principal, each))
+
+    def clear(self) -> None:
+        """Forgets every verification"""
+        with self._lock:
+            self._expiry.clear()
+            self._codes.clear()
+
+
+@dataclass
+class CachingAuthorizer(Authorizer):
+    """Authorize through another authorizer, skipping codes it recently accepted"""
+
+    authorizer: Union[Authorizer, SMSAuthorizer]
+    cache: VerificationCache
+    principal: str
+    authorized: bool = field(default=False)
+
+    def verify_code(self, code: str) -> None:
+        """Verifys the provided code, asking the wrapped authorizer on a cache miss"""
+        if self.cache.get(self.principal, code):
+            self.authorized = True
+            return
+        self.authorizer.verify_code(code)
+        self.authorized = self.authorizer.is_authorized()
+        if self.authorized:
+            self.cache.add(self.principal, code)
+
+    def is_authorized(self) -> bool:
+        """Returns true if the caller is authorized"""
+        return self.authorized
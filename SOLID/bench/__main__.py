@@ -0,0 +1,56 @@
+"""Runs the benchmark suite
+
+    python -m SOLID.bench --output results.json
+    python -m SOLID.bench --compare baseline.json --threshold 0.1
+
+Exits with status 1 when compare finds a regression.
+"""
+import argparse
+import json
+import platform
+import sys
+from typing import Optional, Sequence
+
+from SOLID.bench import suite
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    """Runs the suite, saves the results and compares them to a baseline"""
+    parser = argparse.ArgumentParser(prog="python -m SOLID.bench", description=__doc__)
+    parser.add_argument("-o", "--output", help="write the results to this JSON file")
+    parser.add_argument("--compare", metavar="BASELINE", help="JSON results to compare against")
+    parser.add_argument(
+        "--threshold", type=float, default=0.1, help="allowed slowdown, 0.1 is 10%% (default)"
+    )
+    parser.add_argument(
+        "--sizes", type=int, nargs="+", default=suite.CART_SIZES, help="cart sizes to time"
+    )
+    parser.add_argument(
+        "--min-time", type=float, default=0.2, help="seconds to spend on each benchmark"
+    )
+    parser.add_argument("--select", help="only run benchmarks whose name contains this")
+    args = parser.parse_args(argv)
+
+    results = suite.run(args.sizes, args.min_time, args.select)
+    suite.report(results)
+    if args.output:
+        with open(args.output, "w") as output:
+            json.dump({"python": platform.python_version(), "results": results}, output, indent=2)
+
+    if args.compare:
+        with open(args.compare) as baseline_file:
+            baseline = json.load(baseline_file)["results"]
+        regressions = suite.compare(results, baseline, args.threshold)
+        for regression in regressions:
+            print(
+                f"REGRESSION {regression.name}: {regression.baseline:.1f} ns -> "
+                f"{regression.current:.1f} ns ({regression.ratio:.2f}x)",
+                file=sys.stderr,
+            )
+        if regressions:
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,48 @@
+"""Compares bulk Order.add_items against one add_item call per line
+
+Run with: python -m SOLID.bench.add_items
+"""
+from array import array
+from timeit import repeat
+from typing import Callable
+
+from SOLID.compact_order import CompactOrder
+from SOLID.order import Order
+
+
+def _best(func: Callable[[], object], runs: int) -> float:
+    """Returns the fastest of several timed runs of func in seconds"""
+    return min(repeat(func, number=1, repeat=runs))
+
+
+def run(lines: int = 100_000, runs: int = 5) -> dict[str, float]:
+    """Times filling an order with the given number of lines each way"""
+    names = [f"Item {line % 100}" for line in range(lines)]
+    quantities = array("q", [line % 7 + 1 for line in range(lines)])
+    prices = array("q", [line % 1000 for line in range(lines)])
+    rows = list(zip(names, quantities, prices))
+
+    def per_line(order_class: type) -> Callable[[], object]:
+        def fill() -> None:
+            order = order_class()
+            for name, quantity, price in rows:
+                order.add_item(name, quantity, price)
+
+        return fill
+
+    return {
+        "order.add_item": _best(per_line(Order), runs),
+        "order.add_items[tuples]": _best(lambda: Order().add_items(rows), runs),
+        "order.add_items[columns]": _best(
+            lambda: Order().add_items(names, quantities, prices), runs
+        ),
+        "compact.add_item": _best(per_line(CompactOrder), runs),
+        "compact.add_items[columns]": _best(
+            lambda: CompactOrder().add_items(names, quantities, prices), runs
+        ),
+    }
+
+
+if __name__ == "__main__":
+    for name, seconds in run().items():
+        print(f"{name:<28} {seconds * 1000:8.2f} ms")
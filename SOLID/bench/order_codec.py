@@ -0,0 +1,44 @@
+"""Compares the binary order format against JSON built from the three lists
+
+Run with: python -m SOLID.bench.order_codec
+"""
+import json
+from timeit import repeat
+
+from SOLID.order import Order
+from SOLID.order_codec import from_buffer, to_bytes
+
+
+def run(lines: int = 10_000, runs: int = 5) -> dict[str, float]:
+    """Times encoding an order and totaling it after decoding, each way"""
+    order = Order()
+    order.add_items(
+        [f"Item {line % 100}" for line in range(lines)], [1] * lines, list(range(lines))
+    )
+    as_json = json.dumps(
+        {"items": order.items, "quantites": order.quantites, "prices": order.prices}
+    )
+    as_bytes = to_bytes(order)
+
+    def json_total() -> int:
+        decoded = json.loads(as_json)
+        return Order(decoded["items"], decoded["quantites"], decoded["prices"]).total_price()
+
+    def best(func) -> float:
+        return min(repeat(func, number=1, repeat=runs))
+
+    return {
+        "json.encode": best(
+            lambda: json.dumps(
+                {"items": order.items, "quantites": order.quantites, "prices": order.prices}
+            )
+        ),
+        "binary.encode": best(lambda: to_bytes(order)),
+        "json.decode+total": best(json_total),
+        "binary.decode+total": best(lambda: from_buffer(as_bytes).total_price()),
+    }
+
+
+if __name__ == "__main__":
+    for name, seconds in run().items():
+        print(f"{name:<20} {seconds * 1000:8.3f} ms")
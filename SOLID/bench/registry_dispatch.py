@@ -0,0 +1,40 @@
+"""Compares registry dispatch against a linear if/elif style scan
+
+Run with: python -m SOLID.bench.registry_dispatch
+"""
+from timeit import repeat
+
+from SOLID.dependency_inversion_after import CreditPaymentProcessor, PaymentProcessor
+from SOLID.events import NullSink
+from SOLID.payment_registry import PaymentProcessorRegistry
+
+
+def run(type_counts: tuple[int, ...] = (2, 8, 32, 128), lookups: int = 100_000) -> dict[str, float]:
+    """Times looking up the last registered payment type for each number of types"""
+    results = {}
+    for count in type_counts:
+        registry = PaymentProcessorRegistry(entry_point_group=None)
+        chain: list[tuple[str, PaymentProcessor]] = []
+        for index in range(count):
+            payment_type = f"type-{index}"
+            registry.add(payment_type, lambda: CreditPaymentProcessor("1234567", NullSink()))
+            chain.append((payment_type, registry.get(payment_type)))
+        last = f"type-{count - 1}"
+
+        def scan() -> PaymentProcessor:
+            for payment_type, processor in chain:
+                if payment_type == last:
+                    return processor
+            raise Exception(f"unknown payment type: {last}")
+
+        per_lookup = 1e9 / lookups
+        results[f"scan[{count}]"] = min(repeat(scan, number=lookups, repeat=5)) * per_lookup
+        results[f"registry[{count}]"] = (
+            min(repeat(lambda: registry.get(last), number=lookups, repeat=5)) * per_lookup
+        )
+    return results
+
+
+if __name__ == "__main__":
+    for name, nanoseconds in run().items():
+        print(f"{name:<16} {nanoseconds:8.1f} ns/lookup")
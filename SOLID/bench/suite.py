@@ -0,0 +1,233 @@
+"""Times the hot paths of every SOLID module
+
+Covers Order.add_item and Order.total_price across cart sizes and every
+payment processor and authorizer combination in the _before and _after
+modules. Modules that still print are timed with stdout discarded and the
+_after modules are given a NullSink. Every pay call first reopens its cart,
+since the _after processors only pay open orders.
+"""
+import contextlib
+import os
+import sys
+import timeit
+from dataclasses import dataclass
+from functools import partial
+from typing import Any, Callable, Iterable, Iterator, Optional, TextIO
+
+from SOLID import (
+    dependency_inversion_after,
+    dependency_inversion_before,
+    interface_segregation_after,
+    interface_segregation_before,
+    liskov_substitution_after,
+    liskov_substitution_before,
+    open_closed_after,
+    open_closed_before,
+    order,
+    single_responsibility_after,
+    single_responsibility_before,
+)
+from SOLID.compact_order import CompactOrder
+from SOLID.events import NullSink
+
+Benchmark = tuple[str, Callable[[], object]]
+
+CART_SIZES = (10, 1_000, 100_000)
+ORDER_CLASSES: dict[str, Callable[..., object]] = {
+    "single_responsibility_before.Order": single_responsibility_before.Order,
+    "single_responsibility_after.Order": single_responsibility_after.Order,
+    "order.Order": order.Order,
+    "compact_order.CompactOrder": CompactOrder,
+}
+CODE = "1234567"
+EMAIL = "payment@example.com"
+
+
+def _cart(order_class: Callable[..., object], size: int) -> object:
+    """Returns an order of the given class holding size lines"""
+    cart = order_class()
+    for line in range(size):
+        cart.add_item(f"Item {line % 100}", line % 7 + 1, line % 1000)  # type: ignore[attr-defined]
+    return cart
+
+
+def order_benchmarks(sizes: Iterable[int]) -> Iterator[Benchmark]:
+    """Yields add_item and total_price benchmarks for every order class and cart size"""
+    for name, order_class in ORDER_CLASSES.items():
+        for size in sizes:
+            yield f"{name}.add_item[{size}]", partial(_cart, order_class, size)
+            total_price = _cart(order_class, size).total_price  # type: ignore[attr-defined]
+            yield f"{name}.total_price[{size}]", total_price
+
+
+def _verified(authorizer: Any) -> Any:
+    """Returns an authorizer that has verified a code"""
+    authorizer.verify_code(CODE)
+    return authorizer
+
+
+def _reopened(cart: Any, pay: Callable[..., object], *args: Any) -> object:
+    """Reopens cart and calls pay, so every timed call pays an open order"""
+    cart.status = "open"
+    return pay(*args)
+
+
+def payment_benchmarks() -> Iterator[Benchmark]:
+    """Yields a pay benchmark for every processor and authorizer combination"""
+    cart = order.Order(["Keyboard", "Monitor"], [1, 2], [50, 65])
+    legacy_cart = single_responsibility_before.Order(["Keyboard", "Monitor"], [1, 2], [50, 65])
+    after_cart = single_responsibility_after.Order(["Keyboard", "Monitor"], [1, 2], [50, 65])
+
+    yield "single_responsibility_before.debit", partial(
+        _reopened, legacy_cart, legacy_cart.pay, "debit", CODE
+    )
+    yield "single_responsibility_before.credit", partial(
+        _reopened, legacy_cart, legacy_cart.pay, "credit", CODE
+    )
+    processor = single_responsibility_after.PaymentProcessor(NullSink())
+    yield "single_responsibility_after.debit", partial(
+        _reopened, after_cart, processor.pay_debit, after_cart, CODE
+    )
+    yield "single_responsibility_after.credit", partial(
+        _reopened, after_cart, processor.pay_credit, after_cart, CODE
+    )
+
+    legacy = open_closed_before.PaymentProcessor()
+    yield "open_closed_before.debit", partial(_reopened, cart, legacy.pay_debit, cart, CODE)
+    yield "open_closed_before.credit", partial(_reopened, cart, legacy.pay_credit, cart, CODE)
+    for kind, oc_class in [
+        ("debit", open_closed_after.DebitPaymentProcessor),
+        ("credit", open_closed_after.CreditPaymentProcessor),
+    ]:
+        yield f"open_closed_after.{kind}", partial(
+            _reopened, cart, oc_class(NullSink()).pay, cart, CODE
+        )
+
+    for kind, lsb_class in [
+        ("debit", liskov_substitution_before.DebitPaymentProcessor),
+        ("credit", liskov_substitution_before.CreditPaymentProcessor),
+        ("paypal", liskov_substitution_before.PaypalPaymentProcessor),
+    ]:
+        yield f"liskov_substitution_before.{kind}", partial(
+            _reopened, cart, lsb_class().pay, cart, CODE
+        )
+    lsa = liskov_substitution_after
+    yield "liskov_substitution_after.debit", partial(
+        _reopened, cart, lsa.DebitPaymentProcessor(CODE, NullSink()).pay, cart
+    )
+    yield "liskov_substitution_after.credit", partial(
+        _reopened, cart, lsa.CreditPaymentProcessor(CODE, NullSink()).pay, cart
+    )
+    yield "liskov_substitution_after.paypal", partial(
+        _reopened, cart, lsa.PaypalPaymentProcessor(EMAIL, NullSink()).pay, cart
+    )
+
+    isb = interface_segregation_before
+    debit = isb.DebitPaymentProcessor(CODE)
+    debit.auth_sms(CODE)
+    paypal = isb.PaypalPaymentProcessor(EMAIL)
+    paypal.auth_sms(CODE)
+    yield "interface_segregation_before.debit+sms", partial(_reopened, cart, debit.pay, cart)
+    yield "interface_segregation_before.paypal+sms", partial(_reopened, cart, paypal.pay, cart)
+
+    isa = interface_segregation_after
+    sms = _verified(isa.SMSAuthorizer(sink=NullSink()))
+    yield "interface_segregation_after.sms.verify_code", partial(sms.verify_code, CODE)
+    yield "interface_segregation_after.debit+sms", partial(
+        _reopened, cart, isa.DebitPaymentProcessor(CODE, sms, NullSink()).pay, cart
+    )
+    yield "interface_segregation_after.credit", partial(
+        _reopened, cart, isa.CreditPaymentProcessor(CODE, NullSink()).pay, cart
+    )
+    yield "interface_segregation_after.paypal+sms", partial(
+        _reopened, cart, isa.PaypalPaymentProcessor(EMAIL, sms, NullSink()).pay, cart
+    )
+
+    dib = dependency_inversion_before
+    legacy_sms = _verified(dib.SMSAuthorizer())
+    yield "dependency_inversion_before.sms.verify_code", partial(legacy_sms.verify_code, CODE)
+    yield "dependency_inversion_before.debit+sms", partial(
+        _reopened, cart, dib.DebitPaymentProcessor(CODE, legacy_sms).pay, cart
+    )
+    yield "dependency_inversion_before.credit", partial(
+        _reopened, cart, dib.CreditPaymentProcessor(CODE).pay, cart
+    )
+    yield "dependency_inversion_before.paypal+sms", partial(
+        _reopened, cart, dib.PaypalPaymentProcessor(EMAIL, legacy_sms).pay, cart
+    )
+
+    dia = dependency_inversion_after
+    yield "dependency_inversion_after.credit", partial(
+        _reopened, cart, dia.CreditPaymentProcessor(CODE, NullSink()).pay, cart
+    )
+    for name, authorizer_class in [("sms", dia.AuthorizerSMS), ("google", dia.AuthorizerGoogle)]:
+        authorizer = _verified(authorizer_class(sink=NullSink()))
+        yield f"dependency_inversion_after.{name}.verify_code", partial(
+            authorizer.verify_code, CODE
+        )
+        yield f"dependency_inversion_after.debit+{name}", partial(
+            _reopened, cart, dia.DebitPaymentProcessor(CODE, authorizer, NullSink()).pay, cart
+        )
+        yield f"dependency_inversion_after.paypal+{name}", partial(
+            _reopened, cart, dia.PaypalPaymentProcessor(EMAIL, authorizer, NullSink()).pay, cart
+        )
+
+
+def benchmarks(sizes: Iterable[int] = CART_SIZES) -> list[Benchmark]:
+    """Returns every benchmark in the suite"""
+    return [*order_benchmarks(sizes), *payment_benchmarks()]
+
+
+def measure(func: Callable[[], object], min_time: float = 0.2, repeat: int = 3) -> float:
+    """Returns the best time of one call of func in nanoseconds"""
+    timer = timeit.Timer(func)
+    number = 1
+    while timer.timeit(number) < min_time / repeat and number < 1 << 30:
+        number *= 10
+    return min(timer.repeat(repeat, number)) / number * 1e9
+
+
+def run(
+    sizes: Iterable[int] = CART_SIZES,
+    min_time: float = 0.2,
+    select: Optional[str] = None,
+) -> dict[str, float]:
+    """Times every benchmark whose name contains select and returns ns per call"""
+    results = {}
+    with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+        for name, func in benchmarks(sizes):
+            if select is None or select in name:
+                results[name] = measure(func, min_time)
+    return results
+
+
+@dataclass
+class Regression:
+    """A benchmark that got slower than its baseline allows"""
+
+    name: str
+    baseline: float
+    current: float
+
+    @property
+    def ratio(self) -> float:
+        """Returns how many times slower the benchmark got"""
+        return self.current / self.baseline
+
+
+def compare(
+    current: dict[str, float], baseline: dict[str, float], threshold: float = 0.1
+) -> list[Regression]:
+    """Returns the benchmarks more than threshold slower than in the baseline"""
+    return [
+        Regression(name, baseline[name], nanoseconds)
+        for name, nanoseconds in current.items()
+        if name in baseline and nanoseconds > baseline[name] * (1 + threshold)
+    ]
+
+
+def report(results: dict[str, float], out: TextIO = sys.stdout) -> None:
+    """Prints a results table"""
+    width = max(map(len, results), default=0)
+    for name, nanoseconds in results.items():
+        print(f"{name:<{width}}  {nanoseconds:14.1f} ns", file=out)
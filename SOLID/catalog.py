@@ -0,0 +1,142 @@
+"""This module interns product names into a catalog with one canonical price each"""
+from array import array
+from operator import mul
+from typing import Iterable, Optional, Union
+
+from SOLID.order import StatusMachine
+
+Product = Union[int, str]
+
+
+class Catalog:
+    """Maps product names to compact integer ids and canonical prices
+
+    Ids are handed out in the order products are added and never change, so
+    orders can store ids instead of names. version goes up on every price
+    change, which tells orders when their cached totals are stale.
+    """
+
+    def __init__(self, products: Optional[Iterable[tuple[str, int]]] = None) -> None:
+        self._names: list[str] = []
+        self._ids: dict[str, int] = {}
+        self._prices: array = array("q")
+        self.version = 0
+        for name, price in products or ():
+            self.add(name, price)
+
+    def __len__(self) -> int:
+        return len(self._names)
+
+    def __contains__(self, name: str) -> bool:
+        return name in self._ids
+
+    def add(self, name: str, price: int) -> int:
+        """Adds a product and returns its id"""
+        if name in self._ids:
+            raise ValueError(f"product is already in the catalog: {name}")
+        product_id = len(self._names)
+        self._prices.append(price)
+        self._names.append(name)
+        self._ids[name] = product_id
+        return product_id
+
+    def id_of(self, product: Product) -> int:
+        """Returns the id of a product given by name or id"""
+        if isinstance(product, str):
+            product_id = self._ids.get(product)
+            if product_id is None:
+                raise ValueError(f"unknown product: {product}")
+            return product_id
+        if not 0 <= product < len(self._names):
+            raise ValueError(f"unknown product id: {product}")
+        return product
+
+    def name_of(self, product_id: int) -> str:
+        """Returns the name of a product"""
+        return self._names[self.id_of(product_id)]
+
+    def price_of(self, product: Product) -> int:
+        """Returns the canonical price of a product"""
+        return self._prices[self.id_of(product)]
+
+    def set_price(self, product: Product, price: int) -> None:
+        """Changes the canonical price of a product"""
+        self._prices[self.id_of(product)] = price
+        self.version += 1
+
+    def units_sold(self, orders: Iterable["CatalogOrder"]) -> dict[str, int]:
+        """Returns the total quantity of every product across orders"""
+        units = [0] * len(self._names)
+        for order in orders:
+            for product_id, quantity in zip(order.product_ids, order.quantites):
+                units[product_id] += quantity
+        return {name: count for name, count in zip(self._names, units) if count}
+
+
+class CatalogOrder(StatusMachine):
+    """An order that stores product ids and quantities and prices lines from a catalog
+
+    The total is kept up to date as lines change and recomputed once after
+    the catalog changes a price.
+    """
+
+    __slots__ = ("catalog", "product_ids", "quantites", "status", "_total", "_version")
+
+    def __init__(
+        self,
+        catalog: Catalog,
+        products: Optional[Iterable[Product]] = None,
+        quantites: Optional[Iterable[int]] = None,
+    ) -> None:
+        self.catalog = catalog
+        self.product_ids: array = array("I")
+        self.quantites: array = array("q")
+        self.status: str = "open"
+        self._total: int = 0
+        self._version: int = catalog.version
+        for product, quantity in zip(products or (), quantites or ()):
+            self.add_item(product, quantity)
+
+    def __repr__(self) -> str:
+        return (
+            f"CatalogOrder(items={self.items!r}, quantites={self.quantites.tolist()!r}, "
+            f"status={self.status!r})"
+        )
+
+    @property
+    def items(self) -> list[str]:
+        """Returns the product name of every line in the order"""
+        names = self.catalog._names
+        return [names[product_id] for product_id in self.product_ids]
+
+    @property
+    def prices(self) -> list[int]:
+        """Returns the current catalog price of every line in the order"""
+        prices = self.catalog._prices
+        return [prices[product_id] for product_id in self.product_ids]
+
+    def add_item(self, product: Product, quantity: int) -> None:
+        """Adds a product, given by name or id, to the order, changing nothing if it is not valid"""
+        product_id = self.catalog.id_of(product)
+        self.quantites.append(quantity)
+        self.product_ids.append(product_id)
+        self._total += quantity * self.catalog._prices[product_id]
+
+    def update_quantity(self, index: int, quantity: int) -> None:
+        """Changes the quantity of the line at index"""
+        price = self.catalog._prices[self.product_ids[index]]
+        old = self.quantites[index]
+        self.quantites[index] = quantity
+        self._total += (quantity - old) * price
+
+    def remove_item(self, index: int) -> None:
+        """Removes the line at index from the order"""
+        price = self.catalog._prices[self.product_ids.pop(index)]
+        self._total -= self.quantites.pop(index) * price
+
+    def total_price(self) -> int:
+        """Returns the total price of the order at the current catalog prices"""
+        if self._version != self.catalog.version:
+            self._total = sum(map(mul, self.quantites, self.prices))
+            self._version = self.catalog.version
+        return self._total
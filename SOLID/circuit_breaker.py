@@ -0,0 +1,205 @@
+"""This module stops calling a failing or slow authorizer until it recovers
+
+The breaker is closed while the authorizer behaves. Once enough of the
+recent calls failed or were slow it opens and rejects calls straight away,
+handing them to a fallback authorizer when there is one. After reset_timeout
+it lets probe calls through half open: a good probe closes it again and a bad
+one opens it for another reset_timeout.
+"""
+import math
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Callable, Optional
+
+from SOLID.dependency_inversion_after import Authorizer
+from SOLID.events import ConsoleSink, EventSink
+
+CLOSED, OPEN, HALF_OPEN = "closed", "open", "half open"
+
+
+class CircuitOpenError(Exception):
+    """Raised when the breaker rejects a call without a fallback to take it"""
+
+
+class CircuitBreakerAuthorizer(Authorizer):
+    """Authorize through another authorizer behind a circuit breaker
+
+    The last window calls are kept. With at least min_calls of them, the
+    breaker opens once error_threshold of them raised or slow_threshold of
+    them took slow_call seconds or longer. At most max_concurrent calls run
+    at a time and further calls are rejected instead of piling up threads.
+
+    With max_timeout set calls run on a worker thread and are abandoned after
+    timeout_factor times the p99 latency of recent good calls, kept between
+    min_timeout and max_timeout. An abandoned call counts as an error.
+
+    Every state change is recorded to the sink under "circuit breaker".
+    """
+
+    def __init__(
+        self,
+        authorizer: Authorizer,
+        fallback: Optional[Authorizer] = None,
+        window: int = 20,
+        min_calls: int = 10,
+        error_threshold: float = 0.5,
+        slow_call: float = 1.0,
+        slow_threshold: float = 0.5,
+        reset_timeout: float = 30.0,
+        probes: int = 1,
+        max_concurrent: int = 8,
+        min_timeout: float = 0.05,
+        max_timeout: Optional[float] = None,
+        timeout_factor: float = 3.0,
+        clock: Callable[[], float] = time.monotonic,
+        sink: Optional[EventSink] = None,
+    ) -> None:
+        if window < 1 or not 1 <= min_calls <= window or probes < 1 or max_concurrent < 1:
+            raise ValueError("window, min_calls, probes and max_concurrent must be positive")
+        self.authorizer = authorizer
+        self.fallback = fallback
+        self.window = window
+        self.min_calls = min_calls
+        self.error_threshold = error_threshold
+        self.slow_call = slow_call
+        self.slow_threshold = slow_threshold
+        self.reset_timeout = reset_timeout
+        self.probes = probes
+        self.max_concurrent = max_concurrent
+        self.min_timeout = min_timeout
+        self.max_timeout = max_timeout
+        self.timeout_factor = timeout_factor
+        self.clock = clock
+        self.sink = sink if sink is not None else ConsoleSink()
+        self.state = CLOSED
+        self.rejected = 0
+        self.fallbacks = 0
+        self.authorized = False
+        self._calls: deque[tuple[bool, bool, float]] = deque()
+        self._errors = 0
+        self._slow = 0
+        self._opened_at = 0.0
+        self._probing = 0
+        self._in_flight = 0
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._lock = threading.Lock()
+
+    def _transition(self, state: str) -> None:
+        """Moves the breaker to a new state and records it"""
+        if state == OPEN:
+            self._opened_at = self.clock()
+        if state != HALF_OPEN:
+            self._calls.clear()
+            self._errors = self._slow = 0
+        self.state = state
+        self.sink.record("circuit breaker", state)
+
+    def _acquire(self) -> bool:
+        """Returns true if a call may go to the authorizer, counting it as in flight"""
+        with self._lock:
+            if self._in_flight >= self.max_concurrent:
+                return False
+            if self.state == OPEN:
+                if self.clock() - self._opened_at < self.reset_timeout:
+                    return False
+                self._probing = 0
+                self._transition(HALF_OPEN)
+            if self.state == HALF_OPEN:
+                if self._probing >= self.probes:
+                    return False
+                self._probing += 1
+            self._in_flight += 1
+            return True
+
+    def _finished(self, *args: object) -> None:
+        """Counts a call to the authorizer as no longer in flight"""
+        with self._lock:
+            self._in_flight -= 1
+
+    def _record(self, failed: bool, seconds: float) -> None:
+        """Adds a call outcome to the window and opens or closes the breaker"""
+        slow = seconds >= self.slow_call
+        with self._lock:
+            if self.state == HALF_OPEN:
+                self._transition(OPEN if failed or slow else CLOSED)
+                return
+            if self.state == OPEN:
+                return
+            calls = self._calls
+            if len(calls) == self.window:
+                old_failed, old_slow, _ = calls.popleft()
+                self._errors -= old_failed
+                self._slow -= old_slow
+            calls.append((failed, slow, seconds))
+            self._errors += failed
+            self._slow += slow
+            if len(calls) >= self.min_calls and (
+                self._errors >= self.error_threshold * len(calls)
+                or self._slow >= self.slow_threshold * len(calls)
+            ):
+                self._transition(OPEN)
+
+    def timeout(self) -> Optional[float]:
+        """Returns how long the next call may take, or None when calls are not timed out"""
+        if self.max_timeout is None:
+            return None
+        with self._lock:
+            latencies = sorted(seconds for failed, _, seconds in self._calls if not failed)
+        if not latencies:
+            return self.max_timeout
+        p99 = latencies[math.ceil(0.99 * len(latencies)) - 1]
+        return min(self.max_timeout, max(self.min_timeout, p99 * self.timeout_factor))
+
+    def _call(self, code: str) -> None:
+        """Calls the authorizer, on a worker thread when calls are timed out"""
+        timeout = self.timeout()
+        if timeout is None:
+            try:
+                self.authorizer.verify_code(code)
+            finally:
+                self._finished()
+            return
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(self.max_concurrent)
+        future: Future = self._executor.submit(self.authorizer.verify_code, code)
+        future.add_done_callback(self._finished)
+        try:
+            future.result(timeout)
+        except TimeoutError:
+            raise TimeoutError(f"authorizer did not answer within {timeout:.3f}s") from None
+
+    def _fall_back(self, code: str, error: Exception) -> None:
+        """Verifies the code with the fallback authorizer, or raises error without one"""
+        if self.fallback is None:
+            self.authorized = False
+            raise error
+        self.fallbacks += 1
+        self.fallback.verify_code(code)
+        self.authorized = self.fallback.is_authorized()
+
+    def verify_code(self, code: str) -> None:
+        """Verifys the provided code unless the breaker rejects the call"""
+        if not self._acquire():
+            self.rejected += 1
+            self._fall_back(code, CircuitOpenError(f"circuit breaker is {self.state}"))
+            return
+        started = self.clock()
+        try:
+            self._call(code)
+        except Exception as error:
+            self._record(True, self.clock() - started)
+            self._fall_back(code, error)
+            return
+        self._record(False, self.clock() - started)
+        self.authorized = self.authorizer.is_authorized()
+
+    def is_authorized(self) -> bool:
+        """Returns true if the caller is authorized"""
+        return self.authorized
+
+    def close(self) -> None:
+        """Stops the worker threads without waiting for abandoned calls"""
+        if self._executor is not None:
+            self._executor.shutdown(wait=False)
@@ -0,0 +1,125 @@
+"""This module handles compact, columnar orders within the system"""
+import sys
+from array import array
+from operator import mul
+from typing import Any, Iterable, Optional, Union
+
+from SOLID.order import Order, StatusMachine, collect_lines
+
+
+class CompactOrder(StatusMachine):
+    """An Order that stores its lines in typed columns instead of Python lists
+
+    Quantities and prices live in int64 arrays and item names are dictionary
+    encoded, so each line costs a 4 byte name code and two 8 byte integers.
+    """
+
+    __slots__ = ("_names", "_codes_by_name", "_codes", "quantites", "prices", "status", "_total")
+
+    def __init__(
+        self,
+        items: Optional[Iterable[str]] = None,
+        quantites: Optional[Iterable[int]] = None,
+        prices: Optional[Iterable[int]] = None,
+    ) -> None:
+        self._names: list[str] = []
+        self._codes_by_name: dict[str, int] = {}
+        self._codes: array = array("I")
+        self.quantites: array = array("q")
+        self.prices: array = array("q")
+        self.status: str = "open"
+        self._total: int = 0
+        for name, quantity, price in zip(items or (), quantites or (), prices or ()):
+            self.add_item(name, quantity, price)
+
+    def __repr__(self) -> str:
+        return (
+            f"CompactOrder(items={self.items!r}, quantites={self.quantites.tolist()!r}, "
+            f"prices={self.prices.tolist()!r}, status={self.status!r})"
+        )
+
+    @property
+    def items(self) -> list[str]:
+        """Returns the item name of every line in the order"""
+        names = self._names
+        return [names[code] for code in self._codes]
+
+    def _encode(self, name: str) -> int:
+        """Returns the dictionary code of an item name, adding it if needed"""
+        code = self._codes_by_name.get(name)
+        if code is None:
+            code = len(self._names)
+            self._names.append(name)
+            self._codes_by_name[name] = code
+        return code
+
+    def add_item(self, name: str, quantity: int, price: int) -> None:
+        """Adds an item to the order, changing nothing if a value is not valid"""
+        self._codes_by_name.get(name)  # raises for an unhashable name before any column changes
+        self.quantites.append(quantity)
+        try:
+            self.prices.append(price)
+        except Exception:
+            self.quantites.pop()
+            raise
+        self._codes.append(self._encode(name))
+        self._total += quantity * price
+
+    def add_items(
+        self,
+        items: Iterable[Any],
+        quantites: Optional[Iterable[int]] = None,
+        prices: Optional[Iterable[int]] = None,
+    ) -> None:
+        """Adds a batch of items to the order, validating the whole batch first"""
+        names, quantities, costs = collect_lines(items, quantites, prices)
+        new_quantites = array("q", quantities)
+        new_prices = array("q", costs)
+        for name in dict.fromkeys(names):
+            self._encode(name)
+        self._codes.extend(map(self._codes_by_name.__getitem__, names))
+        self.quantites.extend(new_quantites)
+        self.prices.extend(new_prices)
+        self._total += sum(map(mul, quantities, costs))
+
+    def update_quantity(self, index: int, quantity: int) -> None:
+        """Changes the quantity of the line at index"""
+        old = self.quantites[index]
+        self.quantites[index] = quantity
+        self._total += (quantity - old) * self.prices[index]
+
+    def remove_item(self, index: int) -> None:
+        """Removes the line at index from the order"""
+        self._codes.pop(index)
+        self._total -= self.quantites.pop(index) * self.prices.pop(index)
+
+    def total_price(self) -> int:
+        """Returns the total price of the order"""
+        return self._total
+
+
+def _deep_size(objects: Iterable[object], seen: set[int]) -> int:
+    """Returns the size of every object not already counted in seen"""
+    size = 0
+    for obj in objects:
+        if id(obj) not in seen:
+            seen.add(id(obj))
+            size += sys.getsizeof(obj)
+    return size
+
+
+def footprint(order: Union[Order, CompactOrder]) -> int:
+    """Returns the number of bytes held by the lines of an order"""
+    seen: set[int] = set()
+    if isinstance(order, CompactOrder):
+        containers: list = [order._names, order._codes_by_name, order._codes]
+        containers += [order.quantites, order.prices]
+        return _deep_size(containers, seen) + _deep_size(order._names, seen)
+    columns: list[list] = [order.items, order.quantites, order.prices]
+    return _deep_size(columns, seen) + sum(_deep_size(column, seen) for column in columns)
+
+
+def bytes_per_line(order: Union[Order, CompactOrder]) -> float:
+    """Returns the average number of bytes each line of an order costs"""
+    lines = len(order.quantites)
+    return footprint(order) / lines if lines else 0.0
@@ -0,0 +1,189 @@
+"""This module handles orders shared between threads"""
+import threading
+from dataclasses import dataclass, replace
+from operator import mul
+from typing import Any, Iterable, Optional
+
+from SOLID.order import TRANSITIONS, OrderStatus, StatusMachine, collect_lines
+
+
+@dataclass(frozen=True)
+class OrderSnapshot:
+    """The lines, status and total of an order at one version"""
+
+    items: tuple[str, ...] = ()
+    quantites: tuple[int, ...] = ()
+    prices: tuple[int, ...] = ()
+    status: str = "open"
+    version: int = 0
+    total: int = 0
+
+    def total_price(self) -> int:
+        """Returns the total price of the order at this version"""
+        return self.total
+
+
+class ConcurrentOrder(StatusMachine):
+    """An Order that many threads can read and edit at once
+
+    Every edit takes a lock, copies the lines and publishes a new immutable
+    OrderSnapshot with the next version. Readers only load the current
+    snapshot, so they never wait for writers and never see half of an edit.
+    Edits cost a copy of the lines; build large carts with add_items. Lines
+    can only change while the order is open, so a payment charges exactly
+    the cart it claimed with settle.
+    """
+
+    __slots__ = ("_snapshot", "_lock")
+
+    def __init__(
+        self,
+        items: Optional[Iterable[str]] = None,
+        quantites: Optional[Iterable[int]] = None,
+        prices: Optional[Iterable[int]] = None,
+    ) -> None:
+        self._lock = threading.Lock()
+        names, quantities, costs = tuple(items or ()), tuple(quantites or ()), tuple(prices or ())
+        self._snapshot = OrderSnapshot(
+            names, quantities, costs, total=sum(map(mul, quantities, costs))
+        )
+
+    def __repr__(self) -> str:
+        snapshot = self._snapshot
+        return (
+            f"ConcurrentOrder(items={list(snapshot.items)!r}, "
+            f"quantites={list(snapshot.quantites)!r}, prices={list(snapshot.prices)!r}, "
+            f"status={snapshot.status!r}, version={snapshot.version})"
+        )
+
+    def snapshot(self) -> OrderSnapshot:
+        """Returns the current version of the order without locking"""
+        return self._snapshot
+
+    @property
+    def items(self) -> tuple[str, ...]:
+        """Returns the item name of every line"""
+        return self._snapshot.items
+
+    @property
+    def quantites(self) -> tuple[int, ...]:
+        """Returns the quantity of every line"""
+        return self._snapshot.quantites
+
+    @property
+    def prices(self) -> tuple[int, ...]:
+        """Returns the price of every line"""
+        return self._snapshot.prices
+
+    @property
+    def status(self) -> str:
+        """Returns the status of the order"""
+        return self._snapshot.status
+
+    @status.setter
+    def status(self, status: str) -> None:
+        self.set_status(status)
+
+    @property
+    def version(self) -> int:
+        """Returns the number of edits made to the order"""
+        return self._snapshot.version
+
+    def _editable(self) -> OrderSnapshot:
+        """Returns the current snapshot if its lines may change, which the lock must guard"""
+        old = self._snapshot
+        if old.status != OrderStatus.OPEN:
+            raise ValueError(f"cannot change the lines of a {old.status} order")
+        return old
+
+    def _publish(self, old: OrderSnapshot, **changes: Any) -> OrderSnapshot:
+        """Replaces the current snapshot with old plus changes, which the lock must guard"""
+        self._snapshot = new = replace(old, version=old.version + 1, **changes)
+        return new
+
+    def add_item(self, name: str, quantity: int, price: int) -> None:
+        """Adds an item to the order"""
+        with self._lock:
+            old = self._editable()
+            self._publish(
+                old,
+                items=old.items + (name,),
+                quantites=old.quantites + (quantity,),
+                prices=old.prices + (price,),
+                total=old.total + quantity * price,
+            )
+
+    def add_items(
+        self,
+        items: Iterable[Any],
+        quantites: Optional[Iterable[int]] = None,
+        prices: Optional[Iterable[int]] = None,
+    ) -> None:
+        """Adds a batch of items to the order as one edit, validating the whole batch first"""
+        names, quantities, costs = collect_lines(items, quantites, prices)
+        total = sum(map(mul, quantities, costs))
+        with self._lock:
+            old = self._editable()
+            self._publish(
+                old,
+                items=old.items + tuple(names),
+                quantites=old.quantites + tuple(quantities),
+                prices=old.prices + tuple(costs),
+                total=old.total + total,
+            )
+
+    def update_quantity(self, index: int, quantity: int) -> None:
+        """Changes the quantity of the line at index"""
+        with self._lock:
+            old = self._editable()
+            quantities = list(old.quantites)
+            total = old.total + (quantity - quantities[index]) * old.prices[index]
+            quantities[index] = quantity
+            self._publish(old, quantites=tuple(quantities), total=total)
+
+    def remove_item(self, index: int) -> None:
+        """Removes the line at index from the order"""
+        with self._lock:
+            old = self._editable()
+            names, quantities, prices = list(old.items), list(old.quantites), list(old.prices)
+            del names[index]
+            total = old.total - quantities.pop(index) * prices.pop(index)
+            self._publish(
+                old,
+                items=tuple(names),
+                quantites=tuple(quantities),
+                prices=tuple(prices),
+                total=total,
+            )
+
+    def set_status(self, status: str, version: Optional[int] = None) -> OrderSnapshot:
+        """Sets the status and returns the new snapshot
+
+        With version given the status is only set if the order has not been
+        edited since that version, so a payment can settle exactly the cart
+        it totalled. Raises ValueError otherwise.
+        """
+        with self._lock:
+            old = self._snapshot
+            if version is not None and version != old.version:
+                raise ValueError(f"order changed since version {version}")
+            return self._publish(old, status=status)
+
+    def transition(self, expected: str, status: str) -> bool:
+        """Moves the order from expected to status if it is still in expected
+
+        Returns false when another caller moved the order first and raises
+        ValueError for a move the TRANSITIONS table forbids.
+        """
+        if status not in TRANSITIONS.get(expected, ()):
+            raise ValueError(f"order cannot go from {expected} to {status}")
+        with self._lock:
+            old = self._snapshot
+            if old.status != expected:
+                return False
+            self._publish(old, status=OrderStatus(status))
+        return True
+
+    def total_price(self) -> int:
+        """Returns the total price of the order"""
+        return self._snapshot.total
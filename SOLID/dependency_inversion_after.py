@@ -17,8 +17,10 @@ This file fixes the DI principle because it implements an Authorizer interface.
 """
 from abc import ABC, abstractmethod
 from dataclasses import dataclass, field
+from typing import Iterable
 
-from SOLID.order import Order
+from SOLID.events import ConsoleSink, EventSink
+from SOLID.order import Order, OrderNotOpen
 
 
 class PaymentProcessor(ABC):
@@ -28,6 +30,18 @@ class PaymentProcessor(ABC):
     def pay(self, order: Order) -> None:
         pass
 
+    def pay_many(self, orders: Iterable[Order]) -> list[bool]:
+        """Pay every order in a batch and return whether each one was paid"""
+        outcomes = []
+        for order in orders:
+            try:
+                self.pay(order)
+            except Exception:
+                outcomes.append(False)
+            else:
+                outcomes.append(True)
+        return outcomes
+
 
 class Authorizer(ABC):
     """Authorizes transactions"""
@@ -46,11 +60,12 @@ class AuthorizerSMS(Authorizer):
     """Authorize through SMS"""
 
     authorized: bool = field(default=False)
+    sink: EventSink = field(default_factory=ConsoleSink)
 
     def verify_code(self, code: str) -> None:
         """Verifys the provided code"""
-        print(f"Verifying SMS code {code}")
         self.authorized = True
+        self.sink.record("sms", "verified")
 
     def is_authorized(self) -> bool:
         """Returns true if the caller is authorized"""
@@ -62,11 +77,12 @@ class AuthorizerGoogle(Authorizer):
     """Authorize through Google"""
 
     authorized: bool = field(default=False)
+    sink: EventSink = field(default_factory=ConsoleSink)
 
     def verify_code(self, code: str) -> None:
         """Verifys the provided code"""
-        print(f"Verifying google auth code {code}")
         self.authorized = True
+        self.sink.record("google", "verified")
 
     def is_authorized(self) -> bool:
         """Returns true if the caller is authorized"""
@@ -79,14 +95,31 @@ class DebitPaymentProcessor(PaymentProcessor):
 
     security_code: str
     authorizer: Authorizer
+    sink: EventSink = field(default_factory=ConsoleSink)
 
     def pay(self, order: Order) -> None:
         """Pay the order with debit card"""
         if not self.authorizer.is_authorized():
+            self.sink.record("debit", "not authorized", id(order))
             raise Exception("Not authorized")
-        print("processing debit payment type")
-        print(f"Verifying security code: {self.security_code}")
-        order.status = "paid"
+        if not order.settle():
+            self.sink.record("debit", "not open", id(order))
+            raise OrderNotOpen(f"order is {order.status}")
+        self.sink.record("debit", "paid", id(order))
+
+    def pay_many(self, orders: Iterable[Order]) -> list[bool]:
+        """Pay a batch of orders with debit card, checking authorization once"""
+        batch = list(orders)
+        if not self.authorizer.is_authorized():
+            for order in batch:
+                self.sink.record("debit", "not authorized", id(order))
+            return [False] * len(batch)
+        outcomes = []
+        for order in batch:
+            paid = order.settle()
+            self.sink.record("debit", "paid" if paid else "not open", id(order))
+            outcomes.append(paid)
+        return outcomes
 
 
 @dataclass
@@ -94,12 +127,14 @@ class CreditPaymentProcessor(PaymentProcessor):
     """Processes payments with credit cards"""
 
     security_code: str
+    sink: EventSink = field(default_factory=ConsoleSink)
 
     def pay(self, order: Order) -> None:
         """Pay the order with a credit card"""
-        print("processing credit payment type")
-        print(f"Verifying security code: {self.security_code}")
-        order.status = "paid"
+        if not order.settle():
+            self.sink.record("credit", "not open", id(order))
+            raise OrderNotOpen(f"order is {order.status}")
+        self.sink.record("credit", "paid", id(order))
 
 
 @dataclass
@@ -108,11 +143,28 @@ class PaypalPaymentProcessor(PaymentProcessor):
 
     email_address: str
     authorizer: Authorizer
+    sink: EventSink = field(default_factory=ConsoleSink)
 
     def pay(self, order: Order) -> None:
         """Pay the order with an email"""
         if not self.authorizer.is_authorized():
+            self.sink.record("paypal", "not authorized", id(order))
             raise Exception("Not authorized")
-        print("Processing paypal payment type")
-        print(f"Using email address: {self.email_address}")
-        order.status = "paid"
+        if not order.settle():
+            self.sink.record("paypal", "not open", id(order))
+            raise OrderNotOpen(f"order is {order.status}")
+        self.sink.record("paypal", "paid", id(order))
+
+    def pay_many(self, orders: Iterable[Order]) -> list[bool]:
+        """Pay a batch of orders with an email, checking authorization once"""
+        batch = list(orders)
+        if not self.authorizer.is_authorized():
+            for order in batch:
+                self.sink.record("paypal", "not authorized", id(order))
+            return [False] * len(batch)
+        outcomes = []
+        for order in batch:
+            paid = order.settle()
+            self.sink.record("paypal", "paid" if paid else "not open", id(order))
+            outcomes.append(paid)
+        return outcomes
@@ -0,0 +1,197 @@
+"""
+Asyncio counterparts of the dependency inversion payment abstractions
+
+AsyncPaymentProcessor and AsyncAuthorizer mirror PaymentProcessor and
+Authorizer from dependency_inversion_after with coroutine methods, so an
+event loop never blocks on a payment. SyncPaymentProcessor and
+SyncAuthorizer wrap the existing synchronous classes for gradual migration.
+
+"""
+import asyncio
+from abc import ABC, abstractmethod
+from dataclasses import dataclass, field
+from typing import Iterable, Optional
+
+from SOLID.dependency_inversion_after import Authorizer, PaymentProcessor
+from SOLID.order import Order, OrderNotOpen
+
+
+class PaymentPending(asyncio.TimeoutError):
+    """Raised when a payment running in a worker thread outlives its timeout
+
+    The thread cannot be stopped, so the payment may still go through. Await
+    outcome for its final result.
+    """
+
+    def __init__(self, message: str, outcome: "asyncio.Future[None]") -> None:
+        super().__init__(message)
+        self.outcome = outcome
+
+
+class AsyncPaymentProcessor(ABC):
+    """Process the payment of a given order without blocking the event loop"""
+
+    timeout: Optional[float] = None
+
+    @abstractmethod
+    async def pay(self, order: Order) -> None:
+        pass
+
+    async def pay_with_timeout(self, order: Order) -> None:
+        """Pay the order, giving up after the processor's timeout"""
+        await asyncio.wait_for(self.pay(order), self.timeout)
+
+
+class AsyncAuthorizer(ABC):
+    """Authorizes transactions without blocking the event loop"""
+
+    timeout: Optional[float] = None
+
+    @abstractmethod
+    async def verify_code(self, code: str) -> None:
+        pass
+
+    @abstractmethod
+    def is_authorized(self) -> bool:
+        pass
+
+    async def verify_code_with_timeout(self, code: str) -> None:
+        """Verify the code, giving up after the authorizer's timeout"""
+        await asyncio.wait_for(self.verify_code(code), self.timeout)
+
+
+@dataclass
+class SyncAuthorizer(AsyncAuthorizer):
+    """Runs a synchronous Authorizer in a worker thread"""
+
+    authorizer: Authorizer
+    timeout: Optional[float] = None
+
+    async def verify_code(self, code: str) -> None:
+        """Verifys the provided code"""
+        await asyncio.to_thread(self.authorizer.verify_code, code)
+
+    def is_authorized(self) -> bool:
+        """Returns true if the caller is authorized"""
+        return self.authorizer.is_authorized()
+
+
+@dataclass
+class SyncPaymentProcessor(AsyncPaymentProcessor):
+    """Runs a synchronous PaymentProcessor in a worker thread"""
+
+    processor: PaymentProcessor
+    timeout: Optional[float] = None
+
+    async def pay(self, order: Order) -> None:
+        """Pay the order with the wrapped processor"""
+        await asyncio.to_thread(self.processor.pay, order)
+
+    async def pay_with_timeout(self, order: Order) -> None:
+        """Pay the order, raising PaymentPending once the timeout passes
+
+        Unlike a coroutine the synchronous call keeps running after the
+        timeout, so its outcome is handed back instead of being abandoned.
+        """
+        outcome = asyncio.ensure_future(self.pay(order))
+        try:
+            await asyncio.wait_for(asyncio.shield(outcome), self.timeout)
+        except asyncio.TimeoutError:
+            raise PaymentPending(f"payment still running after {self.timeout}s", outcome) from None
+
+
+@dataclass
+class AsyncDebitPaymentProcessor(AsyncPaymentProcessor):
+    """Processes payments with debit cards"""
+
+    security_code: str
+    authorizer: AsyncAuthorizer
+    timeout: Optional[float] = None
+
+    async def pay(self, order: Order) -> None:
+        """Pay the order with debit card"""
+        if not self.authorizer.is_authorized():
+            raise Exception("Not authorized")
+        if not order.settle():
+            raise OrderNotOpen(f"order is {order.status}")
+
+
+@dataclass
+class AsyncCreditPaymentProcessor(AsyncPaymentProcessor):
+    """Processes payments with credit cards"""
+
+    security_code: str
+    timeout: Optional[float] = None
+
+    async def pay(self, order: Order) -> None:
+        """Pay the order with a credit card"""
+        if not order.settle():
+            raise OrderNotOpen(f"order is {order.status}")
+
+
+@dataclass
+class AsyncPaypalPaymentProcessor(AsyncPaymentProcessor):
+    """Processes payments with a paypal account"""
+
+    email_address: str
+    authorizer: AsyncAuthorizer
+    timeout: Optional[float] = None
+
+    async def pay(self, order: Order) -> None:
+        """Pay the order with an email"""
+        if not self.authorizer.is_authorized():
+            raise Exception("Not authorized")
+        if not order.settle():
+            raise OrderNotOpen(f"order is {order.status}")
+
+
+@dataclass
+class AsyncAuthorizerSMS(AsyncAuthorizer):
+    """Authorize through SMS"""
+
+    authorized: bool = field(default=False)
+    timeout: Optional[float] = None
+
+    async def verify_code(self, code: str) -> None:
+        """Verifys the provided code"""
+        self.authorized = True
+
+    def is_authorized(self) -> bool:
+        """Returns true if the caller is authorized"""
+        return self.authorized
+
+
+@dataclass
+class AsyncAuthorizerGoogle(AsyncAuthorizer):
+    """Authorize through Google"""
+
+    authorized: bool = field(default=False)
+    timeout: Optional[float] = None
+
+    async def verify_code(self, code: str) -> None:
+        """Verifys the provided code"""
+        self.authorized = True
+
+    def is_authorized(self) -> bool:
+        """Returns true if the caller is authorized"""
+        return self.authorized
+
+
+async def pay_many(
+    processor: AsyncPaymentProcessor, orders: Iterable[Order], concurrency: int = 16
+) -> list[Optional[BaseException]]:
+    """Pay many orders with at most concurrency payments in flight
+
+    Returns None for every paid order and the raised exception, including
+    asyncio.TimeoutError, for every order that was not. A PaymentPending
+    error means the payment was not confirmed in time but may still succeed.
+    """
+    if concurrency < 1:
+        raise ValueError("concurrency must be at least 1")
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def pay_one(order: Order) -> None:
+        async with semaphore:
+            await processor.pay_with_timeout(order)
+
+    return await asyncio.gather(*(pay_one(order) for order in orders), return_exceptions=True)
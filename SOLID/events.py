@@ -0,0 +1,123 @@
+"""This module records what payment processors and authorizers do
+
+Processors and authorizers report each outcome to an injected EventSink
+instead of printing it. ConsoleSink keeps the console output, NullSink
+drops everything and BufferedSink hands events to a handler in batches
+from a background thread.
+"""
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import deque
+from contextlib import suppress
+from dataclasses import dataclass
+from typing import Callable, Iterable, Optional
+
+
+@dataclass(frozen=True)
+class PaymentEvent:
+    """Something that happened to an order or an authorizer"""
+
+    source: str
+    outcome: str
+    order_id: Optional[int]
+    timestamp: float
+
+
+class EventSink(ABC):
+    """Receives payment events"""
+
+    @abstractmethod
+    def record(self, source: str, outcome: str, order_id: Optional[int] = None) -> None:
+        pass
+
+
+class NullSink(EventSink):
+    """Drops every event"""
+
+    def record(self, source: str, outcome: str, order_id: Optional[int] = None) -> None:
+        """Ignores the event"""
+
+
+class ConsoleSink(EventSink):
+    """Prints every event as it happens"""
+
+    def record(self, source: str, outcome: str, order_id: Optional[int] = None) -> None:
+        """Prints the event"""
+        self.write([PaymentEvent(source, outcome, order_id, time.time())])
+
+    def write(self, events: Iterable[PaymentEvent]) -> None:
+        """Prints a batch of events"""
+        for event in events:
+            order = "" if event.order_id is None else f" order {event.order_id}"
+            print(f"{event.source}: {event.outcome}{order}")
+
+
+class BufferedSink(EventSink):
+    """Keeps events in a ring buffer that a background thread flushes in batches
+
+    When the buffer is full the oldest event is dropped and counted in dropped.
+    Events of a batch the handler raised on are counted in failed, and the
+    background thread carries on with the next batch.
+    """
+
+    def __init__(
+        self,
+        handler: Callable[[list[PaymentEvent]], None],
+        capacity: int = 10_000,
+        batch_size: int = 512,
+        interval: float = 0.5,
+    ) -> None:
+        self.handler = handler
+        self.batch_size = batch_size
+        self.interval = interval
+        self.dropped = 0
+        self.failed = 0
+        self._buffer: deque[tuple] = deque(maxlen=capacity)
+        self._flush_lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._closed = False
+        self._thread = threading.Thread(target=self._run, name="event-sink", daemon=True)
+        self._thread.start()
+
+    def __enter__(self) -> "BufferedSink":
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        self.close()
+
+    def record(self, source: str, outcome: str, order_id: Optional[int] = None) -> None:
+        """Buffers the event without formatting it"""
+        buffer = self._buffer
+        if len(buffer) == buffer.maxlen:
+            self.dropped += 1
+        buffer.append((source, outcome, order_id, time.time()))
+        if len(buffer) >= self.batch_size:
+            self._wakeup.set()
+
+    def flush(self) -> None:
+        """Hands every buffered event to the handler, counting them in failed if it raises"""
+        with self._flush_lock:
+            buffer = self._buffer
+            batch = [PaymentEvent(*buffer.popleft()) for _ in range(len(buffer))]
+            if batch:
+                try:
+                    self.handler(batch)
+                except Exception:
+                    self.failed += len(batch)
+                    raise
+
+    def _run(self) -> None:
+        """Flushes the buffer every interval, or sooner once a batch is ready"""
+        while not self._closed:
+            self._wakeup.wait(self.interval)
+            self._wakeup.clear()
+            with suppress(Exception):
+                self.flush()
+
+    def close(self) -> None:
+        """Stops the background thread and flushes what is left"""
+        self._closed = True
+        self._wakeup.set()
+        self._thread.join()
+        self.flush()
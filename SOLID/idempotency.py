@@ -0,0 +1,146 @@
+"""This module makes retried payments with the same idempotency key run only once"""
+import math
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future
+from dataclasses import dataclass
+from typing import Any, Callable, Hashable, Optional
+
+from SOLID.dependency_inversion_after import PaymentProcessor
+from SOLID.order import Order
+
+
+class IdempotencyKeyReused(ValueError):
+    """Raised when a key is used again for a different request"""
+
+
+class IdempotencyTable:
+    """Remembers the outcome of the first call made with each key for ttl seconds
+
+    A call made while the first call with its key is still running waits for
+    that call and shares its outcome. Exceptions are outcomes too, so a
+    failed call is not retried until its key expires. A call stopped by any
+    other BaseException, such as KeyboardInterrupt, leaves no outcome: calls
+    waiting for it raise CancelledError and the next call with its key runs.
+    Holds at most maxsize
+    finished entries and evicts the least recently used one first; running
+    calls are never evicted. A call may pass a fingerprint of its request,
+    and reusing a key with another fingerprint raises IdempotencyKeyReused.
+    """
+
+    def __init__(
+        self,
+        ttl: float = 24 * 60 * 60.0,
+        maxsize: int = 100_000,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        if ttl <= 0 or maxsize < 1:
+            raise ValueError("ttl and maxsize must be positive")
+        self.ttl = ttl
+        self.maxsize = maxsize
+        self.clock = clock
+        self.hits = 0
+        self.misses = 0
+        self.waits = 0
+        self.evictions = 0
+        self.expirations = 0
+        self._expiry: OrderedDict[str, float] = OrderedDict()
+        self._outcomes: dict[str, Future] = {}
+        self._fingerprints: dict[str, Hashable] = {}
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._expiry)
+
+    @property
+    def hit_rate(self) -> float:
+        """Returns the share of calls answered without running them"""
+        calls = self.hits + self.misses
+        return self.hits / calls if calls else 0.0
+
+    def _forget(self, key: str) -> None:
+        """Removes one entry"""
+        del self._expiry[key]
+        del self._outcomes[key]
+        del self._fingerprints[key]
+
+    def _evict(self) -> None:
+        """Makes room for one entry by dropping the least recently used finished one"""
+        for key, expires in self._expiry.items():
+            if expires != math.inf:
+                self._forget(key)
+                self.evictions += 1
+                return
+
+    def run(self, key: str, call: Callable[[], Any], fingerprint: Hashable = None) -> Any:
+        """Returns the outcome of call, running it only if key has no outcome yet"""
+        with self._lock:
+            outcome = self._outcomes.get(key)
+            if outcome is not None and self._expiry[key] <= self.clock():
+                self._forget(key)
+                self.expirations += 1
+                outcome = None
+            if outcome is not None:
+                if self._fingerprints[key] != fingerprint:
+                    raise IdempotencyKeyReused(f"idempotency key {key!r} used for another request")
+                self._expiry.move_to_end(key)
+                self.hits += 1
+                self.waits += not outcome.done()
+                first = False
+            else:
+                self.misses += 1
+                if len(self._expiry) >= self.maxsize:
+                    self._evict()
+                outcome = self._outcomes[key] = Future()
+                self._expiry[key] = math.inf
+                self._fingerprints[key] = fingerprint
+                first = True
+        if not first:
+            return outcome.result()
+
+        try:
+            result = call()
+        except Exception as error:
+            outcome.set_exception(error)
+            raise
+        except BaseException:
+            with self._lock:
+                if self._outcomes.get(key) is outcome:
+                    self._forget(key)
+            outcome.cancel()
+            raise
+        else:
+            outcome.set_result(result)
+            return result
+        finally:
+            with self._lock:
+                if self._outcomes.get(key) is outcome:
+                    self._expiry[key] = self.clock() + self.ttl
+
+    def clear(self) -> None:
+        """Forgets every finished outcome"""
+        with self._lock:
+            for key, expires in list(self._expiry.items()):
+                if expires != math.inf:
+                    self._forget(key)
+
+
+@dataclass
+class IdempotentPaymentProcessor(PaymentProcessor):
+    """Pay through another processor at most once per idempotency key
+
+    Without a key every call goes straight to the wrapped processor. A key
+    belongs to the order it was first used with; using it to pay another
+    order raises IdempotencyKeyReused.
+    """
+
+    processor: PaymentProcessor
+    table: IdempotencyTable
+
+    def pay(self, order: Order, idempotency_key: Optional[str] = None) -> None:
+        """Pay the order, or wait for and repeat the outcome of an earlier call with the key"""
+        if idempotency_key is None:
+            self.processor.pay(order)
+        else:
+            self.table.run(idempotency_key, lambda: self.processor.pay(order), id(order))
@@ -0,0 +1,261 @@
+"""This module measures calls to pay and verify_code per processor and authorizer class
+
+Instrumentation is opt-in: instrument() replaces the pay and verify_code
+methods of the given classes with timed wrappers and uninstrument() puts the
+originals back, so classes that are not instrumented run their own methods
+with no overhead at all.
+"""
+import functools
+import math
+import threading
+import time
+from dataclasses import dataclass
+from typing import Any, Callable, Optional
+
+from SOLID.dependency_inversion_after import (
+    AuthorizerGoogle,
+    AuthorizerSMS,
+    CreditPaymentProcessor,
+    DebitPaymentProcessor,
+    PaypalPaymentProcessor,
+)
+
+METHODS = ("pay", "verify_code")
+QUANTILES = (0.5, 0.99, 0.999)
+DEFAULT_CLASSES = (
+    DebitPaymentProcessor,
+    CreditPaymentProcessor,
+    PaypalPaymentProcessor,
+    AuthorizerSMS,
+    AuthorizerGoogle,
+)
+
+
+class LatencyHistogram:
+    """Counts values in log-linear buckets, like an HDR histogram
+
+    Values below 2**precision get a bucket each. Above that every power of two
+    is split into 2**(precision - 1) buckets, so a bucket is never wider than
+    2**(1 - precision) of the values it holds.
+    """
+
+    def __init__(self, precision: int = 7) -> None:
+        if precision < 1:
+            raise ValueError("precision must be positive")
+        self.precision = precision
+        self.count = 0
+        self.total = 0
+        self.min: Optional[int] = None
+        self.max: Optional[int] = None
+        self._counts: list[int] = []
+
+    def _index(self, value: int) -> int:
+        """Returns the bucket of a value"""
+        shift = value.bit_length() - self.precision
+        if shift <= 0:
+            return value
+        return (shift << (self.precision - 1)) + (value >> shift)
+
+    def _highest(self, index: int) -> int:
+        """Returns the highest value that falls in a bucket"""
+        if index < 1 << self.precision:
+            return index
+        shift = (index >> (self.precision - 1)) - 1
+        return ((index - (shift << (self.precision - 1))) << shift) + (1 << shift) - 1
+
+    def record(self, value: int) -> None:
+        """Counts one value"""
+        if value < 0:
+            raise ValueError("histogram values must not be negative")
+        index = self._index(value)
+        counts = self._counts
+        if index >= len(counts):
+            counts.extend([0] * (index + 1 - len(counts)))
+        counts[index] += 1
+        self.count += 1
+        self.total += value
+        if self.min is None or value < self.min:
+            self.min = value
+        if self.max is None or value > self.max:
+            self.max = value
+
+    def percentile(self, quantile: float) -> int:
+        """Returns the value that quantile of the recorded values are at or below"""
+        if not 0 <= quantile <= 1:
+            raise ValueError("quantile must be between 0 and 1")
+        if not self.count:
+            return 0
+        rank = max(1, math.ceil(quantile * self.count))
+        seen = 0
+        for index, count in enumerate(self._counts):
+            seen += count
+            if seen >= rank:
+                return min(self._highest(index), self.max or 0)
+        return self.max or 0
+
+
+@dataclass(frozen=True)
+class CallSnapshot:
+    """Counts and latencies of one method of one class, in seconds"""
+
+    calls: int
+    errors: int
+    seconds: float
+    quantiles: dict[float, float]
+
+
+class CallStats:
+    """Counts calls and errors of one method and keeps a histogram of their latency"""
+
+    def __init__(self, precision: int = 7) -> None:
+        self.calls = 0
+        self.errors = 0
+        self.latency = LatencyHistogram(precision)
+        self._lock = threading.Lock()
+
+    def record(self, nanoseconds: int, failed: bool) -> None:
+        """Counts one call"""
+        with self._lock:
+            self.calls += 1
+            self.errors += failed
+            self.latency.record(nanoseconds)
+
+    def clear(self) -> None:
+        """Forgets every recorded call"""
+        with self._lock:
+            self.calls = 0
+            self.errors = 0
+            self.latency = LatencyHistogram(self.latency.precision)
+
+    def snapshot(self) -> CallSnapshot:
+        """Returns a copy of the counts with the latency percentiles"""
+        with self._lock:
+            return CallSnapshot(
+                calls=self.calls,
+                errors=self.errors,
+                seconds=self.latency.total / 1e9,
+                quantiles={q: self.latency.percentile(q) / 1e9 for q in QUANTILES},
+            )
+
+
+def _class_name(cls: type) -> str:
+    """Returns the module and qualified name of a class"""
+    return f"{cls.__module__}.{cls.__qualname__}"
+
+
+class Instrumentation:
+    """Times pay and verify_code per class while instrumented
+
+    Errors are calls that raised, such as the Not authorized exception of a
+    processor whose authorizer has not verified a code. Stats are keyed by
+    the module and qualified name of each class.
+    """
+
+    def __init__(self, clock: Callable[[], int] = time.perf_counter_ns, precision: int = 7) -> None:
+        self.clock = clock
+        self.precision = precision
+        self.stats: dict[tuple[str, str], CallStats] = {}
+        self._patched: list[tuple[type, str, Optional[Any]]] = []
+        self._lock = threading.Lock()
+
+    def __enter__(self) -> "Instrumentation":
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        self.uninstrument()
+
+    def _timed(self, method: Callable[..., Any], stats: CallStats) -> Callable[..., Any]:
+        """Returns method wrapped to record every call in stats"""
+        clock = self.clock
+
+        @functools.wraps(method)
+        def timed(*args: Any, **kwargs: Any) -> Any:
+            started = clock()
+            failed = True
+            try:
+                result = method(*args, **kwargs)
+                failed = False
+                return result
+            finally:
+                stats.record(clock() - started, failed)
+
+        timed._instrumented_by = self  # type: ignore[attr-defined]
+        return timed
+
+    def instrument(self, *classes: type) -> None:
+        """Times the pay and verify_code methods of the classes
+
+        Without classes the processors and authorizers of
+        dependency_inversion_after are instrumented, but not the wrappers
+        around them, whose calls would otherwise be counted twice.
+        """
+        if not classes:
+            classes = DEFAULT_CLASSES
+        with self._lock:
+            for cls in classes:
+                for name in METHODS:
+                    method = getattr(cls, name, None)
+                    if method is None:
+                        continue
+                    owner = getattr(method, "_instrumented_by", None)
+                    if owner is not None and owner is not self:
+                        raise ValueError(f"{_class_name(cls)}.{name} is already instrumented")
+                    if name in cls.__dict__ and owner is self:
+                        continue
+                    method = getattr(method, "__wrapped__", method) if owner else method
+                    stats = self.stats.setdefault(
+                        (_class_name(cls), name), CallStats(self.precision)
+                    )
+                    self._patched.append((cls, name, cls.__dict__.get(name)))
+                    setattr(cls, name, self._timed(method, stats))
+
+    def uninstrument(self) -> None:
+        """Restores every method instrument replaced, keeping the recorded stats"""
+        with self._lock:
+            for cls, name, original in reversed(self._patched):
+                if original is None:
+                    delattr(cls, name)
+                else:
+                    setattr(cls, name, original)
+            self._patched.clear()
+
+    def reset(self) -> None:
+        """Forgets every recorded call"""
+        for stats in self.stats.values():
+            stats.clear()
+
+    def snapshot(self) -> dict[tuple[str, str], CallSnapshot]:
+        """Returns the stats of every instrumented (class, method) pair"""
+        return {key: stats.snapshot() for key, stats in self.stats.items()}
+
+    def to_prometheus(self, prefix: str = "solid") -> str:
+        """Returns a snapshot in the Prometheus text exposition format"""
+        snapshot = self.snapshot()
+        calls = [
+            f"# HELP {prefix}_calls_total Calls by class and method",
+            f"# TYPE {prefix}_calls_total counter",
+        ]
+        errors = [
+            f"# HELP {prefix}_errors_total Calls that raised by class and method",
+            f"# TYPE {prefix}_errors_total counter",
+        ]
+        latency = [
+            f"# HELP {prefix}_latency_seconds Call latency by class and method",
+            f"# TYPE {prefix}_latency_seconds summary",
+        ]
+        for (cls, method), call in sorted(snapshot.items()):
+            labels = f'class="{_escape(cls)}",method="{_escape(method)}"'
+            calls.append(f"{prefix}_calls_total{{{labels}}} {call.calls}")
+            errors.append(f"{prefix}_errors_total{{{labels}}} {call.errors}")
+            for quantile, seconds in call.quantiles.items():
+                latency.append(
+                    f'{prefix}_latency_seconds{{{labels},quantile="{quantile}"}} {seconds!r}'
+                )
+            latency.append(f"{prefix}_latency_seconds_sum{{{labels}}} {call.seconds!r}")
+            latency.append(f"{prefix}_latency_seconds_count{{{labels}}} {call.calls}")
+        return "\n".join(calls + errors + latency) + "\n"
+
+
+def _escape(value: str) -> str:
+    """Escapes a Prometheus label value"""
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
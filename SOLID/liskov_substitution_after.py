@@ -19,9 +19,11 @@ application would still work.
 
 """
 from abc import ABC, abstractmethod
-from dataclasses import dataclass
+from dataclasses import dataclass, field
+from typing import Iterable
 
-from SOLID.order import Order
+from SOLID.events import ConsoleSink, EventSink
+from SOLID.order import Order, OrderNotOpen
 
 
 class PaymentProcessor(ABC):
@@ -31,18 +33,32 @@ class PaymentProcessor(ABC):
     def pay(self, order: Order) -> None:
         pass
 
+    def pay_many(self, orders: Iterable[Order]) -> list[bool]:
+        """Pay every order in a batch and return whether each one was paid"""
+        outcomes = []
+        for order in orders:
+            try:
+                self.pay(order)
+            except Exception:
+                outcomes.append(False)
+            else:
+                outcomes.append(True)
+        return outcomes
+
 
 @dataclass
 class DebitPaymentProcessor(PaymentProcessor):
     """Processes payments with debit cards"""
 
     security_code: str
+    sink: EventSink = field(default_factory=ConsoleSink)
 
     def pay(self, order: Order) -> None:
         """Pay the order with debit card"""
-        print("processing debit payment type")
-        print(f"Verifying security code: {self.security_code}")
-        order.status = "paid"
+        if not order.settle():
+            self.sink.record("debit", "not open", id(order))
+            raise OrderNotOpen(f"order is {order.status}")
+        self.sink.record("debit", "paid", id(order))
 
 
 @dataclass
@@ -50,12 +66,14 @@ class CreditPaymentProcessor(PaymentProcessor):
     """Processes payments with credit cards"""
 
     security_code: str
+    sink: EventSink = field(default_factory=ConsoleSink)
 
     def pay(self, order: Order) -> None:
         """Pay the order with a credit card"""
-        print("processing credit payment type")
-        print(f"Verifying security code: {self.security_code}")
-        order.status = "paid"
+        if not order.settle():
+            self.sink.record("credit", "not open", id(order))
+            raise OrderNotOpen(f"order is {order.status}")
+        self.sink.record("credit", "paid", id(order))
 
 
 @dataclass
@@ -63,9 +81,11 @@ class PaypalPaymentProcessor(PaymentProcessor):
     """Processes payments with a paypal account"""
 
     email_address: str
+    sink: EventSink = field(default_factory=ConsoleSink)
 
     def pay(self, order: Order) -> None:
         """Pay the order with an email"""
-        print("Processing paypal payment type")
-        print(f"Using email address: {self.email_address}")
-        order.status = "paid"
+        if not order.settle():
+            self.sink.record("paypal", "not open", id(order))
+            raise OrderNotOpen(f"order is {order.status}")
+        self.sink.record("paypal", "paid", id(order))
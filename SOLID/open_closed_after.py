@@ -16,26 +16,44 @@ can be extended with subclasses.
 
 """
 from abc import ABC, abstractmethod
+from typing import Iterable, Optional
 
-from SOLID.order import Order
+from SOLID.events import ConsoleSink, EventSink
+from SOLID.order import Order, OrderNotOpen
 
 
 class PaymentProcessor(ABC):
     """Process the payment of a given order"""
 
+    def __init__(self, sink: Optional[EventSink] = None) -> None:
+        self.sink = ConsoleSink() if sink is None else sink
+
     @abstractmethod
     def pay(self, order: Order, security_code: str) -> None:
         pass
 
+    def pay_many(self, orders: Iterable[Order], security_code: str) -> list[bool]:
+        """Pay every order in a batch and return whether each one was paid"""
+        outcomes = []
+        for order in orders:
+            try:
+                self.pay(order, security_code)
+            except Exception:
+                outcomes.append(False)
+            else:
+                outcomes.append(True)
+        return outcomes
+
 
 class DebitPaymentProcessor(PaymentProcessor):
     """Processes payments with debit cards"""
 
     def pay(self, order: Order, security_code: str) -> None:
         """Pay the order with debit card"""
-        print("processing debit payment type")
-        print(f"Verifying security code: {security_code}")
-        order.status = "paid"
+        if not order.settle():
+            self.sink.record("debit", "not open", id(order))
+            raise OrderNotOpen(f"order is {order.status}")
+        self.sink.record("debit", "paid", id(order))
 
 
 class CreditPaymentProcessor(PaymentProcessor):
@@ -43,6 +61,7 @@ class CreditPaymentProcessor(PaymentProcessor):
 
     def pay(self, order: Order, security_code: str) -> None:
         """Pay the order with a credit card"""
-        print("processing credit payment type")
-        print(f"Verifying security code: {security_code}")
-        order.status = "paid"
+        if not order.settle():
+            self.sink.record("credit", "not open", id(order))
+            raise OrderNotOpen(f"order is {order.status}")
+        self.sink.record("credit", "paid", id(order))
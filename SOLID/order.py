@@ -1,22 +1,328 @@
 """This module handles orders within the system"""
-from dataclasses import dataclass, field
+import threading
+from dataclasses import InitVar, dataclass, field
+from enum import StrEnum
+from operator import mul
+from typing import Any, Callable, Iterable, Optional
+
+_INTEGER_FORMATS = frozenset("bBhHiIlLqQnN")
+
+
+def _only(values: list, kind: type) -> bool:
+    """Returns true if every value is an instance of kind"""
+    return set(map(type, values)) <= {kind} or all(isinstance(value, kind) for value in values)
+
+
+def _as_int_list(values: Iterable[int]) -> tuple[list[int], bool]:
+    """Returns values as a list and whether they are already known to be integers
+
+    Buffer-protocol arrays are read in one call instead of element by element.
+    """
+    if not isinstance(values, list):
+        try:
+            view = memoryview(values)  # type: ignore[arg-type]
+        except TypeError:
+            return list(values), False
+        return view.tolist(), view.format in _INTEGER_FORMATS
+    return values, False
+
+
+def collect_lines(
+    items: Iterable[Any],
+    quantites: Optional[Iterable[int]] = None,
+    prices: Optional[Iterable[int]] = None,
+) -> tuple[list[str], list[int], list[int]]:
+    """Validates a batch of order lines and returns it as three parallel lists
+
+    items is either an iterable of (name, quantity, price) tuples or, when
+    quantites and prices are given, the item names parallel to them.
+    """
+    if quantites is None and prices is None:
+        names: list[str] = []
+        quantities: list[int] = []
+        costs: list[int] = []
+        add_name, add_quantity, add_cost = names.append, quantities.append, costs.append
+        try:
+            for name, quantity, price in items:
+                add_name(name)
+                add_quantity(quantity)
+                add_cost(price)
+        except (TypeError, ValueError):
+            raise ValueError("order lines must be (name, quantity, price) tuples") from None
+        checked = False
+    elif quantites is None or prices is None:
+        raise ValueError("quantites and prices must be given together")
+    else:
+        names = list(items)
+        quantities, quantities_checked = _as_int_list(quantites)
+        costs, costs_checked = _as_int_list(prices)
+        if not len(names) == len(quantities) == len(costs):
+            raise ValueError("items, quantites and prices must have the same length")
+        checked = quantities_checked and costs_checked
+    if not _only(names, str):
+        raise TypeError("item names must be strings")
+    if not checked and not (_only(quantities, int) and _only(costs, int)):
+        raise TypeError("quantities and prices must be integers")
+    return names, quantities, costs
+
+
+class OrderStatus(StrEnum):
+    """The states an order moves through while it is paid"""
+
+    OPEN = "open"
+    AUTHORIZING = "authorizing"
+    PAID = "paid"
+    FAILED = "failed"
+    REFUNDED = "refunded"
+
+
+class OrderNotOpen(Exception):
+    """Raised when an order cannot be paid because it is not open"""
+
+
+TRANSITIONS: dict[str, frozenset[str]] = {
+    OrderStatus.OPEN: frozenset({OrderStatus.AUTHORIZING}),
+    OrderStatus.AUTHORIZING: frozenset({OrderStatus.PAID, OrderStatus.FAILED, OrderStatus.OPEN}),
+    OrderStatus.FAILED: frozenset({OrderStatus.AUTHORIZING, OrderStatus.OPEN}),
+    OrderStatus.PAID: frozenset({OrderStatus.REFUNDED}),
+    OrderStatus.REFUNDED: frozenset(),
+}
+
+# Orders are striped over a few locks rather than holding one each, which
+# keeps them picklable
+_STATUS_LOCKS = tuple(threading.RLock() for _ in range(64))
+
+
+class StatusMachine:
+    """Moves the status of an order only along the TRANSITIONS table
+
+    Assigning to status directly still overrides it unchecked, which is how
+    logs and codecs restore an order.
+    """
+
+    __slots__ = ()
+
+    status: str
+
+    def transition(self, expected: str, status: str) -> bool:
+        """Moves the order from expected to status if it is still in expected
+
+        Returns false, changing nothing, when another caller moved the order
+        first. Raises ValueError for a move the TRANSITIONS table forbids.
+        """
+        if status not in TRANSITIONS.get(expected, ()):
+            raise ValueError(f"order cannot go from {expected} to {status}")
+        with _STATUS_LOCKS[id(self) % len(_STATUS_LOCKS)]:
+            if self.status != expected:
+                return False
+            self.status = OrderStatus(status)  # type: ignore[misc]
+        return True
+
+    def settle(self, charge: Optional[Callable[[], None]] = None) -> bool:
+        """Pays the order unless another payment got to it first
+
+        Claims an open or failed order by moving it to authorizing, calls
+        charge, then marks it paid. If charge raises the order is marked
+        failed and can be paid again. Returns false without calling charge
+        when the order could not be claimed.
+        """
+        if not (
+            self.transition(OrderStatus.OPEN, OrderStatus.AUTHORIZING)
+            or self.transition(OrderStatus.FAILED, OrderStatus.AUTHORIZING)
+        ):
+            return False
+        try:
+            if charge is not None:
+                charge()
+        except BaseException:
+            self.transition(OrderStatus.AUTHORIZING, OrderStatus.FAILED)
+            raise
+        self.transition(OrderStatus.AUTHORIZING, OrderStatus.PAID)
+        return True
+
+
+class OrderWatcher:
+    """Is told about every change made to the orders it watches"""
+
+    def items_added(
+        self, order: "Order", names: list[str], quantities: list[int], prices: list[int]
+    ) -> None:
+        """Called after lines are appended to the order"""
+
+    def quantity_updated(self, order: "Order", index: int, quantity: int) -> None:
+        """Called after the quantity of the line at index changes"""
+
+    def item_removed(self, order: "Order", index: int, name: str) -> None:
+        """Called after the line at index is removed"""
+
+    def status_changed(self, order: "Order", old: str, new: str) -> None:
+        """Called after the status of the order changes"""
+
+
+class _WatchedStatus:
+    """The status of an order, reported to its watchers whenever it is set"""
+
+    def __get__(self, order: Optional["Order"], owner: Optional[type] = None) -> str:
+        if order is None:
+            return "open"
+        return order.__dict__.get("_status", "open")
+
+    def __set__(self, order: "Order", status: str) -> None:
+        old = order.__dict__.get("_status", "open")
+        order.__dict__["_status"] = status
+        for watcher in order._watchers:
+            watcher.status_changed(order, old, status)
 
 
 @dataclass
-class Order:
-    """An Order within the system"""
+class Order(StatusMachine):
+    """An Order within the system
+
+    With coalesce set, adding an item that already has a line at the same
+    price raises the quantity of that line instead of appending a new one.
+    """
 
     items: list[str] = field(default_factory=list)
     quantites: list[int] = field(default_factory=list)
     prices: list[int] = field(default_factory=list)
-    status: str = field(default="open", init=False)
+    coalesce: InitVar[bool] = False
+    status: str = field(default=_WatchedStatus(), init=False)  # type: ignore[assignment]
+    _total: int = field(default=0, init=False, repr=False, compare=False)
+    _watchers: tuple[OrderWatcher, ...] = field(default=(), init=False, repr=False, compare=False)
+    _lines: Optional[dict[tuple[str, int], int]] = field(
+        default=None, init=False, repr=False, compare=False
+    )
+
+    def __post_init__(self, coalesce: bool) -> None:
+        self._total = sum(quantity * price for quantity, price in zip(self.quantites, self.prices))
+        if coalesce:
+            self._lines = {}
+            self.compact()
+
+    @property
+    def coalescing(self) -> bool:
+        """Returns true if repeated items are merged into their existing line"""
+        return self._lines is not None
 
     def add_item(self, name: str, quantity: int, price: int) -> None:
         """Adds an item to the order"""
+        lines = self._lines
+        if lines is not None:
+            index = lines.get((name, price))
+            if index is not None:
+                self.update_quantity(index, self.quantites[index] + quantity)
+                return
+            lines[name, price] = len(self.items)
         self.items.append(name)
         self.quantites.append(quantity)
         self.prices.append(price)
+        self._total += quantity * price
+        for watcher in self._watchers:
+            watcher.items_added(self, [name], [quantity], [price])
+
+    def add_items(
+        self,
+        items: Iterable[Any],
+        quantites: Optional[Iterable[int]] = None,
+        prices: Optional[Iterable[int]] = None,
+    ) -> None:
+        """Adds a batch of items to the order, validating the whole batch first"""
+        names, quantities, costs = collect_lines(items, quantites, prices)
+        if self._lines is not None:
+            names, quantities, costs = self._merge(self._lines, names, quantities, costs)
+            if not names:
+                return
+        self.items.extend(names)
+        self.quantites.extend(quantities)
+        self.prices.extend(costs)
+        self._total += sum(map(mul, quantities, costs))
+        for watcher in self._watchers:
+            watcher.items_added(self, names, quantities, costs)
+
+    def update_quantity(self, index: int, quantity: int) -> None:
+        """Changes the quantity of the line at index"""
+        self._total += (quantity - self.quantites[index]) * self.prices[index]
+        self.quantites[index] = quantity
+        for watcher in self._watchers:
+            watcher.quantity_updated(self, index, quantity)
+
+    def _merge(
+        self,
+        lines: dict[tuple[str, int], int],
+        names: list[str],
+        quantities: list[int],
+        costs: list[int],
+    ) -> tuple[list[str], list[int], list[int]]:
+        """Adds the lines that already exist to their quantities and returns the new lines"""
+        merged: dict[tuple[str, int], int] = {}
+        for name, quantity, price in zip(names, quantities, costs):
+            merged[name, price] = merged.get((name, price), 0) + quantity
+        new_names: list[str] = []
+        new_quantities: list[int] = []
+        new_costs: list[int] = []
+        for key, quantity in merged.items():
+            index = lines.get(key)
+            if index is None:
+                lines[key] = len(self.items) + len(new_names)
+                new_names.append(key[0])
+                new_quantities.append(quantity)
+                new_costs.append(key[1])
+            else:
+                self.update_quantity(index, self.quantites[index] + quantity)
+        return new_names, new_quantities, new_costs
+
+    def remove_item(self, index: int) -> None:
+        """Removes the line at index from the order"""
+        name = self.items.pop(index)
+        price = self.prices.pop(index)
+        self._total -= self.quantites.pop(index) * price
+        lines = self._lines
+        if lines is not None:
+            del lines[name, price]
+            start = index if index >= 0 else index + len(self.items) + 1
+            for later in range(start, len(self.items)):
+                lines[self.items[later], self.prices[later]] = later
+        for watcher in self._watchers:
+            watcher.item_removed(self, index, name)
+
+    def compact(self) -> None:
+        """Merges lines with the same item and price into the first of them
+
+        The total does not change. Watchers are told about the merge as
+        quantity updates of the kept lines followed by removals of the merged
+        lines, last line first.
+        """
+        first: dict[tuple[str, int], int] = {}
+        quantities = list(self.quantites)
+        merged: list[int] = []
+        for index, key in enumerate(zip(self.items, self.prices)):
+            kept = first.setdefault(key, index)
+            if kept != index:
+                quantities[kept] += quantities[index]
+                merged.append(index)
+        if merged:
+            updated = sorted({first[self.items[index], self.prices[index]] for index in merged})
+            removed = [(index, self.items[index]) for index in reversed(merged)]
+            kept_lines = sorted(first.values())
+            self.items[:] = [self.items[index] for index in kept_lines]
+            self.quantites[:] = [quantities[index] for index in kept_lines]
+            self.prices[:] = [self.prices[index] for index in kept_lines]
+            for watcher in self._watchers:
+                for index in updated:
+                    watcher.quantity_updated(self, index, quantities[index])
+                for index, name in removed:
+                    watcher.item_removed(self, index, name)
+        if self._lines is not None:
+            self._lines = {key: index for index, key in enumerate(zip(self.items, self.prices))}
 
     def total_price(self) -> int:
-        """Calculates and returns the total price of the order"""
-        return sum([quantity * price for quantity, price in zip(self.quantites, self.prices)])
+        """Returns the total price of the order"""
+        return self._total
+
+    def watch(self, watcher: OrderWatcher) -> None:
+        """Tells watcher about every later change to the order"""
+        self._watchers += (watcher,)
+
+    def unwatch(self, watcher: OrderWatcher) -> None:
+        """Stops telling watcher about changes to the order"""
+        self._watchers = tuple(each for each in self._watchers if each is not watcher)
@@ -0,0 +1,102 @@
+"""This module totals many orders at once
+
+NumPy is optional. Without it, or when values do not fit in int64, totals
+are computed exactly with Python ints.
+"""
+from operator import mul
+from typing import Any, Iterable, Sequence, Union
+
+from SOLID.compact_order import CompactOrder
+from SOLID.order import Order
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover - exercised when numpy is not installed
+    np = None  # type: ignore[assignment]
+
+# Segments whose worst case total reaches this bound are recomputed exactly
+_INT64_SAFE_BOUND = float(2**62)
+
+
+class OrderBatch:
+    """Many orders packed into contiguous quantity, price and offset columns
+
+    The lines of order i are quantities[offsets[i]:offsets[i + 1]].
+    """
+
+    def __init__(
+        self, quantities: Sequence[int], prices: Sequence[int], offsets: Sequence[int]
+    ) -> None:
+        if len(quantities) != len(prices):
+            raise ValueError("quantities and prices must have the same length")
+        if len(offsets) == 0 or offsets[0] != 0 or offsets[-1] != len(quantities):
+            raise ValueError("offsets must start at 0 and end at the number of lines")
+        self.quantities: Any = quantities
+        self.prices: Any = prices
+        self.offsets: Any = offsets
+        self.vectorized = False
+        if np is not None:
+            try:
+                self.quantities = np.asarray(quantities, dtype=np.int64)
+                self.prices = np.asarray(prices, dtype=np.int64)
+            except OverflowError:
+                self.quantities, self.prices = list(quantities), list(prices)
+            else:
+                self.offsets = np.asarray(offsets, dtype=np.int64)
+                self.vectorized = True
+
+    @classmethod
+    def from_orders(cls, orders: Iterable[Union[Order, CompactOrder]]) -> "OrderBatch":
+        """Packs the lines of every order into one batch"""
+        quantities: list[int] = []
+        prices: list[int] = []
+        offsets = [0]
+        for order in orders:
+            quantities.extend(order.quantites)
+            prices.extend(order.prices)
+            offsets.append(len(quantities))
+        return cls(quantities, prices, offsets)
+
+    def __len__(self) -> int:
+        return len(self.offsets) - 1
+
+    def _exact_total(self, index: int) -> int:
+        """Returns the total of one order using Python ints"""
+        start, stop = int(self.offsets[index]), int(self.offsets[index + 1])
+        quantities = self.quantities[start:stop]
+        prices = self.prices[start:stop]
+        if self.vectorized:
+            quantities, prices = quantities.tolist(), prices.tolist()
+        return sum(map(mul, quantities, prices))
+
+    def totals(self) -> list[int]:
+        """Returns the total price of every order in the batch"""
+        if not self.vectorized:
+            return [self._exact_total(index) for index in range(len(self))]
+
+        starts, stops = self.offsets[:-1], self.offsets[1:]
+        nonempty = stops > starts
+        totals = np.zeros(len(self), dtype=np.int64)
+        if not nonempty.any():
+            return totals.tolist()
+
+        # Empty segments hold no lines, so reducing from one non-empty start
+        # to the next covers exactly one order
+        segment_starts = starts[nonempty]
+        totals[nonempty] = np.add.reduceat(self.quantities * self.prices, segment_starts)
+
+        # Bound every order by lines * max |quantity| * max |price| to find
+        # the ones whose int64 arithmetic may have wrapped
+        largest_quantity = np.maximum.reduceat(
+            np.abs(self.quantities.astype(float)), segment_starts
+        )
+        largest_price = np.maximum.reduceat(np.abs(self.prices.astype(float)), segment_starts)
+        lines = (stops - starts)[nonempty].astype(float)
+        at_risk = np.flatnonzero(nonempty)[
+            lines * largest_quantity * largest_price >= _INT64_SAFE_BOUND
+        ]
+
+        results = totals.tolist()
+        for index in at_risk.tolist():
+            results[index] = self._exact_total(index)
+        return results
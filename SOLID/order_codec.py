@@ -0,0 +1,160 @@
+"""This module encodes orders in a compact, versioned binary format
+
+Layout, little-endian, with every column aligned to 8 bytes:
+
+    header        magic, version, status length, line count, name count,
+                  string table length
+    status        UTF-8
+    string table  uint32 offsets of every item name, then the UTF-8 names
+    codes         uint32 index into the string table for every line
+    quantites     int64 for every line
+    prices        int64 for every line
+
+from_buffer reads the numeric columns through memoryview casts, so a
+received buffer is never copied to total it. Version 1 buffers, which have
+no padding between the status and the string table, are still read.
+"""
+import struct
+import sys
+from array import array
+from operator import mul
+from typing import Optional, Union
+
+from SOLID.compact_order import CompactOrder
+from SOLID.order import Order
+
+MAGIC = b"ORDR"
+VERSION = 2
+
+_HEADER = struct.Struct("<4sHHIIQ")
+
+
+def _aligned(offset: int) -> int:
+    """Returns offset rounded up to the next multiple of 8"""
+    return (offset + 7) & ~7
+
+
+def _column(values: array) -> bytes:
+    """Returns a column in little-endian byte order"""
+    if sys.byteorder == "big":
+        values = array(values.typecode, values)
+        values.byteswap()
+    return values.tobytes()
+
+
+def to_bytes(order: Union[Order, CompactOrder]) -> bytes:
+    """Encodes an order"""
+    if isinstance(order, CompactOrder):
+        names, codes = order._names, order._codes
+        quantites, prices = order.quantites, order.prices
+    else:
+        codes_by_name: dict[str, int] = {}
+        codes = array(
+            "I", [codes_by_name.setdefault(name, len(codes_by_name)) for name in order.items]
+        )
+        names = list(codes_by_name)
+        quantites, prices = array("q", order.quantites), array("q", order.prices)
+
+    encoded_names = [name.encode() for name in names]
+    offsets = array("I", [0])
+    for encoded in encoded_names:
+        offsets.append(offsets[-1] + len(encoded))
+    strings = _column(offsets) + b"".join(encoded_names)
+    status = order.status.encode()
+
+    parts = [_HEADER.pack(MAGIC, VERSION, len(status), len(codes), len(names), len(strings))]
+    size = _HEADER.size + len(status)
+    parts += [status, bytes(_aligned(size) - size), strings]
+    size = _aligned(size) + len(strings)
+    parts.append(bytes(_aligned(size) - size))
+    parts.append(_column(codes))
+    size = _aligned(size) + 4 * len(codes)
+    parts.append(bytes(_aligned(size) - size))
+    parts += [_column(quantites), _column(prices)]
+    return b"".join(parts)
+
+
+class OrderView:
+    """A read-only order backed by an encoded buffer"""
+
+    __slots__ = ("status", "quantites", "prices", "_codes", "_names", "_strings", "_offsets")
+
+    def __init__(
+        self,
+        status: str,
+        quantites: memoryview,
+        prices: memoryview,
+        codes: memoryview,
+        offsets: memoryview,
+        strings: memoryview,
+    ) -> None:
+        self.status = status
+        self.quantites = quantites
+        self.prices = prices
+        self._codes = codes
+        self._offsets = offsets
+        self._strings = strings
+        self._names: Optional[list[str]] = None
+
+    @property
+    def items(self) -> list[str]:
+        """Returns the item name of every line, decoding the string table on first use"""
+        if self._names is None:
+            offsets, strings = self._offsets, self._strings
+            self._names = [
+                bytes(strings[start:stop]).decode() for start, stop in zip(offsets, offsets[1:])
+            ]
+        names = self._names
+        return [names[code] for code in self._codes]
+
+    def total_price(self) -> int:
+        """Calculates and returns the total price of the order"""
+        return sum(map(mul, self.quantites, self.prices))
+
+    def to_order(self) -> Order:
+        """Copies the view into an Order"""
+        order = Order(self.items, self.quantites.tolist(), self.prices.tolist())
+        order.status = self.status
+        return order
+
+
+def _cast(data: memoryview, typecode: str) -> memoryview:
+    """Returns a little-endian column as native values, copying only on big-endian hosts"""
+    if sys.byteorder == "big":
+        values = array(typecode, data.tobytes())
+        values.byteswap()
+        return memoryview(values)
+    return data.cast(typecode)
+
+
+def from_buffer(buffer: Union[bytes, bytearray, memoryview]) -> OrderView:
+    """Decodes an order without copying its numeric columns"""
+    data = memoryview(buffer).cast("B")
+    if len(data) < _HEADER.size:
+        raise ValueError("buffer is too short for an order")
+    magic, version, status_size, lines, name_count, strings_size = _HEADER.unpack_from(data)
+    if magic != MAGIC:
+        raise ValueError("buffer does not hold an order")
+    if version not in (1, VERSION):
+        raise ValueError(f"unsupported order format version: {version}")
+
+    status_start = _HEADER.size
+    status_end = status_start + status_size
+    offsets_start = status_end if version == 1 else _aligned(status_end)
+    offsets_end = offsets_start + 4 * (name_count + 1)
+    strings_end = offsets_start + strings_size
+    codes_start = _aligned(strings_end)
+    codes_end = codes_start + 4 * lines
+    quantites_start = _aligned(codes_end)
+    prices_start = quantites_start + 8 * lines
+    if len(data) != prices_start + 8 * lines:
+        raise ValueError("buffer length does not match the order header")
+
+    return OrderView(
+        status=bytes(data[status_start:status_end]).decode(),
+        quantites=_cast(data[quantites_start:prices_start], "q"),
+        prices=_cast(data[prices_start:], "q"),
+        codes=_cast(data[codes_start:codes_end], "I"),
+        offsets=_cast(data[offsets_start:offsets_end], "I"),
+        strings=data[offsets_end:strings_end],
+    )
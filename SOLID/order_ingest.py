@@ -0,0 +1,164 @@
+"""This module streams order lines from CSV and JSONL files through pipeline stages
+
+Files are read in chunks of rows and lines are grouped into one Order per
+order id as they arrive, so memory use depends on the chunk size and the
+largest order, never on the size of the file. Lines of one order must be
+next to each other in the file.
+
+Every row is (order_id, item, quantity, price). CSV files need a header
+naming those columns; JSONL files hold one object per line with those keys.
+"""
+import csv
+import json
+import time
+from dataclasses import dataclass
+from itertools import islice
+from typing import Callable, Iterable, Iterator, Optional, Union
+
+from SOLID.dependency_inversion_after import PaymentProcessor
+from SOLID.order import Order
+
+Row = tuple[str, str, int, int]
+OrderStream = Iterator[tuple[str, Order]]
+Stage = Callable[[OrderStream], OrderStream]
+
+COLUMNS = ("order_id", "item", "quantity", "price")
+
+
+def _chunks(rows: Iterable[Row], chunk_size: int) -> Iterator[list[Row]]:
+    """Splits rows into lists of at most chunk_size rows"""
+    rows = iter(rows)
+    while chunk := list(islice(rows, chunk_size)):
+        yield chunk
+
+
+def read_csv(path: str, chunk_size: int = 10_000) -> Iterator[list[Row]]:
+    """Streams the rows of a CSV file in chunks"""
+    with open(path, newline="") as file:
+        reader = csv.reader(file)
+        header = next(reader, None)
+        if header is None:
+            return
+        try:
+            columns = [header.index(column) for column in COLUMNS]
+        except ValueError:
+            raise ValueError(f"CSV header must name the columns {', '.join(COLUMNS)}") from None
+        order_id, item, quantity, price = columns
+        rows = ((row[order_id], row[item], int(row[quantity]), int(row[price])) for row in reader)
+        yield from _chunks(rows, chunk_size)
+
+
+def read_jsonl(path: str, chunk_size: int = 10_000) -> Iterator[list[Row]]:
+    """Streams the rows of a JSON lines file in chunks"""
+    with open(path) as file:
+        records = (json.loads(line) for line in file if line.strip())
+        rows = (
+            (str(record["order_id"]), record["item"], record["quantity"], record["price"])
+            for record in records
+        )
+        yield from _chunks(rows, chunk_size)
+
+
+def group_orders(chunks: Iterable[list[Row]]) -> OrderStream:
+    """Groups consecutive rows with the same order id into one Order"""
+    current_id: Optional[str] = None
+    lines: list[tuple[str, int, int]] = []
+    for chunk in chunks:
+        for order_id, item, quantity, price in chunk:
+            if order_id != current_id:
+                if current_id is not None:
+                    order = Order()
+                    order.add_items(lines)
+                    yield current_id, order
+                current_id, lines = order_id, []
+            lines.append((item, quantity, price))
+    if current_id is not None:
+        order = Order()
+        order.add_items(lines)
+        yield current_id, order
+
+
+@dataclass
+class Totals:
+    """Stage that adds up the total price of every order passing through"""
+
+    orders: int = 0
+    total: int = 0
+
+    def __call__(self, stream: OrderStream) -> OrderStream:
+        for order_id, order in stream:
+            self.orders += 1
+            self.total += order.total_price()
+            yield order_id, order
+
+
+@dataclass
+class StatusFilter:
+    """Stage that only passes orders with one of the given statuses"""
+
+    statuses: frozenset[str] = frozenset({"open"})
+
+    def __call__(self, stream: OrderStream) -> OrderStream:
+        statuses = self.statuses
+        return ((order_id, order) for order_id, order in stream if order.status in statuses)
+
+
+@dataclass
+class Settle:
+    """Stage that pays orders in batches with PaymentProcessor.pay_many"""
+
+    processor: PaymentProcessor
+    batch_size: int = 1000
+    paid: int = 0
+    failed: int = 0
+
+    def __call__(self, stream: OrderStream) -> OrderStream:
+        while batch := list(islice(stream, self.batch_size)):
+            outcomes = self.processor.pay_many([order for _, order in batch])
+            paid = sum(outcomes)
+            self.paid += paid
+            self.failed += len(outcomes) - paid
+            yield from batch
+
+
+@dataclass
+class IngestStats:
+    """What one run of the pipeline processed and how fast"""
+
+    rows: int = 0
+    orders: int = 0
+    seconds: float = 0.0
+
+    @property
+    def rows_per_second(self) -> float:
+        """Returns the ingestion throughput"""
+        return self.rows / self.seconds if self.seconds else 0.0
+
+
+def run(
+    source: Union[str, Iterable[list[Row]]],
+    stages: Iterable[Stage] = (),
+    chunk_size: int = 10_000,
+) -> IngestStats:
+    """Streams a file, or chunks of rows, through the stages and returns statistics
+
+    Files ending in .jsonl are read as JSON lines, other files as CSV.
+    """
+    if isinstance(source, str):
+        reader = read_jsonl if source.endswith(".jsonl") else read_csv
+        source = reader(source, chunk_size)
+    stats = IngestStats()
+    started = time.perf_counter()
+
+    def counted(chunks: Iterable[list[Row]]) -> Iterator[list[Row]]:
+        for chunk in chunks:
+            stats.rows += len(chunk)
+            yield chunk
+
+    stream = group_orders(counted(source))
+    for stage in stages:
+        stream = stage(stream)
+    for _ in stream:
+        stats.orders += 1
+    stats.seconds = time.perf_counter() - started
+    return stats
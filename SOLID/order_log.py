@@ -0,0 +1,298 @@
+"""This module persists orders in an append-only binary log
+
+Every cart change and status change is appended as a fixed layout record,
+framed by its length and CRC-32, and replay ends at the first record that
+does not check out. Records are fsynced in groups, recovery replays the log through a read-only
+memory map, and compaction rewrites the log as the smallest set of records
+that rebuilds the current orders.
+"""
+import mmap
+import os
+import struct
+import threading
+import zlib
+from typing import Callable, Iterator, Optional, Union
+
+from SOLID.order import Order, OrderStatus, OrderWatcher
+
+MAGIC = b"SOLIDLOG\x02"
+
+ITEM, QUANTITY, REMOVE, STATUS, DROP = range(1, 6)
+
+# length and CRC-32 of the record that follows
+_FRAME = struct.Struct("<II")
+
+# kind, order id, then the fields of each record kind
+_ITEM = struct.Struct("<BQqqH")
+_QUANTITY = struct.Struct("<BQqq")
+_REMOVE = struct.Struct("<BQq")
+_STATUS = struct.Struct("<BQH")
+_DROP = struct.Struct("<BQ")
+
+Buffer = Union[bytes, bytearray, memoryview, mmap.mmap]
+
+
+def _frame(record: bytes) -> bytes:
+    """Prefixes a record with its length and CRC-32"""
+    return _FRAME.pack(len(record), zlib.crc32(record)) + record
+
+
+def _records(buffer: Buffer, offset: int) -> Iterator[tuple[bytes, int]]:
+    """Yields each framed record and the offset past it, up to the first invalid frame"""
+    end = len(buffer)
+    while offset + _FRAME.size <= end:
+        size, crc = _FRAME.unpack_from(buffer, offset)
+        start = offset + _FRAME.size
+        offset = start + size
+        if size == 0 or offset > end:
+            return
+        record = bytes(buffer[start:offset])
+        if zlib.crc32(record) != crc:
+            return
+        yield record, offset
+
+
+def replay(buffer: Buffer) -> tuple[dict[int, Order], int]:
+    """Rebuilds the orders recorded in a log buffer
+
+    Returns the orders by id and the offset just past the last valid record,
+    which is short of the end of the buffer after a torn write or when the
+    file ends in garbage, such as the zeros left by a crash.
+    """
+    if bytes(buffer[: len(MAGIC)]) != MAGIC:
+        raise ValueError("not an order log")
+    orders: dict[int, Order] = {}
+    offset = len(MAGIC)
+    for record, end in _records(buffer, offset):
+        kind = record[0]
+        try:
+            if kind == ITEM:
+                _, order_id, quantity, price, size = _ITEM.unpack_from(record)
+                start = _ITEM.size
+                stop = start + size
+                name = record[start:stop].decode()
+                orders.setdefault(order_id, Order()).add_item(name, quantity, price)
+            elif kind == QUANTITY:
+                _, order_id, index, quantity = _QUANTITY.unpack_from(record)
+                orders[order_id].update_quantity(index, quantity)
+            elif kind == REMOVE:
+                _, order_id, index = _REMOVE.unpack_from(record)
+                orders[order_id].remove_item(index)
+            elif kind == STATUS:
+                _, order_id, size = _STATUS.unpack_from(record)
+                start = _STATUS.size
+                stop = start + size
+                status = record[start:stop].decode()
+                orders.setdefault(order_id, Order()).status = status
+            elif kind == DROP:
+                _, order_id = _DROP.unpack_from(record)
+                orders.pop(order_id, None)
+            else:
+                break
+        except (struct.error, UnicodeDecodeError):
+            break
+        offset = end
+    return orders, offset
+
+
+def _encode_order(order_id: int, order: Order) -> bytes:
+    """Returns the records that rebuild one order"""
+    records = bytearray()
+    for name, quantity, price in zip(order.items, order.quantites, order.prices):
+        encoded = name.encode()
+        records += _frame(_ITEM.pack(ITEM, order_id, quantity, price, len(encoded)) + encoded)
+    if order.status != "open" or not order.items:
+        encoded = order.status.encode()
+        records += _frame(_STATUS.pack(STATUS, order_id, len(encoded)) + encoded)
+    return bytes(records)
+
+
+class OrderLog(OrderWatcher):
+    """An append-only log of order changes with group commit
+
+    Appended records are buffered and written with a single fsync once
+    group_size records are pending, or when commit() is called. Once the log
+    has grown to compact_ratio times its size after the last compaction, and
+    past compact_min_bytes, a commit also compacts it.
+    """
+
+    def __init__(
+        self,
+        path: Union[str, os.PathLike],
+        group_size: int = 64,
+        compact_ratio: float = 2.0,
+        compact_min_bytes: int = 1 << 20,
+        fsync: Callable[[int], None] = os.fsync,
+    ) -> None:
+        self.path = os.fspath(path)
+        self.group_size = group_size
+        self.compact_ratio = compact_ratio
+        self.compact_min_bytes = compact_min_bytes
+        self.fsync = fsync
+        self.commits = 0
+        self._pending = bytearray()
+        self._pending_records = 0
+        self._ids: dict[int, int] = {}
+        self._tracked: dict[int, Order] = {}
+        self._lock = threading.RLock()
+        self._file = open(self.path, "ab")
+        if self._file.tell() == 0:
+            self._file.write(MAGIC)
+            self._sync()
+        self._compacted_size = self._file.tell()
+
+    def __enter__(self) -> "OrderLog":
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        self.close()
+
+    def size(self) -> int:
+        """Returns the number of committed bytes in the log"""
+        return self._file.tell()
+
+    def _sync(self) -> None:
+        """Writes buffered bytes to disk"""
+        self._file.flush()
+        self.fsync(self._file.fileno())
+
+    def _append(self, record: bytes) -> None:
+        """Buffers a record, committing once a group is full"""
+        with self._lock:
+            self._pending += record
+            self._pending_records += 1
+            if self._pending_records >= self.group_size:
+                self.commit()
+
+    def append_item(self, order_id: int, name: str, quantity: int, price: int) -> None:
+        """Records a line added to an order"""
+        encoded = name.encode()
+        self._append(_frame(_ITEM.pack(ITEM, order_id, quantity, price, len(encoded)) + encoded))
+
+    def append_quantity(self, order_id: int, index: int, quantity: int) -> None:
+        """Records a changed line quantity"""
+        self._append(_frame(_QUANTITY.pack(QUANTITY, order_id, index, quantity)))
+
+    def append_remove(self, order_id: int, index: int) -> None:
+        """Records a removed line"""
+        self._append(_frame(_REMOVE.pack(REMOVE, order_id, index)))
+
+    def append_status(self, order_id: int, status: str) -> None:
+        """Records a status change"""
+        encoded = status.encode()
+        self._append(_frame(_STATUS.pack(STATUS, order_id, len(encoded)) + encoded))
+
+    def append_drop(self, order_id: int) -> None:
+        """Records that an order no longer needs to be recovered"""
+        self._append(_frame(_DROP.pack(DROP, order_id)))
+
+    def track(self, order_id: int, order: Order, snapshot: bool = True) -> None:
+        """Records the order as it is now and every later change to it
+
+        Pass snapshot=False for an order rebuilt from this log, whose current
+        state the log already holds.
+        """
+        with self._lock:
+            self._ids[id(order)] = order_id
+            self._tracked[id(order)] = order
+            if snapshot:
+                self._append(_encode_order(order_id, order))
+        order.watch(self)
+
+    def untrack(self, order: Order, drop: bool = False) -> None:
+        """Stops recording changes to the order, optionally dropping it from the log"""
+        order.unwatch(self)
+        order_id = self._ids.pop(id(order))
+        del self._tracked[id(order)]
+        if drop:
+            self.append_drop(order_id)
+
+    def items_added(
+        self, order: Order, names: list[str], quantities: list[int], prices: list[int]
+    ) -> None:
+        """Records the new lines of a tracked order"""
+        order_id = self._ids[id(order)]
+        for name, quantity, price in zip(names, quantities, prices):
+            self.append_item(order_id, name, quantity, price)
+
+    def quantity_updated(self, order: Order, index: int, quantity: int) -> None:
+        """Records a changed quantity of a tracked order"""
+        self.append_quantity(self._ids[id(order)], index, quantity)
+
+    def item_removed(self, order: Order, index: int, name: str) -> None:
+        """Records a removed line of a tracked order"""
+        self.append_remove(self._ids[id(order)], index)
+
+    def status_changed(self, order: Order, old: str, new: str) -> None:
+        """Records the new status of a tracked order"""
+        self.append_status(self._ids[id(order)], new)
+
+    def _write_pending(self) -> None:
+        """Writes every pending record with one fsync"""
+        if self._pending:
+            self._file.write(self._pending)
+            self._sync()
+            self.commits += 1
+            self._pending.clear()
+            self._pending_records = 0
+
+    def commit(self) -> None:
+        """Writes every pending record with one fsync, compacting when the log has grown"""
+        with self._lock:
+            self._write_pending()
+            size = self.size()
+            if size >= self.compact_min_bytes and size >= self._compacted_size * self.compact_ratio:
+                self.compact()
+
+    def recover(self, track: bool = False) -> dict[int, Order]:
+        """Rebuilds every order in the log, dropping everything from the first invalid record
+
+        An order still authorizing when the log ended may or may not have been
+        charged, so it comes back failed, from where it can be paid again.
+        With track set the rebuilt orders are tracked again, so later changes
+        to them are logged.
+        """
+        with self._lock:
+            self._write_pending()
+            with open(self.path, "rb") as log, mmap.mmap(
+                log.fileno(), 0, access=mmap.ACCESS_READ
+            ) as buffer:
+                orders, end = replay(buffer)
+            for order in orders.values():
+                if order.status == OrderStatus.AUTHORIZING:
+                    order.status = OrderStatus.FAILED
+            if end < self.size():
+                self._file.truncate(end)
+                self._file.seek(end)
+            if track:
+                for order_id, order in orders.items():
+                    self.track(order_id, order, snapshot=False)
+            return orders
+
+    def compact(self, orders: Optional[dict[int, Order]] = None) -> None:
+        """Rewrites the log as one record per line and status of each order"""
+        with self._lock:
+            if orders is None:
+                orders = self.recover()
+            compacted = f"{self.path}.compact"
+            with open(compacted, "wb") as log:
+                log.write(MAGIC)
+                for order_id, order in orders.items():
+                    log.write(_encode_order(order_id, order))
+                log.flush()
+                self.fsync(log.fileno())
+            self._file.close()
+            os.replace(compacted, self.path)
+            self._file = open(self.path, "ab")
+            self._compacted_size = self.size()
+
+    def close(self) -> None:
+        """Stops watching every tracked order, commits pending records and closes the log"""
+        with self._lock:
+            for order in self._tracked.values():
+                order.unwatch(self)
+            self._tracked.clear()
+            self._ids.clear()
+            if not self._file.closed:
+                self.commit()
+                self._file.close()
@@ -0,0 +1,107 @@
+"""This module keeps many orders in memory and finds them by status or item"""
+from itertools import count
+from typing import Iterator, Optional
+
+from SOLID.order import Order, OrderWatcher
+
+
+class OrderStore(OrderWatcher):
+    """Holds orders by id with a status index and an item name index
+
+    The store watches every order it holds, so a PaymentProcessor setting
+    order.status or a cart edit updates the indexes as it happens. Both indexes
+    only hold entries for orders in the store, and empty entries are dropped.
+    """
+
+    def __init__(self) -> None:
+        self._orders: dict[int, Order] = {}
+        self._ids: dict[int, int] = {}
+        self._by_status: dict[str, set[int]] = {}
+        self._by_item: dict[str, dict[int, int]] = {}
+        self._next_id = count(1)
+
+    def __len__(self) -> int:
+        return len(self._orders)
+
+    def __contains__(self, order_id: int) -> bool:
+        return order_id in self._orders
+
+    def __getitem__(self, order_id: int) -> Order:
+        return self._orders[order_id]
+
+    def __iter__(self) -> Iterator[int]:
+        return iter(self._orders)
+
+    def add(self, order: Order) -> int:
+        """Stores an order and returns its new id"""
+        if id(order) in self._ids:
+            raise ValueError("order is already in the store")
+        order_id = next(self._next_id)
+        self._orders[order_id] = order
+        self._ids[id(order)] = order_id
+        self._by_status.setdefault(order.status, set()).add(order_id)
+        for name in order.items:
+            self._count_item(name, order_id, 1)
+        order.watch(self)
+        return order_id
+
+    def remove(self, order_id: int) -> Order:
+        """Removes an order from the store and its indexes"""
+        order = self._orders.pop(order_id)
+        del self._ids[id(order)]
+        order.unwatch(self)
+        self._discard_status(order.status, order_id)
+        for name in order.items:
+            self._count_item(name, order_id, -1)
+        return order
+
+    def id_of(self, order: Order) -> int:
+        """Returns the id of a stored order"""
+        return self._ids[id(order)]
+
+    def find(self, status: Optional[str] = None, item: Optional[str] = None) -> list[int]:
+        """Returns the ids of the orders matching every given filter"""
+        candidates: list[set[int]] = []
+        if status is not None:
+            candidates.append(self._by_status.get(status, set()))
+        if item is not None:
+            candidates.append(set(self._by_item.get(item, ())))
+        if not candidates:
+            return list(self._orders)
+        return sorted(set.intersection(*sorted(candidates, key=len)))
+
+    def _count_item(self, name: str, order_id: int, change: int) -> None:
+        """Changes how many lines of an order carry an item name"""
+        orders = self._by_item.setdefault(name, {})
+        lines = orders.get(order_id, 0) + change
+        if lines:
+            orders[order_id] = lines
+        else:
+            del orders[order_id]
+            if not orders:
+                del self._by_item[name]
+
+    def _discard_status(self, status: str, order_id: int) -> None:
+        """Removes an order from the status index"""
+        order_ids = self._by_status[status]
+        order_ids.discard(order_id)
+        if not order_ids:
+            del self._by_status[status]
+
+    def items_added(
+        self, order: Order, names: list[str], quantities: list[int], prices: list[int]
+    ) -> None:
+        """Indexes the item names of new lines"""
+        order_id = self._ids[id(order)]
+        for name in names:
+            self._count_item(name, order_id, 1)
+
+    def item_removed(self, order: Order, index: int, name: str) -> None:
+        """Drops a removed line from the item index"""
+        self._count_item(name, self._ids[id(order)], -1)
+
+    def status_changed(self, order: Order, old: str, new: str) -> None:
+        """Moves the order to its new status"""
+        order_id = self._ids[id(order)]
+        self._discard_status(old, order_id)
+        self._by_status.setdefault(new, set()).add(order_id)
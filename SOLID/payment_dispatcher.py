@@ -0,0 +1,93 @@
+"""This module pays orders concurrently on a pool of worker threads"""
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from queue import Full
+from typing import Optional
+
+from SOLID.dependency_inversion_after import PaymentProcessor
+from SOLID.order import Order
+
+
+class PaymentDispatcher:
+    """Runs (Order, PaymentProcessor) jobs on a thread pool behind a bounded queue
+
+    At most max_queued jobs wait for a worker. When the queue is full, submit
+    blocks until a worker frees a slot, or raises queue.Full when it should not
+    block or its timeout expires. A job cancelled while queued frees its slot.
+    """
+
+    def __init__(self, workers: int = 4, max_queued: int = 64, block: bool = True) -> None:
+        if workers < 1 or max_queued < 1:
+            raise ValueError("workers and max_queued must be at least 1")
+        self.block = block
+        self._slots = threading.BoundedSemaphore(max_queued)
+        self._executor = ThreadPoolExecutor(workers, thread_name_prefix="payment-dispatcher")
+        self._lock = threading.Lock()
+        self._queued = 0
+        self._busy: dict[str, float] = {}
+        self._started_at = time.perf_counter()
+
+    def __enter__(self) -> "PaymentDispatcher":
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        self.shutdown()
+
+    def submit(
+        self,
+        order: Order,
+        processor: PaymentProcessor,
+        block: Optional[bool] = None,
+        timeout: Optional[float] = None,
+    ) -> "Future[None]":
+        """Queues the payment of order and returns a future for its outcome"""
+        block = self.block if block is None else block
+        if not self._slots.acquire(block, timeout if block else None):
+            raise Full("payment queue is full")
+        with self._lock:
+            self._queued += 1
+        try:
+            future = self._executor.submit(self._run, order, processor)
+        except BaseException:
+            self._dequeue()
+            raise
+        future.add_done_callback(self._cancelled)
+        return future
+
+    def _dequeue(self) -> None:
+        """Frees the queue slot of a job that left the queue"""
+        with self._lock:
+            self._queued -= 1
+        self._slots.release()
+
+    def _cancelled(self, future: "Future[None]") -> None:
+        """Frees the queue slot of a job cancelled before a worker took it"""
+        if future.cancelled():
+            self._dequeue()
+
+    def _run(self, order: Order, processor: PaymentProcessor) -> None:
+        """Pays one order on a worker thread, recording how long the worker was busy"""
+        self._dequeue()
+        started = time.perf_counter()
+        try:
+            processor.pay(order)
+        finally:
+            elapsed = time.perf_counter() - started
+            worker = threading.current_thread().name
+            with self._lock:
+                self._busy[worker] = self._busy.get(worker, 0.0) + elapsed
+
+    def queue_depth(self) -> int:
+        """Returns the number of jobs waiting for a worker"""
+        return self._queued
+
+    def utilization(self) -> dict[str, float]:
+        """Returns the fraction of time each worker spent paying since it started"""
+        elapsed = time.perf_counter() - self._started_at
+        with self._lock:
+            return {worker: busy / elapsed for worker, busy in self._busy.items()}
+
+    def shutdown(self, wait: bool = True) -> None:
+        """Stops accepting jobs and, if wait is set, finishes the queued ones"""
+        self._executor.shutdown(wait)
@@ -0,0 +1,221 @@
+"""This module pays orders through separate validate, authorize and charge stages
+
+Every stage has its own bounded queue and pool of worker threads, so a slow
+authorization provider only needs more authorize workers. A full queue
+blocks the stage in front of it, which keeps memory bounded under load.
+"""
+import threading
+import time
+from concurrent.futures import Future, InvalidStateError
+from dataclasses import dataclass
+from queue import Full, Queue
+from typing import Callable, Optional
+
+from SOLID.dependency_inversion_after import PaymentProcessor
+from SOLID.order import Order
+
+
+@dataclass
+class Payment:
+    """One order moving through the pipeline"""
+
+    order: Order
+    processor: PaymentProcessor
+    code: Optional[str]
+    future: "Future[None]"
+
+
+@dataclass
+class StageStats:
+    """What a stage has done so far"""
+
+    queue_depth: int
+    processed: int
+    failed: int
+    service_seconds: float
+
+    @property
+    def mean_service_time(self) -> float:
+        """Returns the average seconds a worker spent on one payment"""
+        handled = self.processed + self.failed
+        return self.service_seconds / handled if handled else 0.0
+
+
+def _finish(future: "Future[None]", error: Optional[Exception] = None) -> None:
+    """Finishes a future unless it was already finished"""
+    try:
+        if error is None:
+            future.set_result(None)
+        else:
+            future.set_exception(error)
+    except InvalidStateError:
+        pass
+
+
+class PipelineStage:
+    """A bounded queue of payments served by a pool of worker threads
+
+    A payment whose work raises is finished with that exception. Otherwise
+    it is passed to the next stage, or finished successfully by the last one.
+    A payment cancelled before a stage started on it is dropped.
+    """
+
+    def __init__(
+        self, name: str, work: Callable[[Payment], None], workers: int = 1, max_queued: int = 64
+    ) -> None:
+        if workers < 1 or max_queued < 1:
+            raise ValueError("workers and max_queued must be at least 1")
+        self.name = name
+        self.work = work
+        self.next: Optional[PipelineStage] = None
+        self.queue: Queue[Optional[Payment]] = Queue(max_queued)
+        self.processed = 0
+        self.failed = 0
+        self.service_seconds = 0.0
+        self._lock = threading.Lock()
+        self._stopped = False
+        self._threads = [
+            threading.Thread(target=self._serve, name=f"pipeline-{name}-{number}", daemon=True)
+            for number in range(workers)
+        ]
+        for thread in self._threads:
+            thread.start()
+
+    def _serve(self) -> None:
+        """Works through payments until told to stop"""
+        while (payment := self.queue.get()) is not None:
+            future = payment.future
+            if not future.running() and not future.set_running_or_notify_cancel():
+                continue
+            started = time.perf_counter()
+            try:
+                self.work(payment)
+            except Exception as error:
+                failed = True
+                _finish(future, error)
+            else:
+                failed = False
+            elapsed = time.perf_counter() - started
+            with self._lock:
+                self.service_seconds += elapsed
+                if failed:
+                    self.failed += 1
+                else:
+                    self.processed += 1
+            if not failed:
+                if self.next is None:
+                    _finish(future)
+                else:
+                    self.next.queue.put(payment)
+
+    def stats(self) -> StageStats:
+        """Returns the queue depth and service times of the stage"""
+        with self._lock:
+            return StageStats(self.queue.qsize(), self.processed, self.failed, self.service_seconds)
+
+    def stop(self) -> None:
+        """Lets the workers finish the queued payments and waits for them"""
+        if self._stopped:
+            return
+        self._stopped = True
+        for _ in self._threads:
+            self.queue.put(None)
+        for thread in self._threads:
+            thread.join()
+
+
+def validate(payment: Payment) -> None:
+    """Rejects empty orders and orders without a positive total"""
+    if not payment.order.items:
+        raise ValueError("order has no items")
+    if payment.order.total_price() <= 0:
+        raise ValueError("order total must be positive")
+
+
+def authorize(payment: Payment) -> None:
+    """Verifies the code with the authorizer of the processor, if it has one"""
+    authorizer = getattr(payment.processor, "authorizer", None)
+    if authorizer is None:
+        return
+    if payment.code is not None:
+        authorizer.verify_code(payment.code)
+    if not authorizer.is_authorized():
+        raise Exception("Not authorized")
+
+
+def charge(payment: Payment) -> None:
+    """Pays the order with its processor"""
+    payment.processor.pay(payment.order)
+
+
+class PaymentPipeline:
+    """Pays orders through validate, authorize and charge stages"""
+
+    def __init__(
+        self,
+        validate_workers: int = 1,
+        authorize_workers: int = 4,
+        charge_workers: int = 4,
+        max_queued: int = 64,
+    ) -> None:
+        self.stages = [
+            PipelineStage("validate", validate, validate_workers, max_queued),
+            PipelineStage("authorize", authorize, authorize_workers, max_queued),
+            PipelineStage("charge", charge, charge_workers, max_queued),
+        ]
+        for stage, following in zip(self.stages, self.stages[1:]):
+            stage.next = following
+        self._shutdown = False
+        self._submitting = 0
+        self._submitted = threading.Condition()
+
+    def __enter__(self) -> "PaymentPipeline":
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        self.shutdown()
+
+    def submit(
+        self,
+        order: Order,
+        processor: PaymentProcessor,
+        code: Optional[str] = None,
+        block: bool = True,
+        timeout: Optional[float] = None,
+    ) -> "Future[None]":
+        """Queues the payment of order and returns a future for its outcome
+
+        Raises queue.Full when the validate queue is full and the call should
+        not block or its timeout expires, and RuntimeError after shutdown. A
+        payment cancelled through its future before validation is never made.
+        """
+        future: "Future[None]" = Future()
+        with self._submitted:
+            if self._shutdown:
+                raise RuntimeError("cannot submit payments after shutdown")
+            self._submitting += 1
+        try:
+            self.stages[0].queue.put(Payment(order, processor, code, future), block, timeout)
+        except Full:
+            raise Full("payment pipeline is full") from None
+        finally:
+            with self._submitted:
+                self._submitting -= 1
+                self._submitted.notify_all()
+        return future
+
+    def stats(self) -> dict[str, StageStats]:
+        """Returns the stats of every stage by name"""
+        return {stage.name: stage.stats() for stage in self.stages}
+
+    def shutdown(self) -> None:
+        """Finishes every queued payment and stops the workers
+
+        Submits already waiting for room in the queue are let in first.
+        """
+        with self._submitted:
+            self._shutdown = True
+            while self._submitting:
+                self._submitted.wait()
+        for stage in self.stages:
+            stage.stop()
@@ -0,0 +1,77 @@
+"""This module looks up payment processors by payment type
+
+Processors are registered with a decorator or published by other packages
+under the "solid.payment_processors" entry point group, which is only read
+the first time an unknown payment type is requested.
+"""
+from importlib.metadata import entry_points
+from typing import Callable, Optional, TypeVar
+
+from SOLID.dependency_inversion_after import PaymentProcessor
+from SOLID.order import Order
+
+ENTRY_POINT_GROUP = "solid.payment_processors"
+
+Factory = Callable[[], PaymentProcessor]
+F = TypeVar("F", bound=Factory)
+
+
+class PaymentProcessorRegistry:
+    """Maps payment types to processor factories and caches what they build"""
+
+    def __init__(self, entry_point_group: Optional[str] = ENTRY_POINT_GROUP) -> None:
+        self.entry_point_group = entry_point_group
+        self._factories: dict[str, Factory] = {}
+        self._processors: dict[str, PaymentProcessor] = {}
+        self._entry_points_loaded = entry_point_group is None
+
+    def __contains__(self, payment_type: str) -> bool:
+        self._load_entry_points()
+        return payment_type in self._factories
+
+    def register(self, payment_type: str) -> Callable[[F], F]:
+        """Returns a decorator that registers a processor factory or class"""
+
+        def decorator(factory: F) -> F:
+            self.add(payment_type, factory)
+            return factory
+
+        return decorator
+
+    def add(self, payment_type: str, factory: Factory) -> None:
+        """Registers a factory, replacing any processor built for the type"""
+        self._factories[payment_type] = factory
+        self._processors.pop(payment_type, None)
+
+    def _load_entry_points(self) -> None:
+        """Registers every entry point factory not registered by hand"""
+        if self._entry_points_loaded or self.entry_point_group is None:
+            return
+        self._entry_points_loaded = True
+        for entry_point in entry_points(group=self.entry_point_group):
+            if entry_point.name not in self._factories:
+                self._factories[entry_point.name] = entry_point.load()
+
+    def get(self, payment_type: str) -> PaymentProcessor:
+        """Returns the processor for a payment type, building it on first use"""
+        try:
+            return self._processors[payment_type]
+        except KeyError:
+            pass
+        factory = self._factories.get(payment_type)
+        if factory is None:
+            self._load_entry_points()
+            factory = self._factories.get(payment_type)
+            if factory is None:
+                raise Exception(f"unknown payment type: {payment_type}")
+        processor = self._processors[payment_type] = factory()
+        return processor
+
+    def pay(self, payment_type: str, order: Order) -> None:
+        """Pay the order with the processor registered for the payment type"""
+        self.get(payment_type).pay(order)
+
+    def payment_types(self) -> list[str]:
+        """Returns every registered payment type"""
+        self._load_entry_points()
+        return sorted(self._factories)
@@ -0,0 +1,180 @@
+"""This module keeps calls to payment and authorization providers within their quotas"""
+import asyncio
+import threading
+import time
+from dataclasses import dataclass
+from typing import Callable, Optional
+
+from SOLID.dependency_inversion_after import Authorizer, PaymentProcessor
+from SOLID.dependency_inversion_async import AsyncAuthorizer, AsyncPaymentProcessor
+from SOLID.order import Order
+
+
+class RateLimited(Exception):
+    """Raised when a call cannot get a token in time"""
+
+
+class TokenBucket:
+    """Hands out rate tokens a second and lets up to burst of them build up
+
+    Callers reserve tokens ahead of time: a caller that finds the bucket
+    empty takes its tokens on credit and sleeps until they would have been
+    refilled, so waiting callers are served in the order they arrived. The
+    lock is only held to do the arithmetic, never while sleeping, which makes
+    the bucket safe to share between threads and event loops alike.
+    """
+
+    def __init__(
+        self,
+        rate: float,
+        burst: int = 1,
+        clock: Callable[[], float] = time.monotonic,
+        sleep: Callable[[float], None] = time.sleep,
+    ) -> None:
+        if rate <= 0 or burst < 1:
+            raise ValueError("rate and burst must be positive")
+        self.rate = rate
+        self.burst = burst
+        self.clock = clock
+        self.sleep = sleep
+        self.acquired = 0
+        self.rejected = 0
+        self.throttled = 0
+        self.throttled_seconds = 0.0
+        self._tokens = float(burst)
+        self._updated = clock()
+        self._lock = threading.Lock()
+
+    def _reserve(self, tokens: int, block: bool, timeout: Optional[float]) -> Optional[float]:
+        """Takes tokens and returns how long to wait for them, or None if that is too long"""
+        if not 1 <= tokens <= self.burst:
+            raise ValueError("tokens must be between 1 and the burst size")
+        with self._lock:
+            now = self.clock()
+            self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            wait = max(0.0, (tokens - self._tokens) / self.rate)
+            if wait and (not block or (timeout is not None and wait > timeout)):
+                self.rejected += 1
+                return None
+            self._tokens -= tokens
+            self.acquired += 1
+            if wait:
+                self.throttled += 1
+                self.throttled_seconds += wait
+            return wait
+
+    def _give_back(self, tokens: int) -> None:
+        """Returns reserved tokens that a cancelled caller never used"""
+        with self._lock:
+            self._tokens += tokens
+            self.acquired -= 1
+
+    def tokens(self) -> float:
+        """Returns the tokens available now, negative while callers are waiting"""
+        with self._lock:
+            elapsed = self.clock() - self._updated
+            return min(self.burst, self._tokens + elapsed * self.rate)
+
+    def acquire(self, tokens: int = 1, block: bool = True, timeout: Optional[float] = None) -> bool:
+        """Takes tokens, waiting for them unless block is false or timeout would pass first
+
+        Returns false without waiting when the tokens cannot be had in time.
+        """
+        wait = self._reserve(tokens, block, timeout)
+        if wait is None:
+            return False
+        if wait:
+            self.sleep(wait)
+        return True
+
+    async def acquire_async(
+        self, tokens: int = 1, block: bool = True, timeout: Optional[float] = None
+    ) -> bool:
+        """Takes tokens like acquire, awaiting instead of blocking the event loop"""
+        wait = self._reserve(tokens, block, timeout)
+        if wait is None:
+            return False
+        if wait:
+            try:
+                await asyncio.sleep(wait)
+            except asyncio.CancelledError:
+                self._give_back(tokens)
+                raise
+        return True
+
+
+@dataclass
+class RateLimitedProcessor(PaymentProcessor):
+    """Pay through another processor no faster than a token bucket allows
+
+    Raises RateLimited when block is false, or when a token is more than
+    max_wait seconds away.
+    """
+
+    processor: PaymentProcessor
+    bucket: TokenBucket
+    block: bool = True
+    max_wait: Optional[float] = None
+
+    def pay(self, order: Order) -> None:
+        """Pay the order once a token is available"""
+        if not self.bucket.acquire(1, self.block, self.max_wait):
+            raise RateLimited("payment rate limit exceeded")
+        self.processor.pay(order)
+
+
+@dataclass
+class RateLimitedAuthorizer(Authorizer):
+    """Authorize through another authorizer no faster than a token bucket allows"""
+
+    authorizer: Authorizer
+    bucket: TokenBucket
+    block: bool = True
+    max_wait: Optional[float] = None
+
+    def verify_code(self, code: str) -> None:
+        """Verifys the provided code once a token is available"""
+        if not self.bucket.acquire(1, self.block, self.max_wait):
+            raise RateLimited("authorization rate limit exceeded")
+        self.authorizer.verify_code(code)
+
+    def is_authorized(self) -> bool:
+        """Returns true if the caller is authorized"""
+        return self.authorizer.is_authorized()
+
+
+@dataclass
+class AsyncRateLimitedProcessor(AsyncPaymentProcessor):
+    """Pay through another async processor no faster than a token bucket allows"""
+
+    processor: AsyncPaymentProcessor
+    bucket: TokenBucket
+    block: bool = True
+    max_wait: Optional[float] = None
+
+    async def pay(self, order: Order) -> None:
+        """Pay the order once a token is available"""
+        if not await self.bucket.acquire_async(1, self.block, self.max_wait):
+            raise RateLimited("payment rate limit exceeded")
+        await self.processor.pay(order)
+
+
+@dataclass
+class AsyncRateLimitedAuthorizer(AsyncAuthorizer):
+    """Authorize through another async authorizer no faster than a token bucket allows"""
+
+    authorizer: AsyncAuthorizer
+    bucket: TokenBucket
+    block: bool = True
+    max_wait: Optional[float] = None
+
+    async def verify_code(self, code: str) -> None:
+        """Verifys the provided code once a token is available"""
+        if not await self.bucket.acquire_async(1, self.block, self.max_wait):
+            raise RateLimited("authorization rate limit exceeded")
+        await self.authorizer.verify_code(code)
+
+    def is_authorized(self) -> bool:
+        """Returns true if the caller is authorized"""
+        return self.authorizer.is_authorized()
@@ -0,0 +1,405 @@
+"""This module spreads orders over worker processes with consistent hashing
+
+Every worker process owns the orders whose ids hash to it on a HashRing and
+answers requests over a pipe. ShardedOrderService is the client side: bulk
+calls are split per shard, sent to every shard before any answer is read,
+so the shards work on them in parallel. A call that fails on some shards
+raises ShardError, which tells which shards applied their part.
+"""
+import hashlib
+import multiprocessing
+import threading
+from bisect import bisect, insort
+from collections import defaultdict
+from contextlib import contextmanager
+from itertools import count
+from multiprocessing.connection import Connection
+from multiprocessing.reduction import ForkingPickler
+from typing import Any, Callable, Hashable, Iterable, Iterator, Optional
+
+from SOLID.dependency_inversion_after import PaymentProcessor
+from SOLID.order import Order
+
+Line = tuple[Hashable, str, int, int]
+
+
+class ShardError(Exception):
+    """Raised when a request failed on some of the shards it was sent to
+
+    errors holds the exception of every failed shard and results the answer
+    of every shard that applied its part.
+    """
+
+    def __init__(self, errors: dict[str, Exception], results: dict[str, Any]) -> None:
+        super().__init__(f"request failed on {', '.join(sorted(errors))}")
+        self.errors = errors
+        self.results = results
+
+
+def _hash(key: str) -> int:
+    """Returns a stable 64 bit hash of a key"""
+    return int.from_bytes(hashlib.blake2b(key.encode(), digest_size=8).digest(), "big")
+
+
+class HashRing:
+    """Maps keys to nodes so that adding or removing a node moves few keys
+
+    Each node is placed on the ring at replicas points, and a key belongs to
+    the node at the first point after the hash of the key. Adding the N-th
+    node therefore takes about 1/N of the keys, all from the other nodes.
+    """
+
+    def __init__(self, nodes: Iterable[str] = (), replicas: int = 100) -> None:
+        if replicas < 1:
+            raise ValueError("replicas must be at least 1")
+        self.replicas = replicas
+        self._points: list[int] = []
+        self._nodes: dict[int, str] = {}
+        for node in nodes:
+            self.add(node)
+
+    def __len__(self) -> int:
+        return len(set(self._nodes.values()))
+
+    def add(self, node: str) -> None:
+        """Places a node on the ring"""
+        for replica in range(self.replicas):
+            point = _hash(f"{node}#{replica}")
+            if point not in self._nodes:
+                insort(self._points, point)
+                self._nodes[point] = node
+
+    def remove(self, node: str) -> None:
+        """Takes a node off the ring"""
+        kept = [point for point in self._points if self._nodes[point] != node]
+        for point in self._points:
+            if self._nodes[point] == node:
+                del self._nodes[point]
+        self._points = kept
+
+    def node_for(self, key: Hashable) -> str:
+        """Returns the node a key belongs to"""
+        if not self._points:
+            raise ValueError("hash ring has no nodes")
+        index = bisect(self._points, _hash(str(key)))
+        return self._nodes[self._points[index % len(self._points)]]
+
+
+def _add_items(orders: dict[Hashable, Order], lines: list[Line]) -> None:
+    """Adds lines to the orders of a shard, creating orders as needed"""
+    by_order: dict[Hashable, list[tuple[str, int, int]]] = defaultdict(list)
+    for order_id, name, quantity, price in lines:
+        by_order[order_id].append((name, quantity, price))
+    for order_id, order_lines in by_order.items():
+        orders.setdefault(order_id, Order()).add_items(order_lines)
+
+
+def _totals(orders: dict[Hashable, Order], order_ids: list[Hashable]) -> list[int]:
+    """Returns the total price of each order"""
+    return [orders[order_id].total_price() for order_id in order_ids]
+
+
+def _statuses(orders: dict[Hashable, Order], order_ids: list[Hashable]) -> list[str]:
+    """Returns the status of each order"""
+    return [orders[order_id].status for order_id in order_ids]
+
+
+def _pay(orders: dict[Hashable, Order], request: tuple[Hashable, PaymentProcessor]) -> None:
+    """Pays one order, raising whatever the processor raises"""
+    order_id, processor = request
+    processor.pay(orders[order_id])
+
+
+def _pay_many(
+    orders: dict[Hashable, Order], request: tuple[list[Hashable], PaymentProcessor]
+) -> list[bool]:
+    """Pays a batch of orders and returns whether each one was paid"""
+    order_ids, processor = request
+    return processor.pay_many([orders[order_id] for order_id in order_ids])
+
+
+def _keys(orders: dict[Hashable, Order], _: None) -> list[Hashable]:
+    """Returns the id of every order on the shard"""
+    return list(orders)
+
+
+def _export(orders: dict[Hashable, Order], order_ids: list[Hashable]) -> list[Order]:
+    """Returns orders of the shard, which keeps them until they are dropped"""
+    return [orders[order_id] for order_id in order_ids]
+
+
+def _drop(orders: dict[Hashable, Order], order_ids: list[Hashable]) -> None:
+    """Removes orders that now live on another shard"""
+    for order_id in order_ids:
+        del orders[order_id]
+
+
+def _import(orders: dict[Hashable, Order], moved: list[tuple[Hashable, Order]]) -> None:
+    """Adds orders moved from another shard"""
+    orders.update(moved)
+
+
+_HANDLERS: dict[str, Callable[[dict[Hashable, Order], Any], Any]] = {
+    "add_items": _add_items,
+    "totals": _totals,
+    "statuses": _statuses,
+    "pay": _pay,
+    "pay_many": _pay_many,
+    "keys": _keys,
+    "export": _export,
+    "import": _import,
+    "drop": _drop,
+}
+
+
+def serve(connection: Connection) -> None:
+    """Runs a shard: answers (request, payload) messages until told to stop"""
+    orders: dict[Hashable, Order] = {}
+    while True:
+        request, payload = connection.recv()
+        if request == "stop":
+            connection.close()
+            return
+        try:
+            result = _HANDLERS[request](orders, payload)
+        except Exception as error:
+            connection.send((False, error))
+        else:
+            connection.send((True, result))
+
+
+class _RingLock:
+    """Lets calls share the ring while a ring change waits for them and shuts them out"""
+
+    def __init__(self) -> None:
+        self._condition = threading.Condition()
+        self._readers = 0
+        self._changing = False
+
+    @contextmanager
+    def reading(self) -> Iterator[None]:
+        """Holds the ring steady for one call"""
+        with self._condition:
+            while self._changing:
+                self._condition.wait()
+            self._readers += 1
+        try:
+            yield
+        finally:
+            with self._condition:
+                self._readers -= 1
+                self._condition.notify_all()
+
+    @contextmanager
+    def changing(self) -> Iterator[None]:
+        """Waits for running calls and keeps new ones out while the ring changes"""
+        with self._condition:
+            while self._changing:
+                self._condition.wait()
+            self._changing = True
+            while self._readers:
+                self._condition.wait()
+        try:
+            yield
+        finally:
+            with self._condition:
+                self._changing = False
+                self._condition.notify_all()
+
+
+class _Shard:
+    """The client end of one worker process"""
+
+    def __init__(self, name: str, context: Any) -> None:
+        self.name = name
+        self.connection, child = context.Pipe()
+        self.process = context.Process(target=serve, args=(child,), name=name, daemon=True)
+        self.process.start()
+        child.close()
+        self.lock = threading.Lock()
+
+    def stop(self) -> None:
+        """Stops the worker process"""
+        with self.lock:
+            self.connection.send(("stop", None))
+            self.connection.close()
+        self.process.join()
+
+
+class ShardedOrderService:
+    """Client proxy for orders kept on worker processes, sharded by order id
+
+    Processors passed to pay and pay_many are pickled and run on the shard
+    that holds the order, so they must be picklable and already authorized.
+    Calls from many threads may run at once; adding or removing a worker
+    waits for them and holds new calls until the orders have moved.
+    """
+
+    def __init__(
+        self, workers: int = 4, replicas: int = 100, start_method: Optional[str] = None
+    ) -> None:
+        if workers < 1:
+            raise ValueError("workers must be at least 1")
+        self._context = multiprocessing.get_context(start_method)
+        self._names = (f"shard-{number}" for number in count())
+        self._shards: dict[str, _Shard] = {}
+        self.ring = HashRing(replicas=replicas)
+        self._ring_lock = _RingLock()
+        for _ in range(workers):
+            self._start_shard()
+
+    def __enter__(self) -> "ShardedOrderService":
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        self.close()
+
+    def __len__(self) -> int:
+        return len(self._shards)
+
+    def _start_shard(self) -> str:
+        """Starts a worker process and places it on the ring"""
+        name = next(self._names)
+        self._shards[name] = _Shard(name, self._context)
+        self.ring.add(name)
+        return name
+
+    def _call(self, requests: dict[str, tuple[str, Any]]) -> dict[str, Any]:
+        """Sends one request to each named shard, then collects every answer
+
+        Every request is pickled before any is sent, and every shard that was
+        sent a request is read from, so no answer is left in a pipe.
+        """
+        shards = [self._shards[name] for name in sorted(requests)]
+        payloads = {
+            shard.name: bytes(ForkingPickler.dumps(requests[shard.name])) for shard in shards
+        }
+        answers = {}
+        sent = []
+        for shard in shards:
+            shard.lock.acquire()
+        try:
+            for shard in shards:
+                shard.connection.send_bytes(payloads[shard.name])
+                sent.append(shard)
+        finally:
+            try:
+                for shard in sent:
+                    answers[shard.name] = shard.connection.recv()
+            finally:
+                for shard in shards:
+                    shard.lock.release()
+        results = {name: result for name, (ok, result) in answers.items() if ok}
+        errors = {name: error for name, (ok, error) in answers.items() if not ok}
+        if errors and len(answers) == 1:
+            raise next(iter(errors.values()))
+        if errors:
+            raise ShardError(errors, results) from next(iter(errors.values()))
+        return results
+
+    def _split(self, order_ids: Iterable[Hashable]) -> dict[str, list[Hashable]]:
+        """Groups order ids by the shard that holds them"""
+        by_shard: dict[str, list[Hashable]] = defaultdict(list)
+        for order_id in order_ids:
+            by_shard[self.ring.node_for(order_id)].append(order_id)
+        return by_shard
+
+    def _gather(self, request: str, order_ids: list[Hashable]) -> dict[Hashable, Any]:
+        """Runs a per-order request on every shard and returns the results by order id"""
+        with self._ring_lock.reading():
+            by_shard = self._split(order_ids)
+            results = self._call({name: (request, ids) for name, ids in by_shard.items()})
+        return {
+            order_id: result
+            for name, ids in by_shard.items()
+            for order_id, result in zip(ids, results[name])
+        }
+
+    def add_item(self, order_id: Hashable, name: str, quantity: int, price: int) -> None:
+        """Adds an item to an order, creating the order if needed"""
+        self.add_items([(order_id, name, quantity, price)])
+
+    def add_items(self, lines: Iterable[Line]) -> None:
+        """Adds (order_id, name, quantity, price) lines with one message per shard"""
+        by_shard: dict[str, list[Line]] = defaultdict(list)
+        with self._ring_lock.reading():
+            for line in lines:
+                by_shard[self.ring.node_for(line[0])].append(line)
+            self._call({name: ("add_items", shard_lines) for name, shard_lines in by_shard.items()})
+
+    def total_price(self, order_id: Hashable) -> int:
+        """Returns the total price of an order"""
+        return self.total_prices([order_id])[order_id]
+
+    def total_prices(self, order_ids: Iterable[Hashable]) -> dict[Hashable, int]:
+        """Returns the total price of every order by id"""
+        return self._gather("totals", list(order_ids))
+
+    def statuses(self, order_ids: Iterable[Hashable]) -> dict[Hashable, str]:
+        """Returns the status of every order by id"""
+        return self._gather("statuses", list(order_ids))
+
+    def pay(self, order_id: Hashable, processor: PaymentProcessor) -> None:
+        """Pays an order on its shard"""
+        with self._ring_lock.reading():
+            self._call({self.ring.node_for(order_id): ("pay", (order_id, processor))})
+
+    def pay_many(
+        self, order_ids: Iterable[Hashable], processor: PaymentProcessor
+    ) -> dict[Hashable, bool]:
+        """Pays orders with one pay_many call per shard and returns whether each was paid"""
+        with self._ring_lock.reading():
+            by_shard = self._split(order_ids)
+            results = self._call(
+                {name: ("pay_many", (ids, processor)) for name, ids in by_shard.items()}
+            )
+        return {
+            order_id: paid
+            for name, ids in by_shard.items()
+            for order_id, paid in zip(ids, results[name])
+        }
+
+    def order_ids(self) -> list[Hashable]:
+        """Returns the id of every order on every shard"""
+        with self._ring_lock.reading():
+            keys = self._call({name: ("keys", None) for name in self._shards})
+        return [order_id for name in sorted(keys) for order_id in keys[name]]
+
+    def _rebalance(self) -> int:
+        """Moves every order whose shard changed on the ring and returns how many moved"""
+        keys = self._call({name: ("keys", None) for name in self._shards})
+        moves: dict[tuple[str, str], list[Hashable]] = defaultdict(list)
+        for source, order_ids in keys.items():
+            for order_id in order_ids:
+                target = self.ring.node_for(order_id)
+                if target != source:
+                    moves[source, target].append(order_id)
+        for (source, target), order_ids in moves.items():
+            orders = self._call({source: ("export", order_ids)})[source]
+            self._call({target: ("import", list(zip(order_ids, orders)))})
+            self._call({source: ("drop", order_ids)})
+        return sum(map(len, moves.values()))
+
+    def add_worker(self) -> int:
+        """Starts another shard, moves its orders to it and returns how many moved"""
+        with self._ring_lock.changing():
+            self._start_shard()
+            return self._rebalance()
+
+    def remove_worker(self, name: Optional[str] = None) -> int:
+        """Moves the orders of a shard to the others, stops it and returns how many moved"""
+        with self._ring_lock.changing():
+            if len(self._shards) == 1:
+                raise ValueError("cannot remove the last worker")
+            name = name if name is not None else sorted(self._shards)[-1]
+            self.ring.remove(name)
+            moved = self._rebalance()
+            self._shards.pop(name).stop()
+            return moved
+
+    def close(self) -> None:
+        """Stops every worker process"""
+        with self._ring_lock.changing():
+            for shard in self._shards.values():
+                shard.stop()
+            self._shards.clear()
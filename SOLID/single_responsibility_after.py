@@ -15,6 +15,9 @@ responsibility.
 
 """
 from dataclasses import dataclass, field
+from typing import Optional
+
+from SOLID.events import ConsoleSink, EventSink
 
 
 @dataclass
@@ -25,29 +28,45 @@ class Order:
     quantites: list[int] = field(default_factory=list)
     prices: list[int] = field(default_factory=list)
     status: str = field(default="open", init=False)
+    _total: int = field(default=0, init=False, repr=False, compare=False)
+
+    def __post_init__(self) -> None:
+        self._total = sum(quantity * price for quantity, price in zip(self.quantites, self.prices))
 
     def add_item(self, name: str, quantity: int, price: int) -> None:
         """Adds an item to the order"""
         self.items.append(name)
         self.quantites.append(quantity)
         self.prices.append(price)
+        self._total += quantity * price
+
+    def update_quantity(self, index: int, quantity: int) -> None:
+        """Changes the quantity of the line at index"""
+        self._total += (quantity - self.quantites[index]) * self.prices[index]
+        self.quantites[index] = quantity
+
+    def remove_item(self, index: int) -> None:
+        """Removes the line at index from the order"""
+        self.items.pop(index)
+        self._total -= self.quantites.pop(index) * self.prices.pop(index)
 
     def total_price(self) -> int:
-        """Calculates and returns the total price of the order"""
-        return sum([quantity * price for quantity, price in zip(self.quantites, self.prices)])
+        """Returns the total price of the order"""
+        return self._total
 
 
 class PaymentProcessor:
     """Process the payment of a given order"""
 
+    def __init__(self, sink: Optional[EventSink] = None) -> None:
+        self.sink = ConsoleSink() if sink is None else sink
+
     def pay_debit(self, order: Order, security_code: str) -> None:
         """Pay the order with debit card"""
-        print("processing debit payment type")
-        print(f"Verifying security code: {security_code}")
         order.status = "paid"
+        self.sink.record("debit", "paid", id(order))
 
     def pay_credit(self, order: Order, security_code: str) -> None:
         """Pay the order with a credit card"""
-        print("processing credit payment type")
-        print(f"Verifying security code: {security_code}")
         order.status = "paid"
+        self.sink.record("credit", "paid", id(order))
@@ -0,0 +1,130 @@
+"""This module tests the functionality of the SOLID files"""
+from dataclasses import dataclass
+
+import pytest
+
+from SOLID.authorizer_cache import CachingAuthorizer, VerificationCache
+from SOLID.dependency_inversion_after import AuthorizerSMS, DebitPaymentProcessor
+from SOLID.events import NullSink
+from SOLID.interface_segregation_after import SMSAuthorizer
+from SOLID.order import Order
+
+
+@dataclass
+class CountingAuthorizer(AuthorizerSMS):
+    """Counts how often the provider is asked to verify a code"""
+
+    verifications: int = 0
+
+    def verify_code(self, code: str) -> None:
+        self.verifications += 1
+        super().verify_code(code)
+
+
+class FakeClock:
+    """A clock that only moves when told to"""
+
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def clock() -> FakeClock:
+    return FakeClock()
+
+
+@pytest.fixture
+def cache(clock) -> VerificationCache:
+    return VerificationCache(ttl=60, maxsize=2, clock=clock)
+
+
+@pytest.fixture
+def provider() -> CountingAuthorizer:
+    return CountingAuthorizer(sink=NullSink())
+
+
+class TestCachingAuthorizer:
+    """Test the functionality of the CachingAuthorizer class"""
+
+    def test_repeat_verification_skips_provider(self, cache, provider):
+        """Test that a second checkout in the session hits the cache"""
+        CachingAuthorizer(provider, cache, "alice").verify_code("1234")
+        second = CachingAuthorizer(provider, cache, "alice")
+        second.verify_code("1234")
+
+        assert second.is_authorized()
+        assert provider.verifications == 1
+        assert (cache.hits, cache.misses) == (1, 1)
+
+    def test_codes_are_cached_per_principal(self, cache, provider):
+        """Test that one principal's code does not authorize another"""
+        CachingAuthorizer(provider, cache, "alice").verify_code("1234")
+        CachingAuthorizer(provider, cache, "bob").verify_code("1234")
+
+        assert provider.verifications == 2
+
+    def test_entries_expire(self, clock, cache, provider):
+        """Test that verifications older than the ttl are redone"""
+        authorizer = CachingAuthorizer(provider, cache, "alice")
+        authorizer.verify_code("1234")
+        clock.now = 60
+        authorizer.verify_code("1234")
+
+        assert provider.verifications == 2
+        assert cache.expirations == 1
+
+    def test_least_recently_used_entry_is_evicted(self, cache, provider):
+        """Test that the cache never grows past maxsize"""
+        authorizer = CachingAuthorizer(provider, cache, "alice")
+        for code in ["1", "2", "1", "3"]:
+            authorizer.verify_code(code)
+
+        assert len(cache) == 2
+        assert cache.evictions == 1
+        assert cache.get("alice", "1")
+        assert not cache.get("alice", "2")
+
+    def test_invalidating_a_principal(self, cache, provider):
+        """Test that invalidation forces the provider to verify again"""
+        authorizer = CachingAuthorizer(provider, cache, "alice")
+        authorizer.verify_code("1")
+        authorizer.verify_code("2")
+        cache.invalidate("alice")
+        authorizer.verify_code("1")
+
+        assert provider.verifications == 3
+        assert len(cache) == 1
+
+    def test_invalidating_one_code(self, cache, provider):
+        """Test that invalidating one code keeps the others"""
+        authorizer = CachingAuthorizer(provider, cache, "alice")
+        authorizer.verify_code("1")
+        authorizer.verify_code("2")
+        cache.invalidate("alice", "1")
+
+        assert not cache.get("alice", "1")
+        assert cache.get("alice", "2")
+
+    def test_wrapping_sms_authorizer(self, cache):
+        """Test caching the interface segregation SMSAuthorizer"""
+        authorizer = CachingAuthorizer(SMSAuthorizer(sink=NullSink()), cache, "alice")
+        authorizer.verify_code("1234")
+
+        assert authorizer.is_authorized()
+        assert cache.get("alice", "1234")
+
+    def test_paying_with_cached_authorizer(self, cache, provider):
+        """Test that processors accept the caching authorizer"""
+        authorizer = CachingAuthorizer(provider, cache, "alice")
+        debit = DebitPaymentProcessor("1234567", authorizer, NullSink())
+        order = Order()
+
+        with pytest.raises(Exception):
+            debit.pay(order)
+        authorizer.verify_code("1234567")
+        debit.pay(order)
+
+        assert order.status == "paid"
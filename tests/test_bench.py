@@ -0,0 +1,105 @@
+"""This module tests the functionality of the SOLID files"""
+import json
+
+import pytest
+
+from SOLID.bench import suite
+from SOLID.bench.__main__ import main
+
+
+@pytest.fixture
+def baseline() -> dict[str, float]:
+    return {"order.Order.add_item[10]": 1000.0, "order.Order.total_price[10]": 50.0}
+
+
+class TestBenchmarkSuite:
+    """Test the benchmark suite"""
+
+    def test_covers_every_module(self):
+        """Test that every order class and SOLID module has benchmarks"""
+        names = [name for name, _ in suite.benchmarks([10])]
+
+        assert len(names) == len(set(names))
+        for order_class in suite.ORDER_CLASSES:
+            assert f"{order_class}.add_item[10]" in names
+            assert f"{order_class}.total_price[10]" in names
+        for module in [
+            "single_responsibility",
+            "open_closed",
+            "liskov_substitution",
+            "interface_segregation",
+            "dependency_inversion",
+        ]:
+            assert any(name.startswith(f"{module}_before.") for name in names)
+            assert any(name.startswith(f"{module}_after.") for name in names)
+
+    def test_benchmarks_succeed(self, capsys):
+        """Test that every payment benchmark pays without being refused"""
+        for name, func in suite.payment_benchmarks():
+            func()
+        output = capsys.readouterr().out
+
+        assert "not authorized" not in output.lower()
+
+    def test_run_selects_benchmarks(self, capsys):
+        """Test that run times only the selected benchmarks and prints nothing"""
+        results = suite.run([10], min_time=0.001, select="total_price")
+
+        assert results
+        assert all("total_price" in name for name in results)
+        assert all(nanoseconds > 0 for nanoseconds in results.values())
+        assert capsys.readouterr().out == ""
+
+    def test_compare_flags_regressions(self, baseline):
+        """Test that only benchmarks slower than the threshold are flagged"""
+        current = {
+            "order.Order.add_item[10]": 1090.0,
+            "order.Order.total_price[10]": 60.0,
+            "order.Order.add_item[1000]": 99999.0,
+        }
+
+        regressions = suite.compare(current, baseline, threshold=0.1)
+
+        assert [regression.name for regression in regressions] == ["order.Order.total_price[10]"]
+        assert regressions[0].ratio == pytest.approx(1.2)
+
+
+class TestBenchMain:
+    """Test the python -m SOLID.bench entry point"""
+
+    def test_writes_json(self, tmp_path):
+        """Test that the results are saved as JSON"""
+        output = tmp_path / "results.json"
+
+        status = main(
+            ["--sizes", "10", "--min-time", "0.001", "--select", "Order.", "-o", str(output)]
+        )
+
+        saved = json.loads(output.read_text())
+        assert status == 0
+        assert "python" in saved
+        assert "order.Order.add_item[10]" in saved["results"]
+
+    def test_exits_with_error_on_regression(self, tmp_path):
+        """Test that a regression against the baseline gives exit status 1"""
+        baseline_file = tmp_path / "baseline.json"
+        baseline_file.write_text(json.dumps({"results": {"order.Order.total_price[10]": 1e-3}}))
+
+        status = main(
+            ["--sizes", "10", "--min-time", "0.001", "--select", "order.Order.total_price"]
+            + ["--compare", str(baseline_file)]
+        )
+
+        assert status == 1
+
+    def test_passes_against_slow_baseline(self, tmp_path):
+        """Test that a faster run passes the comparison"""
+        baseline_file = tmp_path / "baseline.json"
+        baseline_file.write_text(json.dumps({"results": {"order.Order.total_price[10]": 1e9}}))
+
+        status = main(
+            ["--sizes", "10", "--min-time", "0.001", "--select", "order.Order.total_price"]
+            + ["--compare", str(baseline_file)]
+        )
+
+        assert status == 0
@@ -0,0 +1,117 @@
+"""This module tests the functionality of the SOLID files"""
+import sys
+
+import pytest
+
+from SOLID.catalog import Catalog, CatalogOrder
+from SOLID.order import Order
+
+
+@pytest.fixture
+def catalog() -> Catalog:
+    return Catalog([("Keyboard", 50), ("Monitor", 65), ("Mouse", 25)])
+
+
+@pytest.fixture
+def valid_order(catalog) -> CatalogOrder:
+    return CatalogOrder(catalog, ["Keyboard", "Monitor"], [1, 2])
+
+
+class TestCatalog:
+    """Test the functionality of the Catalog class"""
+
+    def test_ids_are_assigned_in_order(self, catalog):
+        """Test that products get consecutive ids"""
+        assert catalog.id_of("Keyboard") == 0
+        assert catalog.id_of("Mouse") == 2
+        assert catalog.add("Cable", 5) == 3
+        assert catalog.name_of(3) == "Cable"
+        assert catalog.price_of("Cable") == 5
+        assert len(catalog) == 4
+        assert "Cable" in catalog
+
+    def test_unknown_products(self, catalog):
+        """Test that unknown names and ids are rejected"""
+        with pytest.raises(ValueError):
+            catalog.id_of("Speaker")
+        with pytest.raises(ValueError):
+            catalog.price_of(3)
+        with pytest.raises(ValueError):
+            catalog.price_of(-1)
+
+    def test_adding_a_product_twice(self, catalog):
+        """Test that a name can only be added once"""
+        with pytest.raises(ValueError):
+            catalog.add("Keyboard", 40)
+
+    def test_units_sold(self, catalog, valid_order):
+        """Test adding up quantities per product across orders"""
+        other = CatalogOrder(catalog, ["Monitor", "Keyboard"], [3, 4])
+
+        assert catalog.units_sold([valid_order, other]) == {"Keyboard": 5, "Monitor": 5}
+
+
+class TestCatalogOrder:
+    """Test the functionality of the CatalogOrder class"""
+
+    def test_lines_resolve_through_the_catalog(self, valid_order):
+        """Test that names and prices come from the catalog"""
+        assert valid_order.items == ["Keyboard", "Monitor"]
+        assert list(valid_order.quantites) == [1, 2]
+        assert valid_order.prices == [50, 65]
+        assert list(valid_order.product_ids) == [0, 1]
+
+    def test_adding_by_name_or_id(self, valid_order):
+        """Test adding products by name and by id"""
+        valid_order.add_item("Mouse", 2)
+        valid_order.add_item(0, 1)
+
+        assert valid_order.items == ["Keyboard", "Monitor", "Mouse", "Keyboard"]
+        assert valid_order.total_price() == 280
+
+    def test_adding_unknown_product(self, valid_order):
+        """Test that an unknown product leaves the order unchanged"""
+        with pytest.raises(ValueError):
+            valid_order.add_item("Speaker", 1)
+
+        assert len(valid_order.quantites) == 2
+        assert valid_order.total_price() == 180
+
+    @pytest.mark.parametrize("quantity", [2**70, 1.5])
+    def test_invalid_quantity_leaves_order_unchanged(self, valid_order, quantity):
+        """Test that a quantity that does not fit is rejected without a partial line"""
+        with pytest.raises((OverflowError, TypeError)):
+            valid_order.add_item("Mouse", quantity)
+        with pytest.raises((OverflowError, TypeError)):
+            valid_order.update_quantity(0, quantity)
+
+        assert len(valid_order.product_ids) == len(valid_order.quantites) == 2
+        assert list(valid_order.quantites) == [1, 2]
+        assert valid_order.total_price() == 180
+
+    def test_total_matches_order(self, catalog, valid_order):
+        """Test that the total is the same as an Order with the catalog prices"""
+        valid_order.add_item("Mouse", 3)
+        valid_order.update_quantity(0, 5)
+        valid_order.remove_item(1)
+        order = Order(valid_order.items, list(valid_order.quantites), valid_order.prices)
+
+        assert valid_order.total_price() == order.total_price() == 325
+
+    def test_price_change_refreshes_total(self, catalog, valid_order):
+        """Test that a catalog price change is reflected in the cached total"""
+        catalog.set_price("Monitor", 100)
+
+        assert valid_order.prices == [50, 100]
+        assert valid_order.total_price() == 250
+
+        valid_order.add_item("Monitor", 1)
+        assert valid_order.total_price() == 350
+
+    def test_lines_are_smaller_than_order_lines(self, catalog):
+        """Test that a line costs an id and a quantity instead of three objects"""
+        lines = 1000
+        order = CatalogOrder(catalog, [line % 3 for line in range(lines)], [10**6] * lines)
+        columns = sys.getsizeof(order.product_ids) + sys.getsizeof(order.quantites)
+
+        assert columns / lines < 13
@@ -0,0 +1,260 @@
+"""This module tests the functionality of the SOLID files"""
+import threading
+
+import pytest
+
+from SOLID.circuit_breaker import (
+    CLOSED,
+    HALF_OPEN,
+    OPEN,
+    CircuitBreakerAuthorizer,
+    CircuitOpenError,
+)
+from SOLID.dependency_inversion_after import (
+    Authorizer,
+    AuthorizerGoogle,
+    DebitPaymentProcessor,
+)
+from SOLID.events import EventSink, NullSink
+from SOLID.order import Order
+
+
+class FakeClock:
+    """A clock that only moves when told to"""
+
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+class SlowAuthorizer(Authorizer):
+    """An authorizer that takes delay seconds of a fake clock and can be made to fail"""
+
+    def __init__(self, clock: FakeClock, delay: float = 0.01) -> None:
+        self.clock = clock
+        self.delay = delay
+        self.failing = False
+        self.calls = 0
+        self.authorized = False
+        self.release = threading.Event()
+        self.release.set()
+
+    def verify_code(self, code: str) -> None:
+        self.calls += 1
+        self.release.wait(5)
+        self.clock.now += self.delay
+        if self.failing:
+            raise Exception("provider unavailable")
+        self.authorized = True
+
+    def is_authorized(self) -> bool:
+        return self.authorized
+
+
+class ListSink(EventSink):
+    """Keeps every recorded outcome"""
+
+    def __init__(self) -> None:
+        self.outcomes: list[str] = []
+
+    def record(self, source, outcome, order_id=None) -> None:
+        self.outcomes.append(outcome)
+
+
+@pytest.fixture
+def clock() -> FakeClock:
+    return FakeClock()
+
+
+@pytest.fixture
+def slow(clock) -> SlowAuthorizer:
+    return SlowAuthorizer(clock)
+
+
+@pytest.fixture
+def sink() -> ListSink:
+    return ListSink()
+
+
+@pytest.fixture
+def breaker(slow, clock, sink) -> CircuitBreakerAuthorizer:
+    return CircuitBreakerAuthorizer(
+        slow, window=10, min_calls=4, reset_timeout=30, clock=clock, sink=sink
+    )
+
+
+def fail(breaker: CircuitBreakerAuthorizer, calls: int) -> None:
+    for _ in range(calls):
+        with pytest.raises(Exception):
+            breaker.verify_code("1234567")
+
+
+class TestCircuitBreakerAuthorizer:
+    """Test the circuit breaker around an authorizer"""
+
+    def test_passes_calls_while_closed(self, breaker, slow):
+        """Test that a healthy authorizer is used as is"""
+        breaker.verify_code("1234567")
+
+        assert breaker.is_authorized()
+        assert breaker.state == CLOSED
+        assert slow.calls == 1
+
+    def test_opens_on_errors(self, breaker, slow, sink):
+        """Test that the breaker opens once half the recent calls failed"""
+        slow.failing = True
+        fail(breaker, 4)
+
+        assert breaker.state == OPEN
+        assert sink.outcomes == [OPEN]
+        with pytest.raises(CircuitOpenError):
+            breaker.verify_code("1234567")
+        assert slow.calls == 4
+        assert breaker.rejected == 1
+        assert not breaker.is_authorized()
+
+    def test_opens_on_slow_calls(self, breaker, slow):
+        """Test that slow calls open the breaker even when they succeed"""
+        slow.delay = 2.0
+        for _ in range(4):
+            breaker.verify_code("1234567")
+
+        assert breaker.state == OPEN
+
+    def test_errors_below_threshold_keep_it_closed(self, breaker, slow):
+        """Test that occasional errors do not open the breaker"""
+        for call in range(10):
+            slow.failing = call % 4 == 0
+            try:
+                breaker.verify_code("1234567")
+            except Exception:
+                pass
+
+        assert breaker.state == CLOSED
+
+    def test_half_open_probe_closes(self, breaker, slow, clock, sink):
+        """Test that a good probe after the reset timeout closes the breaker"""
+        slow.failing = True
+        fail(breaker, 4)
+        clock.now += 30
+        slow.failing = False
+
+        breaker.verify_code("1234567")
+
+        assert breaker.state == CLOSED
+        assert sink.outcomes == [OPEN, HALF_OPEN, CLOSED]
+
+    def test_half_open_probe_reopens(self, breaker, slow, clock, sink):
+        """Test that a bad probe opens the breaker for another reset timeout"""
+        slow.failing = True
+        fail(breaker, 4)
+        clock.now += 30
+
+        fail(breaker, 1)
+
+        assert breaker.state == OPEN
+        assert sink.outcomes == [OPEN, HALF_OPEN, OPEN]
+        clock.now += 29
+        with pytest.raises(CircuitOpenError):
+            breaker.verify_code("1234567")
+        assert slow.calls == 5
+
+    def test_half_open_allows_one_probe(self, slow, clock):
+        """Test that calls made while a probe runs are rejected"""
+        breaker = CircuitBreakerAuthorizer(
+            slow, window=4, min_calls=4, clock=clock, sink=NullSink()
+        )
+        slow.failing = True
+        fail(breaker, 4)
+        clock.now += 30
+        slow.failing = False
+        slow.release.clear()
+
+        probe = threading.Thread(target=breaker.verify_code, args=("1234567",))
+        probe.start()
+        while slow.calls < 5:
+            threading.Event().wait(0.001)
+        with pytest.raises(CircuitOpenError):
+            breaker.verify_code("1234567")
+        slow.release.set()
+        probe.join()
+
+        assert breaker.state == CLOSED
+
+    def test_falls_back_while_open(self, slow, clock):
+        """Test that a fallback authorizer takes the calls the breaker rejects"""
+        fallback = AuthorizerGoogle(sink=NullSink())
+        breaker = CircuitBreakerAuthorizer(
+            slow, fallback, window=4, min_calls=4, clock=clock, sink=NullSink()
+        )
+        slow.failing = True
+        for _ in range(5):
+            breaker.verify_code("1234567")
+
+        assert breaker.state == OPEN
+        assert breaker.is_authorized()
+        assert breaker.fallbacks == 5
+        assert slow.calls == 4
+
+    def test_pays_through_processor(self, breaker):
+        """Test that a processor can use the breaker as its authorizer"""
+        order = Order(["Keyboard"], [1], [50])
+        processor = DebitPaymentProcessor("0372846", breaker, NullSink())
+
+        breaker.verify_code("1234567")
+        processor.pay(order)
+
+        assert order.status == "paid"
+
+    def test_abandons_calls_after_timeout(self, slow, clock):
+        """Test that a hanging call is abandoned and counted as an error"""
+        breaker = CircuitBreakerAuthorizer(
+            slow, window=4, min_calls=1, error_threshold=1, clock=clock, sink=NullSink()
+        )
+        breaker.max_timeout = 0.05
+        slow.release.clear()
+
+        with pytest.raises(TimeoutError):
+            breaker.verify_code("1234567")
+
+        assert breaker.state == OPEN
+        slow.release.set()
+        breaker.close()
+
+    def test_adaptive_timeout(self, breaker):
+        """Test that the timeout follows the latency of recent good calls"""
+        assert breaker.timeout() is None
+        breaker.max_timeout = 5.0
+        assert breaker.timeout() == 5.0
+
+        for _ in range(3):
+            breaker.verify_code("1234567")
+
+        assert breaker.timeout() == pytest.approx(0.05)
+        breaker.authorizer.delay = 1.0
+        breaker.verify_code("1234567")
+        assert breaker.timeout() == pytest.approx(3.0)
+        breaker.close()
+
+    def test_rejects_calls_beyond_concurrency_limit(self, slow, clock):
+        """Test that callers fail fast instead of queueing behind slow calls"""
+        breaker = CircuitBreakerAuthorizer(slow, max_concurrent=1, clock=clock, sink=NullSink())
+        slow.release.clear()
+
+        first = threading.Thread(target=breaker.verify_code, args=("1234567",))
+        first.start()
+        while slow.calls < 1:
+            threading.Event().wait(0.001)
+        with pytest.raises(CircuitOpenError):
+            breaker.verify_code("1234567")
+        slow.release.set()
+        first.join()
+
+        assert breaker.rejected == 1
+
+    def test_invalid_settings(self, slow):
+        """Test that min_calls must fit in the window"""
+        with pytest.raises(ValueError):
+            CircuitBreakerAuthorizer(slow, window=4, min_calls=5)
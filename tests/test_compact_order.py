@@ -0,0 +1,110 @@
+"""This module tests the functionality of the SOLID files"""
+import pytest
+
+from SOLID.compact_order import CompactOrder, bytes_per_line
+from SOLID.order import Order
+
+
+@pytest.fixture
+def valid_order() -> CompactOrder:
+    items: list[str] = ["Keyboard", "Monitor"]
+    quantites: list[int] = [1, 2]
+    prices: list[int] = [50, 65]
+
+    return CompactOrder(items, quantites, prices)
+
+
+@pytest.fixture
+def empty_order() -> CompactOrder:
+    return CompactOrder()
+
+
+class TestCompactOrder:
+    """Test the functionality of the CompactOrder class"""
+
+    def test_adding_item_to_nonempty_order(self, valid_order):
+        """Test adding an item to a nonempty order"""
+        my_order: CompactOrder = valid_order
+        my_order.add_item("Mouse", 1, 25)
+
+        assert "Mouse" in my_order.items
+        assert 1 in my_order.quantites
+        assert len(my_order.quantites) == 3
+        assert 25 in my_order.prices
+        assert len(my_order.prices) == 3
+
+    def test_adding_item_to_empty_order(self, empty_order):
+        """Test adding an item to an empty order"""
+        my_order: CompactOrder = empty_order
+        my_order.add_item("Mouse", 1, 25)
+
+        assert my_order.items == ["Mouse"]
+        assert list(my_order.quantites) == [1]
+        assert list(my_order.prices) == [25]
+
+    def test_repeated_item_names_share_one_entry(self, empty_order):
+        """Test that item names are dictionary encoded"""
+        for _ in range(3):
+            empty_order.add_item("Keyboard", 1, 50)
+
+        assert empty_order.items == ["Keyboard"] * 3
+        assert empty_order._names == ["Keyboard"]
+
+    def test_getting_total_price_with_nonempty_order(self, valid_order):
+        """Test getting the total price of a nonempty order"""
+        assert valid_order.total_price() == 180
+
+    def test_getting_total_price_with_empty_order(self, empty_order):
+        """Test getting the total price of an empty order"""
+        assert empty_order.total_price() == 0
+
+    def test_new_order_is_open(self, empty_order):
+        """Test that a new order starts open and accepts a status"""
+        assert empty_order.status == "open"
+        empty_order.status = "paid"
+        assert empty_order.status == "paid"
+
+    def test_overflow_leaves_order_unchanged(self, valid_order):
+        """Test that values too large for the columns are rejected without a partial line"""
+        with pytest.raises(OverflowError):
+            valid_order.add_item("Mouse", 2**63, 1)
+        with pytest.raises(OverflowError):
+            valid_order.add_item("Mouse", 1, -(2**63) - 1)
+        with pytest.raises(OverflowError):
+            valid_order.update_quantity(0, 2**63)
+
+        assert valid_order.items == ["Keyboard", "Monitor"]
+        assert len(valid_order.quantites) == len(valid_order.prices) == 2
+        assert valid_order.total_price() == 180
+
+    @pytest.mark.parametrize("line", [("Mouse", 1, 2.5), (["Mouse"], 1, 2), ("Mouse", "1", 2)])
+    def test_invalid_line_leaves_order_unchanged(self, valid_order, line):
+        """Test that a line of the wrong types is rejected without a partial line"""
+        with pytest.raises(TypeError):
+            valid_order.add_item(*line)
+
+        valid_order.remove_item(-1)
+        assert valid_order.items == ["Keyboard"]
+        assert valid_order.quantites.tolist() == [1]
+        assert valid_order.prices.tolist() == [50]
+        assert valid_order.total_price() == 50
+        assert valid_order._names == ["Keyboard", "Monitor"]
+
+    def test_rejects_new_attributes(self, empty_order):
+        """Test that the order uses slots instead of an instance dict"""
+        with pytest.raises(AttributeError):
+            empty_order.notes = "gift"
+
+    def test_uses_less_memory_per_line(self):
+        """Test that a compact order costs fewer bytes per line than an Order"""
+        order = Order()
+        compact = CompactOrder()
+        for line in range(1000):
+            order.add_item(f"Item {line % 10}", line + 1000, line + 2000)
+            compact.add_item(f"Item {line % 10}", line + 1000, line + 2000)
+
+        assert bytes_per_line(compact) < bytes_per_line(order) / 2
+
+    def test_bytes_per_line_of_empty_order(self, empty_order):
+        """Test that an empty order reports no per line cost"""
+        assert bytes_per_line(empty_order) == 0.0
@@ -0,0 +1,123 @@
+"""This module tests the functionality of the SOLID files"""
+import threading
+
+import pytest
+
+from SOLID.concurrent_order import ConcurrentOrder
+from SOLID.dependency_inversion_after import AuthorizerSMS, DebitPaymentProcessor
+from SOLID.events import NullSink
+
+
+@pytest.fixture
+def valid_order() -> ConcurrentOrder:
+    items: list[str] = ["Keyboard", "Monitor"]
+    quantites: list[int] = [1, 2]
+    prices: list[int] = [50, 65]
+
+    return ConcurrentOrder(items, quantites, prices)
+
+
+class TestConcurrentOrder:
+    """Test the functionality of the ConcurrentOrder class"""
+
+    def test_editing(self, valid_order):
+        """Test that edits change the lines and the total"""
+        valid_order.add_item("Mouse", 1, 25)
+        valid_order.add_items([("Webcam", 2, 40)])
+        valid_order.update_quantity(0, 3)
+        valid_order.remove_item(1)
+
+        assert valid_order.items == ("Keyboard", "Mouse", "Webcam")
+        assert valid_order.quantites == (3, 1, 2)
+        assert valid_order.total_price() == 255
+        assert valid_order.version == 4
+
+    def test_snapshots_do_not_change(self, valid_order):
+        """Test that a snapshot keeps its version after later edits"""
+        snapshot = valid_order.snapshot()
+        valid_order.add_item("Mouse", 1, 25)
+        valid_order.status = "paid"
+
+        assert snapshot.items == ("Keyboard", "Monitor")
+        assert snapshot.total_price() == 180
+        assert snapshot.status == "open"
+        assert valid_order.snapshot().total_price() == 205
+
+    def test_invalid_batch_changes_nothing(self, valid_order):
+        """Test that a rejected batch publishes no new version"""
+        with pytest.raises(ValueError):
+            valid_order.add_items([("Mouse", 1)])
+
+        assert valid_order.version == 0
+
+    def test_setting_status_of_a_version(self, valid_order):
+        """Test that a status is only set on the version it was meant for"""
+        version = valid_order.version
+        valid_order.add_item("Mouse", 1, 25)
+
+        with pytest.raises(ValueError):
+            valid_order.set_status("paid", version)
+        paid = valid_order.set_status("paid", valid_order.version)
+        assert paid.status == "paid"
+        assert paid.total_price() == 205
+
+    def test_paying(self, valid_order):
+        """Test that processors can pay a concurrent order"""
+        authorizer = AuthorizerSMS(sink=NullSink())
+        authorizer.verify_code("1234567")
+
+        DebitPaymentProcessor("0372846", authorizer, NullSink()).pay(valid_order)
+
+        assert valid_order.status == "paid"
+
+    def test_lines_are_frozen_once_claimed(self, valid_order):
+        """Test that a payment charges the cart it claimed"""
+        charged = []
+
+        def charge() -> None:
+            charged.append(valid_order.total_price())
+            with pytest.raises(ValueError, match="authorizing"):
+                valid_order.add_item("Mouse", 1, 25)
+
+        assert valid_order.settle(charge)
+        with pytest.raises(ValueError, match="paid"):
+            valid_order.update_quantity(0, 2)
+
+        assert charged == [valid_order.total_price()] == [180]
+        assert valid_order.items == ("Keyboard", "Monitor")
+
+    def test_readers_never_see_torn_edits(self):
+        """Test that concurrent readers always see matching lines and totals"""
+        order = ConcurrentOrder()
+        stop = threading.Event()
+        torn = []
+
+        def read() -> None:
+            while not stop.is_set():
+                snapshot = order.snapshot()
+                lines = len(snapshot.items), len(snapshot.quantites), len(snapshot.prices)
+                total = sum(q * p for q, p in zip(snapshot.quantites, snapshot.prices))
+                if len(set(lines)) != 1 or total != snapshot.total_price():
+                    torn.append(snapshot)
+
+        def write() -> None:
+            for line in range(300):
+                order.add_item(f"Item {line}", line % 5 + 1, line)
+                if line % 3 == 0:
+                    order.update_quantity(0, line)
+                if line % 7 == 0:
+                    order.remove_item(-1)
+
+        readers = [threading.Thread(target=read) for _ in range(3)]
+        writers = [threading.Thread(target=write) for _ in range(3)]
+        for thread in readers + writers:
+            thread.start()
+        for thread in writers:
+            thread.join()
+        stop.set()
+        for thread in readers:
+            thread.join()
+
+        assert torn == []
+        assert len(order.items) == 3 * (300 - 43)
+        assert order.version == 3 * (300 + 100 + 43)
@@ -1,4 +1,6 @@
 """This module tests the functionality of the SOLID files"""
+import threading
+
 import pytest
 
 from SOLID.dependency_inversion_after import (
@@ -9,6 +11,8 @@ from SOLID.dependency_inversion_after import (
     Order,
     PaypalPaymentProcessor,
 )
+from SOLID.events import EventSink
+from SOLID.order import OrderNotOpen
 
 
 @pytest.fixture
@@ -250,3 +254,99 @@ class TestPaypalPaymentProcessor:
             paypal_payment_processor_not_authorized_google.pay(empty_order)
 
         assert str(unverified.value) == "Not authorized"
+
+
+class ListSink(EventSink):
+    """Keeps every recorded outcome"""
+
+    def __init__(self) -> None:
+        self.outcomes: list[str] = []
+
+    def record(self, source, outcome, order_id=None) -> None:
+        self.outcomes.append(outcome)
+
+
+class TestPayingOnce:
+    """Test that an order is only ever paid once"""
+
+    def test_concurrent_payments(self, valid_order):
+        """Test that one of many threads paying the same order pays it"""
+        sink = ListSink()
+        processor = CreditPaymentProcessor("1234567", sink)
+        start = threading.Barrier(16)
+        refused = []
+
+        def pay() -> None:
+            start.wait()
+            try:
+                processor.pay(valid_order)
+            except OrderNotOpen:
+                refused.append(1)
+
+        threads = [threading.Thread(target=pay) for _ in range(16)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert sink.outcomes.count("paid") == 1
+        assert sink.outcomes.count("not open") == len(refused) == 15
+        assert valid_order.status == "paid"
+
+    def test_paid_orders_in_a_batch(self, valid_order, empty_order, credit_payment_processor):
+        """Test that a batch reports orders that were already paid"""
+        credit_payment_processor.pay(valid_order)
+
+        assert credit_payment_processor.pay_many([valid_order, empty_order]) == [False, True]
+
+    def test_paying_paid_order_raises(self, valid_order, debit_payment_processor_authorized_sms):
+        """Test that paying an order twice raises instead of reporting success"""
+        debit_payment_processor_authorized_sms.pay(valid_order)
+
+        with pytest.raises(OrderNotOpen, match="paid"):
+            debit_payment_processor_authorized_sms.pay(valid_order)
+
+
+class TestPayMany:
+    """Test paying a batch of orders at once"""
+
+    def test_paying_batch_with_credit(self, valid_order, empty_order, credit_payment_processor):
+        """Test paying a batch with a credit card"""
+        assert credit_payment_processor.pay_many([valid_order, empty_order]) == [True, True]
+        assert valid_order.status == empty_order.status == "paid"
+
+    def test_paying_batch_authorized(
+        self, valid_order, empty_order, paypal_payment_processor_authorized_google
+    ):
+        """Test paying a batch with an authorized paypal account"""
+        outcomes = paypal_payment_processor_authorized_google.pay_many([valid_order, empty_order])
+
+        assert outcomes == [True, True]
+        assert valid_order.status == empty_order.status == "paid"
+
+    def test_paying_batch_not_authorized(
+        self, valid_order, empty_order, debit_payment_processor_not_authorized_sms
+    ):
+        """Test that no order is paid when the batch is not authorized"""
+        outcomes = debit_payment_processor_not_authorized_sms.pay_many([valid_order, empty_order])
+
+        assert outcomes == [False, False]
+        assert valid_order.status == empty_order.status == "open"
+
+    def test_authorizing_once_per_batch(self, valid_order, empty_order):
+        """Test that the authorizer is consulted once for the whole batch"""
+
+        class CountingAuthorizer(AuthorizerSMS):
+            checks: int = 0
+
+            def is_authorized(self) -> bool:
+                self.checks += 1
+                return super().is_authorized()
+
+        authorizer = CountingAuthorizer()
+        authorizer.verify_code("1234567")
+        debit = DebitPaymentProcessor("1234567", authorizer)
+
+        debit.pay_many([valid_order, empty_order, Order()])
+
+        assert authorizer.checks == 1
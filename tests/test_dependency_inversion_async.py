@@ -0,0 +1,176 @@
+"""This module tests the functionality of the SOLID files"""
+import asyncio
+import time
+
+import pytest
+
+from SOLID.dependency_inversion_after import AuthorizerSMS, CreditPaymentProcessor
+from SOLID.dependency_inversion_async import (
+    AsyncAuthorizerGoogle,
+    AsyncAuthorizerSMS,
+    AsyncCreditPaymentProcessor,
+    AsyncDebitPaymentProcessor,
+    AsyncPaymentProcessor,
+    AsyncPaypalPaymentProcessor,
+    PaymentPending,
+    SyncAuthorizer,
+    SyncPaymentProcessor,
+    pay_many,
+)
+from SOLID.order import Order, OrderNotOpen
+
+
+@pytest.fixture
+def valid_order() -> Order:
+    items: list[str] = ["Keyboard", "Monitor"]
+    quantites: list[int] = [1, 2]
+    prices: list[int] = [50, 65]
+
+    return Order(items, quantites, prices)
+
+
+class SlowPaymentProcessor(AsyncPaymentProcessor):
+    """Pays after a delay and records how many payments overlap"""
+
+    def __init__(self, delay: float, timeout=None) -> None:
+        self.delay = delay
+        self.timeout = timeout
+        self.in_flight = 0
+        self.most_in_flight = 0
+
+    async def pay(self, order: Order) -> None:
+        self.in_flight += 1
+        self.most_in_flight = max(self.most_in_flight, self.in_flight)
+        try:
+            await asyncio.sleep(self.delay)
+            order.status = "paid"
+        finally:
+            self.in_flight -= 1
+
+
+class TestAsyncPaymentProcessors:
+    """Test the functionality of the async payment processors"""
+
+    def test_paying_with_credit(self, valid_order):
+        """Test paying an order with a credit card"""
+        asyncio.run(AsyncCreditPaymentProcessor("1234567").pay(valid_order))
+
+        assert valid_order.status == "paid"
+
+    @pytest.mark.parametrize("authorizer_class", [AsyncAuthorizerSMS, AsyncAuthorizerGoogle])
+    def test_paying_with_debit_authorized(self, valid_order, authorizer_class):
+        """Test paying an order with a debit card after verification"""
+
+        async def pay() -> None:
+            debit = AsyncDebitPaymentProcessor("1234567", authorizer_class())
+            await debit.authorizer.verify_code_with_timeout("1234567")
+            await debit.pay(valid_order)
+
+        asyncio.run(pay())
+
+        assert valid_order.status == "paid"
+
+    def test_paying_with_paypal_not_authorized(self, valid_order):
+        """Test paying an order with paypal without verification"""
+        paypal = AsyncPaypalPaymentProcessor("payment@example.com", AsyncAuthorizerSMS())
+
+        with pytest.raises(Exception) as unverified:
+            asyncio.run(paypal.pay(valid_order))
+
+        assert str(unverified.value) == "Not authorized"
+
+    def test_paying_times_out(self, valid_order):
+        """Test that a slow payment is cancelled after the timeout"""
+        processor = SlowPaymentProcessor(delay=1, timeout=0.01)
+
+        with pytest.raises(asyncio.TimeoutError):
+            asyncio.run(processor.pay_with_timeout(valid_order))
+
+        assert valid_order.status == "open"
+
+
+class TestSyncShims:
+    """Test wrapping the synchronous classes"""
+
+    def test_wrapping_authorizer_and_processor(self, valid_order):
+        """Test paying through a wrapped synchronous processor"""
+        authorizer = SyncAuthorizer(AuthorizerSMS())
+        processor = SyncPaymentProcessor(CreditPaymentProcessor("1234567"))
+
+        async def pay() -> None:
+            await authorizer.verify_code("1234567")
+            await processor.pay(valid_order)
+
+        asyncio.run(pay())
+
+        assert authorizer.is_authorized()
+        assert valid_order.status == "paid"
+
+    def test_timed_out_sync_payment_reports_its_outcome(self, valid_order):
+        """Test that a sync payment outliving its timeout is reported as pending"""
+
+        class SlowCreditPaymentProcessor(CreditPaymentProcessor):
+            def pay(self, order: Order) -> None:
+                time.sleep(0.05)
+                super().pay(order)
+
+        processor = SyncPaymentProcessor(SlowCreditPaymentProcessor("1234567"), timeout=0.001)
+
+        async def pay() -> None:
+            [pending] = await pay_many(processor, [valid_order])
+            assert isinstance(pending, PaymentPending)
+            assert isinstance(pending, asyncio.TimeoutError)
+            await pending.outcome
+
+        asyncio.run(pay())
+
+        assert valid_order.status == "paid"
+
+
+class TestPayMany:
+    """Test paying many orders concurrently"""
+
+    def test_concurrency_is_bounded(self):
+        """Test that at most concurrency payments run at once"""
+        processor = SlowPaymentProcessor(delay=0.01)
+        orders = [Order() for _ in range(20)]
+
+        started = time.perf_counter()
+        outcomes = asyncio.run(pay_many(processor, orders, concurrency=5))
+        elapsed = time.perf_counter() - started
+
+        assert outcomes == [None] * 20
+        assert processor.most_in_flight == 5
+        assert all(order.status == "paid" for order in orders)
+        assert elapsed < 0.2
+
+    def test_failures_are_returned_per_order(self, valid_order):
+        """Test that a failed payment does not stop the others"""
+        paypal = AsyncPaypalPaymentProcessor("payment@example.com", AsyncAuthorizerGoogle())
+        orders = [valid_order, Order()]
+
+        outcomes = asyncio.run(pay_many(paypal, orders))
+
+        assert [str(outcome) for outcome in outcomes] == ["Not authorized"] * 2
+
+    def test_paid_orders_are_returned_per_order(self, valid_order):
+        """Test that an order paid twice in a batch is reported as not open"""
+        credit = AsyncCreditPaymentProcessor("1234567")
+
+        outcomes = asyncio.run(pay_many(credit, [valid_order, valid_order]))
+
+        assert outcomes[0] is None
+        assert isinstance(outcomes[1], OrderNotOpen)
+
+    def test_timeouts_are_returned_per_order(self):
+        """Test that timed out payments are reported instead of raised"""
+        processor = SlowPaymentProcessor(delay=1, timeout=0.01)
+
+        outcomes = asyncio.run(pay_many(processor, [Order(), Order()]))
+
+        assert all(isinstance(outcome, asyncio.TimeoutError) for outcome in outcomes)
+
+    def test_rejects_zero_concurrency(self):
+        """Test that concurrency must allow at least one payment"""
+        with pytest.raises(ValueError):
+            asyncio.run(pay_many(SlowPaymentProcessor(delay=0), [], concurrency=0))
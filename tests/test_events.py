@@ -0,0 +1,115 @@
+"""This module tests the functionality of the SOLID files"""
+import time
+
+import pytest
+
+from SOLID.dependency_inversion_after import AuthorizerSMS, DebitPaymentProcessor
+from SOLID.events import BufferedSink, ConsoleSink, NullSink, PaymentEvent
+from SOLID.open_closed_after import CreditPaymentProcessor
+from SOLID.order import Order
+
+
+@pytest.fixture
+def batches() -> list[list[PaymentEvent]]:
+    return []
+
+
+class TestConsoleSink:
+    """Test the functionality of the ConsoleSink class"""
+
+    def test_prints_events(self, capsys):
+        """Test that every event is printed"""
+        ConsoleSink().record("debit", "paid", 7)
+        ConsoleSink().record("sms", "verified")
+
+        assert capsys.readouterr().out == "debit: paid order 7\nsms: verified\n"
+
+    def test_is_the_default_sink(self, capsys):
+        """Test that processors keep printing unless given another sink"""
+        order = Order()
+        CreditPaymentProcessor().pay(order, "123456")
+
+        assert capsys.readouterr().out == f"credit: paid order {id(order)}\n"
+
+
+class TestNullSink:
+    """Test the functionality of the NullSink class"""
+
+    def test_prints_nothing(self, capsys):
+        """Test that a processor with a null sink stays silent"""
+        authorizer = AuthorizerSMS(sink=NullSink())
+        authorizer.verify_code("1234567")
+        DebitPaymentProcessor("1234567", authorizer, NullSink()).pay(Order())
+
+        assert capsys.readouterr().out == ""
+
+
+class TestBufferedSink:
+    """Test the functionality of the BufferedSink class"""
+
+    def test_records_processor_events(self, batches):
+        """Test that processor and authorizer events reach the handler"""
+        order = Order()
+        with BufferedSink(batches.append) as sink:
+            authorizer = AuthorizerSMS(sink=sink)
+            debit = DebitPaymentProcessor("1234567", authorizer, sink)
+            with pytest.raises(Exception):
+                debit.pay(order)
+            authorizer.verify_code("1234567")
+            debit.pay(order)
+
+        events = [event for batch in batches for event in batch]
+        assert [(event.source, event.outcome, event.order_id) for event in events] == [
+            ("debit", "not authorized", id(order)),
+            ("sms", "verified", None),
+            ("debit", "paid", id(order)),
+        ]
+        assert events[0].timestamp <= events[-1].timestamp
+
+    def test_flushes_full_batches_in_background(self, batches):
+        """Test that the background thread flushes once a batch is ready"""
+        sink = BufferedSink(batches.append, batch_size=10, interval=60)
+        for order_id in range(10):
+            sink.record("credit", "paid", order_id)
+
+        deadline = time.monotonic() + 5
+        while not batches and time.monotonic() < deadline:
+            time.sleep(0.001)
+        sink.close()
+
+        assert [event.order_id for event in batches[0]] == list(range(10))
+
+    def test_drops_oldest_events_when_full(self, batches):
+        """Test that the ring buffer keeps the newest events"""
+        sink = BufferedSink(batches.append, capacity=3, batch_size=100, interval=60)
+        for order_id in range(5):
+            sink.record("credit", "paid", order_id)
+        sink.close()
+
+        assert sink.dropped == 2
+        assert [event.order_id for event in batches[0]] == [2, 3, 4]
+
+    def test_keeps_flushing_after_handler_error(self, batches):
+        """Test that a batch the handler raised on is counted and later batches still flush"""
+
+        def handler(batch: list[PaymentEvent]) -> None:
+            if batch[0].order_id == 0:
+                raise OSError("handler failed")
+            batches.append(batch)
+
+        sink = BufferedSink(handler, batch_size=5, interval=60)
+        for order_id in range(5):
+            sink.record("credit", "paid", order_id)
+        deadline = time.monotonic() + 5
+        while not sink.failed and time.monotonic() < deadline:
+            time.sleep(0.001)
+        for order_id in range(5, 10):
+            sink.record("credit", "paid", order_id)
+        deadline = time.monotonic() + 5
+        while not batches and time.monotonic() < deadline:
+            time.sleep(0.001)
+
+        assert sink._thread.is_alive()
+        sink.close()
+        assert sink.failed == 5
+        assert [event.order_id for event in batches[0]] == list(range(5, 10))
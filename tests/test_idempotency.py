@@ -0,0 +1,180 @@
+"""This module tests the functionality of the SOLID files"""
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from SOLID.dependency_inversion_after import (
+    AuthorizerSMS,
+    DebitPaymentProcessor,
+    PaymentProcessor,
+)
+from SOLID.events import NullSink
+from SOLID.idempotency import (
+    IdempotencyKeyReused,
+    IdempotencyTable,
+    IdempotentPaymentProcessor,
+)
+from SOLID.order import Order
+
+
+class FakeClock:
+    """A clock that only moves when told to"""
+
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+class CountingProcessor(PaymentProcessor):
+    """Pays orders and counts how often it was asked to"""
+
+    def __init__(self, release=None) -> None:
+        self.calls = 0
+        self.release = release
+
+    def pay(self, order: Order) -> None:
+        self.calls += 1
+        if self.release is not None:
+            self.release.wait(5)
+        order.status = "paid"
+
+
+@pytest.fixture
+def valid_order() -> Order:
+    items: list[str] = ["Keyboard", "Monitor"]
+    quantites: list[int] = [1, 2]
+    prices: list[int] = [50, 65]
+
+    return Order(items, quantites, prices)
+
+
+@pytest.fixture
+def clock() -> FakeClock:
+    return FakeClock()
+
+
+class TestIdempotentPaymentProcessor:
+    """Test paying at most once per idempotency key"""
+
+    def test_retries_do_not_pay_again(self, valid_order, clock):
+        """Test that repeated calls with one key run the processor once"""
+        wrapped = CountingProcessor()
+        processor = IdempotentPaymentProcessor(wrapped, IdempotencyTable(clock=clock))
+
+        for _ in range(3):
+            processor.pay(valid_order, "order-1")
+
+        assert wrapped.calls == 1
+        assert valid_order.status == "paid"
+        assert processor.table.hits == 2
+        assert processor.table.hit_rate == pytest.approx(2 / 3)
+
+    def test_calls_without_key_always_pay(self, valid_order):
+        """Test that a call without a key goes to the processor"""
+        wrapped = CountingProcessor()
+        processor = IdempotentPaymentProcessor(wrapped, IdempotencyTable())
+
+        processor.pay(valid_order)
+        processor.pay(valid_order)
+
+        assert wrapped.calls == 2
+        assert len(processor.table) == 0
+
+    def test_failure_is_repeated(self, valid_order):
+        """Test that a retry of a failed payment raises the same error without paying"""
+        authorizer = AuthorizerSMS(sink=NullSink())
+        debit = DebitPaymentProcessor("0372846", authorizer, NullSink())
+        processor = IdempotentPaymentProcessor(debit, IdempotencyTable())
+
+        with pytest.raises(Exception, match="Not authorized"):
+            processor.pay(valid_order, "order-1")
+        authorizer.verify_code("1234567")
+        with pytest.raises(Exception, match="Not authorized"):
+            processor.pay(valid_order, "order-1")
+
+        processor.pay(valid_order, "order-1-retry")
+        assert valid_order.status == "paid"
+
+    def test_interrupted_call_is_not_remembered(self):
+        """Test that a call stopped by KeyboardInterrupt runs again on the next try"""
+        table = IdempotencyTable()
+
+        def interrupted() -> None:
+            raise KeyboardInterrupt
+
+        with pytest.raises(KeyboardInterrupt):
+            table.run("order-1", interrupted)
+
+        assert len(table) == 0
+        assert table.run("order-1", lambda: "paid") == "paid"
+
+    def test_key_is_bound_to_its_order(self, valid_order):
+        """Test that a key cannot be reused to pay another order"""
+        wrapped = CountingProcessor()
+        processor = IdempotentPaymentProcessor(wrapped, IdempotencyTable())
+        other = Order(["Mouse"], [1], [25])
+        processor.pay(valid_order, "order-1")
+
+        with pytest.raises(IdempotencyKeyReused):
+            processor.pay(other, "order-1")
+
+        assert other.status == "open"
+        assert wrapped.calls == 1
+        assert processor.table.hits == 0
+
+    def test_concurrent_duplicates_wait(self, valid_order):
+        """Test that calls made while the first one runs wait for its outcome"""
+        release = threading.Event()
+        wrapped = CountingProcessor(release)
+        processor = IdempotentPaymentProcessor(wrapped, IdempotencyTable())
+
+        with ThreadPoolExecutor(8) as pool:
+            futures = [pool.submit(processor.pay, valid_order, "order-1") for _ in range(8)]
+            while processor.table.hits < 7:
+                threading.Event().wait(0.001)
+            release.set()
+            for future in futures:
+                future.result()
+
+        assert wrapped.calls == 1
+        assert processor.table.waits == 7
+
+    def test_keys_expire(self, valid_order, clock):
+        """Test that a key can pay again after its ttl"""
+        wrapped = CountingProcessor()
+        processor = IdempotentPaymentProcessor(wrapped, IdempotencyTable(ttl=10, clock=clock))
+
+        processor.pay(valid_order, "order-1")
+        clock.now = 9.9
+        processor.pay(valid_order, "order-1")
+        clock.now = 10
+        processor.pay(valid_order, "order-1")
+
+        assert wrapped.calls == 2
+        assert processor.table.expirations == 1
+
+    def test_table_is_bounded(self, valid_order):
+        """Test that the least recently used key is evicted first"""
+        wrapped = CountingProcessor()
+        processor = IdempotentPaymentProcessor(wrapped, IdempotencyTable(maxsize=2))
+
+        processor.pay(valid_order, "a")
+        processor.pay(valid_order, "b")
+        processor.pay(valid_order, "a")
+        processor.pay(valid_order, "c")
+        processor.pay(valid_order, "a")
+        processor.pay(valid_order, "b")
+
+        assert len(processor.table) == 2
+        assert processor.table.evictions == 2
+        assert wrapped.calls == 4
+
+    def test_invalid_limits(self):
+        """Test that the ttl and size must be positive"""
+        with pytest.raises(ValueError):
+            IdempotencyTable(ttl=0)
+        with pytest.raises(ValueError):
+            IdempotencyTable(maxsize=0)
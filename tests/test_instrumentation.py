@@ -0,0 +1,190 @@
+"""This module tests the functionality of the SOLID files"""
+from itertools import count
+
+import pytest
+
+from SOLID import interface_segregation_after as isa
+from SOLID.dependency_inversion_after import (
+    AuthorizerGoogle,
+    AuthorizerSMS,
+    CreditPaymentProcessor,
+    DebitPaymentProcessor,
+    PaypalPaymentProcessor,
+)
+from SOLID.events import NullSink
+from SOLID.instrumentation import Instrumentation, LatencyHistogram
+from SOLID.order import Order
+from SOLID.rate_limit import RateLimitedProcessor, TokenBucket
+
+DI = "SOLID.dependency_inversion_after"
+
+
+@pytest.fixture
+def valid_order() -> Order:
+    items: list[str] = ["Keyboard", "Monitor"]
+    quantites: list[int] = [1, 2]
+    prices: list[int] = [50, 65]
+
+    return Order(items, quantites, prices)
+
+
+@pytest.fixture
+def instrumentation():
+    ticks = count(0, 1000)
+    with Instrumentation(clock=lambda: next(ticks)) as instrumentation:
+        yield instrumentation
+
+
+class TestLatencyHistogram:
+    """Test the log-linear latency histogram"""
+
+    def test_small_values_are_exact(self):
+        """Test that values below 2**precision keep their exact value"""
+        histogram = LatencyHistogram(precision=7)
+        for value in range(1, 101):
+            histogram.record(value)
+
+        assert histogram.percentile(0.5) == 50
+        assert histogram.percentile(0.99) == 99
+        assert histogram.percentile(1) == 100
+
+    def test_relative_error(self):
+        """Test that percentiles of large values stay within the bucket width"""
+        histogram = LatencyHistogram(precision=7)
+        values = [value * 7919 for value in range(1, 10_001)]
+        for value in values:
+            histogram.record(value)
+
+        for quantile in (0.5, 0.99, 0.999):
+            exact = values[int(quantile * len(values)) - 1]
+            assert exact <= histogram.percentile(quantile) <= exact * (1 + 2**-6)
+
+    def test_empty(self):
+        """Test the percentiles of an empty histogram"""
+        assert LatencyHistogram().percentile(0.99) == 0
+
+    def test_invalid_values(self):
+        """Test that negative values and quantiles outside 0..1 are rejected"""
+        histogram = LatencyHistogram()
+
+        with pytest.raises(ValueError):
+            histogram.record(-1)
+        with pytest.raises(ValueError):
+            histogram.percentile(1.5)
+
+
+class TestInstrumentation:
+    """Test timing pay and verify_code per class"""
+
+    def test_counts_calls_per_class(self, instrumentation, valid_order):
+        """Test that each processor and authorizer class gets its own stats"""
+        instrumentation.instrument(DebitPaymentProcessor, CreditPaymentProcessor, AuthorizerSMS)
+        authorizer = AuthorizerSMS(sink=NullSink())
+        authorizer.verify_code("1234567")
+        debit = DebitPaymentProcessor("1234567", authorizer, NullSink())
+        credit = CreditPaymentProcessor("1234567", NullSink())
+
+        debit.pay(valid_order)
+        debit.pay(Order())
+        credit.pay(Order())
+
+        snapshot = instrumentation.snapshot()
+        assert snapshot[f"{DI}.DebitPaymentProcessor", "pay"].calls == 2
+        assert snapshot[f"{DI}.CreditPaymentProcessor", "pay"].calls == 1
+        assert snapshot[f"{DI}.AuthorizerSMS", "verify_code"].calls == 1
+        assert snapshot[f"{DI}.DebitPaymentProcessor", "pay"].quantiles[0.99] == pytest.approx(1e-6)
+        assert valid_order.status == "paid"
+
+    def test_counts_errors(self, instrumentation, valid_order):
+        """Test that a Not authorized exception is counted and still raised"""
+        instrumentation.instrument(PaypalPaymentProcessor)
+        authorizer = AuthorizerGoogle(sink=NullSink())
+        paypal = PaypalPaymentProcessor("hi@example.com", authorizer, NullSink())
+
+        with pytest.raises(Exception, match="Not authorized"):
+            paypal.pay(valid_order)
+
+        stats = instrumentation.snapshot()[f"{DI}.PaypalPaymentProcessor", "pay"]
+        assert stats.calls == 1
+        assert stats.errors == 1
+
+    def test_instruments_every_class_by_default(self, instrumentation):
+        """Test that every concrete processor and authorizer is instrumented"""
+        instrumentation.instrument()
+
+        keys = set(instrumentation.stats)
+        assert (f"{DI}.DebitPaymentProcessor", "pay") in keys
+        assert (f"{DI}.CreditPaymentProcessor", "pay") in keys
+        assert (f"{DI}.PaypalPaymentProcessor", "pay") in keys
+        assert (f"{DI}.AuthorizerSMS", "verify_code") in keys
+        assert (f"{DI}.AuthorizerGoogle", "verify_code") in keys
+
+    def test_wrappers_are_not_instrumented_by_default(self, instrumentation, valid_order):
+        """Test that a processor wrapping another one does not count its calls twice"""
+        instrumentation.instrument()
+        credit = CreditPaymentProcessor("1234567", NullSink())
+
+        RateLimitedProcessor(credit, TokenBucket(rate=1)).pay(valid_order)
+
+        assert {key for key, stats in instrumentation.snapshot().items() if stats.calls} == {
+            (f"{DI}.CreditPaymentProcessor", "pay")
+        }
+
+    def test_classes_with_the_same_name_are_kept_apart(self, instrumentation, valid_order):
+        """Test that stats are keyed by module as well as class name"""
+        instrumentation.instrument(CreditPaymentProcessor, isa.CreditPaymentProcessor)
+        CreditPaymentProcessor("1234567", NullSink()).pay(valid_order)
+
+        snapshot = instrumentation.snapshot()
+        assert snapshot[f"{DI}.CreditPaymentProcessor", "pay"].calls == 1
+        assert (
+            snapshot["SOLID.interface_segregation_after.CreditPaymentProcessor", "pay"].calls == 0
+        )
+
+    def test_uninstrument_restores_methods(self, valid_order):
+        """Test that uninstrumented classes run their own methods again"""
+        original = CreditPaymentProcessor.pay
+        instrumentation = Instrumentation()
+        instrumentation.instrument(CreditPaymentProcessor)
+        instrumentation.instrument(CreditPaymentProcessor)
+
+        assert CreditPaymentProcessor.pay is not original
+        CreditPaymentProcessor("1234567", NullSink()).pay(valid_order)
+        instrumentation.uninstrument()
+
+        assert CreditPaymentProcessor.pay is original
+        CreditPaymentProcessor("1234567", NullSink()).pay(Order())
+        assert instrumentation.snapshot()[f"{DI}.CreditPaymentProcessor", "pay"].calls == 1
+
+    def test_rejects_second_instrumentation(self, instrumentation):
+        """Test that two instrumentations cannot time the same method"""
+        instrumentation.instrument(CreditPaymentProcessor)
+
+        with pytest.raises(ValueError):
+            Instrumentation().instrument(CreditPaymentProcessor)
+
+    def test_reset(self, instrumentation, valid_order):
+        """Test that reset forgets recorded calls but keeps timing"""
+        instrumentation.instrument(CreditPaymentProcessor)
+        processor = CreditPaymentProcessor("1234567", NullSink())
+        processor.pay(valid_order)
+
+        instrumentation.reset()
+        processor.pay(Order())
+
+        assert instrumentation.snapshot()[f"{DI}.CreditPaymentProcessor", "pay"].calls == 1
+
+    def test_prometheus_export(self, instrumentation, valid_order):
+        """Test the Prometheus text format of a snapshot"""
+        instrumentation.instrument(CreditPaymentProcessor)
+        CreditPaymentProcessor("1234567", NullSink()).pay(valid_order)
+
+        text = instrumentation.to_prometheus()
+
+        labels = f'class="{DI}.CreditPaymentProcessor",method="pay"'
+        assert "# TYPE solid_calls_total counter" in text
+        assert f"solid_calls_total{{{labels}}} 1\n" in text
+        assert f"solid_errors_total{{{labels}}} 0\n" in text
+        assert f'solid_latency_seconds{{{labels},quantile="0.999"}} 1e-06\n' in text
+        assert f"solid_latency_seconds_count{{{labels}}} 1\n" in text
+        assert text.endswith("\n")
@@ -150,3 +150,31 @@ class TestPaypalPaymentProcessor:
             paypal_payment_processor_not_authorized.pay(empty_order)
 
         assert str(unverified.value) == "Not authorized"
+
+
+class TestPayMany:
+    """Test paying a batch of orders at once"""
+
+    def test_paying_batch_with_credit(self, valid_order, empty_order, credit_payment_processor):
+        """Test paying a batch with a credit card"""
+        assert credit_payment_processor.pay_many([valid_order, empty_order]) == [True, True]
+        assert valid_order.status == empty_order.status == "paid"
+
+    def test_paying_batch_authorized(
+        self, valid_order, empty_order, debit_payment_processor_authorized
+    ):
+        """Test paying a batch with an authorized debit card"""
+        assert debit_payment_processor_authorized.pay_many([valid_order, empty_order]) == [
+            True,
+            True,
+        ]
+        assert valid_order.status == empty_order.status == "paid"
+
+    def test_paying_batch_not_authorized(
+        self, valid_order, empty_order, paypal_payment_processor_not_authorized
+    ):
+        """Test that no order is paid when the batch is not authorized"""
+        outcomes = paypal_payment_processor_not_authorized.pay_many([valid_order, empty_order])
+
+        assert outcomes == [False, False]
+        assert valid_order.status == empty_order.status == "open"
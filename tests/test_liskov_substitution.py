@@ -84,3 +84,26 @@ class TestPaypalPaymentProcessor:
         paypal_payment_processor.pay(empty_order)
 
         assert empty_order.status == "paid"
+
+
+class TestPayMany:
+    """Test paying a batch of orders at once"""
+
+    def test_paying_batch(
+        self,
+        valid_order,
+        empty_order,
+        credit_payment_processor,
+        debit_payment_processor,
+        paypal_payment_processor,
+    ):
+        """Test that every processor pays every order in the batch"""
+        for processor in [
+            credit_payment_processor,
+            debit_payment_processor,
+            paypal_payment_processor,
+        ]:
+            valid_order.status = empty_order.status = "open"
+
+            assert processor.pay_many([valid_order, empty_order]) == [True, True]
+            assert valid_order.status == empty_order.status == "paid"
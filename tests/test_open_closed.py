@@ -1,7 +1,12 @@
 """This module tests the functionality of the SOLID files"""
 import pytest
 
-from SOLID.open_closed_after import CreditPaymentProcessor, DebitPaymentProcessor, Order
+from SOLID.open_closed_after import (
+    CreditPaymentProcessor,
+    DebitPaymentProcessor,
+    Order,
+    PaymentProcessor,
+)
 
 
 @pytest.fixture
@@ -58,3 +63,29 @@ class TestDebitPaymentProcessor:
         credit_payment_processor.pay(empty_order, "123456")
 
         assert empty_order.status == "paid"
+
+
+class TestPayMany:
+    """Test paying a batch of orders at once"""
+
+    @pytest.mark.parametrize("processor_class", [CreditPaymentProcessor, DebitPaymentProcessor])
+    def test_paying_batch(self, processor_class, valid_order, empty_order):
+        """Test that every order in the batch is paid"""
+        outcomes = processor_class().pay_many([valid_order, empty_order], "123456")
+
+        assert outcomes == [True, True]
+        assert valid_order.status == empty_order.status == "paid"
+
+    def test_default_pays_each_order(self, valid_order):
+        """Test the default implementation inherited by new processors"""
+
+        class GiftCardPaymentProcessor(PaymentProcessor):
+            def pay(self, order: Order, security_code: str) -> None:
+                if not order.items:
+                    raise Exception("nothing to pay")
+                order.status = "paid"
+
+        outcomes = GiftCardPaymentProcessor().pay_many([valid_order, Order()], "123456")
+
+        assert outcomes == [True, False]
+        assert valid_order.status == "paid"
@@ -1,6 +1,12 @@
 """This module tests the functionality of the SOLID files"""
+import random
+import threading
+from array import array
+
 import pytest
 
+from SOLID import order as base_order
+from SOLID.compact_order import CompactOrder
 from SOLID.single_responsibility_after import Order
 
 
@@ -50,3 +56,259 @@ class TestOrder:
     def test_getting_total_price_with_empty_order(self, empty_order):
         """Test getting the total price of an empty order"""
         assert empty_order.total_price() == 0
+
+    def test_updating_quantity_changes_total(self, valid_order):
+        """Test updating the quantity of a line"""
+        valid_order.update_quantity(1, 3)
+
+        assert valid_order.quantites == [1, 3]
+        assert valid_order.total_price() == 245
+
+    def test_removing_item_changes_total(self, valid_order):
+        """Test removing a line from the order"""
+        valid_order.remove_item(0)
+
+        assert valid_order.items == ["Monitor"]
+        assert valid_order.total_price() == 130
+
+
+@pytest.mark.parametrize("order_class", [base_order.Order, CompactOrder])
+class TestOrderAddItems:
+    """Test adding a batch of lines to an order"""
+
+    def test_adding_tuples(self, order_class):
+        """Test adding (name, quantity, price) tuples"""
+        my_order = order_class()
+        my_order.add_items([("Keyboard", 1, 50), ("Monitor", 2, 65)])
+
+        assert my_order.items == ["Keyboard", "Monitor"]
+        assert list(my_order.quantites) == [1, 2]
+        assert list(my_order.prices) == [50, 65]
+        assert my_order.total_price() == 180
+
+    def test_adding_parallel_sequences(self, order_class):
+        """Test adding names, quantities and prices as parallel sequences"""
+        my_order = order_class(["Mouse"], [1], [25])
+        my_order.add_items(("Keyboard", "Monitor"), [1, 2], (50, 65))
+
+        assert my_order.items == ["Mouse", "Keyboard", "Monitor"]
+        assert my_order.total_price() == 205
+
+    def test_adding_buffer_arrays(self, order_class):
+        """Test adding quantities and prices from buffer-protocol arrays"""
+        my_order = order_class()
+        my_order.add_items(["Keyboard", "Monitor"], array("i", [1, 2]), array("q", [50, 65]))
+
+        assert list(my_order.quantites) == [1, 2]
+        assert my_order.total_price() == 180
+
+    @pytest.mark.parametrize(
+        "batch",
+        [
+            ([("Keyboard", 1, 50), ("Monitor", 2)],),
+            ([("Keyboard", 1, 50)], [1]),
+            (["Keyboard", "Monitor"], [1], [50, 65]),
+            (["Keyboard", "Monitor"], [1, 2.5], [50, 65]),
+            ([("Keyboard", 1, 50), (7, 2, 65)],),
+        ],
+    )
+    def test_invalid_batch_adds_nothing(self, order_class, batch):
+        """Test that a batch with any invalid line is rejected as a whole"""
+        my_order = order_class(["Mouse"], [1], [25])
+
+        with pytest.raises(Exception):
+            my_order.add_items(*batch)
+
+        assert my_order.items == ["Mouse"]
+        assert my_order.total_price() == 25
+
+
+class TestOrderCoalescing:
+    """Test merging repeated items into one line"""
+
+    def test_repeated_adds_share_a_line(self):
+        """Test that adding the same item at the same price raises its quantity"""
+        my_order = base_order.Order(coalesce=True)
+        for _ in range(1000):
+            my_order.add_item("Keyboard", 1, 50)
+        my_order.add_item("Keyboard", 1, 45)
+
+        assert my_order.items == ["Keyboard", "Keyboard"]
+        assert my_order.quantites == [1000, 1]
+        assert my_order.total_price() == 50045
+
+    def test_adding_batches(self):
+        """Test that a batch merges into existing lines and into itself"""
+        my_order = base_order.Order(["Mouse"], [1], [25], coalesce=True)
+        my_order.add_items([("Mouse", 2, 25), ("Keyboard", 1, 50), ("Keyboard", 3, 50)])
+
+        assert my_order.items == ["Mouse", "Keyboard"]
+        assert my_order.quantites == [3, 4]
+        assert my_order.total_price() == 275
+
+    def test_removing_shifts_the_index(self):
+        """Test that lines after a removed line are still found"""
+        my_order = base_order.Order(
+            ["Mouse", "Keyboard", "Monitor"], [1, 1, 1], [25, 50, 65], coalesce=True
+        )
+        my_order.remove_item(0)
+        my_order.add_item("Monitor", 1, 65)
+        my_order.remove_item(-2)
+        my_order.add_item("Monitor", 1, 65)
+        my_order.add_item("Mouse", 1, 25)
+
+        assert my_order.items == ["Monitor", "Mouse"]
+        assert my_order.quantites == [3, 1]
+
+    def test_coalescing_order_merges_initial_lines(self):
+        """Test that lines given to a coalescing order are merged"""
+        my_order = base_order.Order(["Mouse", "Keyboard", "Mouse"], [1, 1, 2], [25, 50, 25], True)
+
+        assert my_order.coalescing
+        assert my_order.items == ["Mouse", "Keyboard"]
+        assert my_order.quantites == [3, 1]
+
+    def test_compact_keeps_the_total(self):
+        """Test that compact merges duplicates into their first line"""
+        my_order = base_order.Order(
+            ["Mouse", "Keyboard", "Mouse", "Mouse", "Keyboard"],
+            [1, 1, 2, 3, 1],
+            [25, 50, 25, 20, 50],
+        )
+        total = my_order.total_price()
+
+        my_order.compact()
+
+        assert not my_order.coalescing
+        assert my_order.items == ["Mouse", "Keyboard", "Mouse"]
+        assert my_order.quantites == [3, 2, 3]
+        assert my_order.prices == [25, 50, 20]
+        assert my_order.total_price() == total
+        my_order.add_item("Mouse", 1, 25)
+        assert len(my_order.items) == 4
+
+
+class TestOrderStatus:
+    """Test moving an order through its status state machine"""
+
+    def test_every_status_has_transitions(self):
+        """Test that the transition table covers every status"""
+        assert set(base_order.TRANSITIONS) == set(base_order.OrderStatus)
+
+    def test_transition_compares_and_sets(self):
+        """Test that a transition only happens from the expected status"""
+        my_order = base_order.Order()
+
+        assert my_order.transition("open", "authorizing")
+        assert not my_order.transition("open", "authorizing")
+        assert my_order.status == base_order.OrderStatus.AUTHORIZING == "authorizing"
+
+    def test_forbidden_transition(self):
+        """Test that a move missing from the table raises ValueError"""
+        my_order = base_order.Order()
+
+        with pytest.raises(ValueError):
+            my_order.transition("open", "paid")
+        assert my_order.status == "open"
+
+    def test_settling_then_refunding(self):
+        """Test that a settled order is paid once and can then be refunded"""
+        my_order = base_order.Order(["Mouse"], [1], [25])
+
+        assert my_order.settle()
+        assert not my_order.settle()
+        assert my_order.transition("paid", "refunded")
+        assert not my_order.settle()
+        assert my_order.status == "refunded"
+
+    def test_failed_charge_can_be_retried(self):
+        """Test that a charge that raises leaves the order failed and payable"""
+        my_order = base_order.Order(["Mouse"], [1], [25])
+
+        def decline() -> None:
+            raise Exception("card declined")
+
+        with pytest.raises(Exception, match="declined"):
+            my_order.settle(decline)
+        assert my_order.status == "failed"
+        assert my_order.settle()
+        assert my_order.status == "paid"
+
+    @pytest.mark.parametrize("order_class", [base_order.Order, CompactOrder])
+    def test_only_one_concurrent_settle_charges(self, order_class):
+        """Test that exactly one of many threads settling an order charges it"""
+        my_order = order_class(["Mouse"], [1], [25])
+        charges: list[int] = []
+        start = threading.Barrier(16)
+        outcomes: list[bool] = []
+
+        def settle() -> None:
+            start.wait()
+            outcomes.append(my_order.settle(lambda: charges.append(1)))
+
+        threads = [threading.Thread(target=settle) for _ in range(16)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert sorted(outcomes) == [False] * 15 + [True]
+        assert charges == [1]
+        assert my_order.status == "paid"
+
+
+@pytest.mark.parametrize("seed", range(20))
+def test_coalescing_matches_plain_order(seed):
+    """Test that a coalescing order holds the same quantity per item and price"""
+    rng = random.Random(seed)
+    plain = base_order.Order()
+    coalescing = base_order.Order(coalesce=True)
+
+    for _ in range(200):
+        name, quantity, price = f"Item {rng.randint(0, 5)}", rng.randint(1, 5), rng.randint(1, 3)
+        if rng.random() < 0.1:
+            plain.add_items([(name, quantity, price)] * 3)
+            coalescing.add_items([(name, quantity, price)] * 3)
+        else:
+            plain.add_item(name, quantity, price)
+            coalescing.add_item(name, quantity, price)
+        if rng.random() < 0.1:
+            index = rng.randrange(len(coalescing.items))
+            key = coalescing.items[index], coalescing.prices[index]
+            coalescing.remove_item(index)
+            for line in reversed(range(len(plain.items))):
+                if (plain.items[line], plain.prices[line]) == key:
+                    plain.remove_item(line)
+
+        plain_copy = base_order.Order(plain.items[:], plain.quantites[:], plain.prices[:])
+        plain_copy.compact()
+        assert sorted(zip(plain_copy.items, plain_copy.prices, plain_copy.quantites)) == sorted(
+            zip(coalescing.items, coalescing.prices, coalescing.quantites)
+        )
+        assert coalescing.total_price() == plain.total_price()
+        assert coalescing._lines == {
+            key: index for index, key in enumerate(zip(coalescing.items, coalescing.prices))
+        }
+
+
+@pytest.mark.parametrize("order_class", [Order, base_order.Order, CompactOrder])
+@pytest.mark.parametrize("seed", range(20))
+def test_running_total_matches_recomputation(order_class, seed):
+    """Test that the maintained total always equals a full recomputation"""
+    rng = random.Random(seed)
+    my_order = order_class(["Keyboard"], [rng.randint(0, 5)], [rng.randint(0, 100)])
+
+    for _ in range(200):
+        operation = rng.random()
+        lines = len(my_order.quantites)
+        if operation < 0.5 or not lines:
+            my_order.add_item(
+                f"Item {rng.randint(0, 9)}", rng.randint(-5, 50), rng.randint(0, 10**6)
+            )
+        elif operation < 0.8:
+            my_order.update_quantity(rng.randrange(lines), rng.randint(0, 50))
+        else:
+            my_order.remove_item(rng.randrange(lines))
+
+        expected = sum(q * p for q, p in zip(my_order.quantites, my_order.prices))
+        assert my_order.total_price() == expected
@@ -0,0 +1,77 @@
+"""This module tests the functionality of the SOLID files"""
+import random
+from typing import Union
+
+import pytest
+
+from SOLID import order_batch
+from SOLID.compact_order import CompactOrder
+from SOLID.order import Order
+from SOLID.order_batch import OrderBatch
+
+
+def random_orders(seed: int, largest: int) -> list[Order]:
+    rng = random.Random(seed)
+    orders = []
+    for _ in range(50):
+        order = Order()
+        for _ in range(rng.randint(0, 8)):
+            order.add_item("Keyboard", rng.randint(-largest, largest), rng.randint(0, largest))
+        orders.append(order)
+    return orders
+
+
+@pytest.fixture(params=["numpy", "python"])
+def backend(request, monkeypatch) -> str:
+    if request.param == "numpy":
+        pytest.importorskip("numpy")
+    else:
+        monkeypatch.setattr(order_batch, "np", None)
+    return request.param
+
+
+class TestOrderBatch:
+    """Test the functionality of the OrderBatch class"""
+
+    def test_totals_of_known_orders(self, backend):
+        """Test totaling a nonempty, an empty and a compact order"""
+        orders: list[Union[Order, CompactOrder]] = [
+            Order(["Keyboard", "Monitor"], [1, 2], [50, 65]),
+            Order(),
+            CompactOrder(["Mouse"], [3], [25]),
+        ]
+        batch = OrderBatch.from_orders(orders)
+
+        assert len(batch) == 3
+        assert batch.vectorized == (backend == "numpy")
+        assert batch.totals() == [180, 0, 75]
+
+    def test_totals_of_no_orders(self, backend):
+        """Test totaling an empty batch"""
+        assert OrderBatch.from_orders([]).totals() == []
+
+    def test_totals_of_only_empty_orders(self, backend):
+        """Test totaling a batch of orders without lines"""
+        assert OrderBatch.from_orders([Order(), Order()]).totals() == [0, 0]
+
+    @pytest.mark.parametrize("largest", [100, 2**31, 2**40, 2**70])
+    @pytest.mark.parametrize("seed", range(5))
+    def test_totals_match_orders(self, backend, seed, largest):
+        """Test that every total matches Order.total_price, including past int64"""
+        orders = random_orders(seed, largest)
+
+        totals = OrderBatch.from_orders(orders).totals()
+
+        assert totals == [order.total_price() for order in orders]
+
+    def test_values_beyond_int64_are_kept_exact(self, backend):
+        """Test that values that do not fit in int64 disable vectorization"""
+        batch = OrderBatch.from_orders([Order(["Keyboard"], [2], [2**64])])
+
+        assert not batch.vectorized
+        assert batch.totals() == [2**65]
+
+    def test_rejects_inconsistent_columns(self):
+        """Test that offsets must cover every line"""
+        with pytest.raises(ValueError):
+            OrderBatch([1, 2], [50, 65], [0, 1])
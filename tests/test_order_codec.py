@@ -0,0 +1,110 @@
+"""This module tests the functionality of the SOLID files"""
+import struct
+
+import pytest
+
+from SOLID.compact_order import CompactOrder
+from SOLID.order import Order
+from SOLID.order_codec import from_buffer, to_bytes
+
+
+@pytest.fixture
+def valid_order() -> Order:
+    items: list[str] = ["Keyboard", "Monitor", "Keyboard"]
+    quantites: list[int] = [1, 2, 3]
+    prices: list[int] = [50, 65, -(2**63)]
+
+    return Order(items, quantites, prices)
+
+
+class TestOrderCodec:
+    """Test encoding and decoding orders"""
+
+    def test_round_trip(self, valid_order):
+        """Test that decoding an encoded order gives the same order"""
+        valid_order.status = "paid"
+
+        view = from_buffer(to_bytes(valid_order))
+
+        assert view.items == valid_order.items
+        assert view.status == "paid"
+        assert view.total_price() == valid_order.total_price()
+        assert view.to_order() == valid_order
+
+    def test_round_trip_empty_order(self):
+        """Test encoding an order without lines"""
+        view = from_buffer(to_bytes(Order()))
+
+        assert view.items == []
+        assert view.total_price() == 0
+        assert view.to_order() == Order()
+
+    def test_compact_order_encodes_the_same(self, valid_order):
+        """Test that a CompactOrder encodes to the same bytes as an Order"""
+        compact = CompactOrder(valid_order.items, valid_order.quantites, valid_order.prices)
+
+        assert to_bytes(compact) == to_bytes(valid_order)
+
+    def test_columns_are_not_copied(self, valid_order):
+        """Test that the numeric columns read straight from the received buffer"""
+        buffer = bytearray(to_bytes(valid_order))
+        view = from_buffer(buffer)
+
+        buffer[-8:] = (100).to_bytes(8, "little")
+
+        assert list(view.prices) == [50, 65, 100]
+        assert view.total_price() == 480
+        with pytest.raises(BufferError):
+            buffer.extend(b"resizing would move the columns")
+
+    def test_non_ascii_names(self):
+        """Test that item names are stored as UTF-8"""
+        order = Order(["Café table", "Stuhl für Kinder"], [1, 1], [5, 6])
+
+        assert from_buffer(to_bytes(order)).items == order.items
+
+    @pytest.mark.parametrize("status", ["", "paid", "authorizing"])
+    def test_string_table_is_aligned(self, valid_order, status):
+        """Test that the string table offsets start on an 8 byte boundary"""
+        valid_order.status = status
+        data = to_bytes(valid_order)
+        start = 24 + len(status) + -(24 + len(status)) % 8
+        end = start + 12
+
+        assert data[start:end] == bytes([0, 0, 0, 0, 8, 0, 0, 0, 15, 0, 0, 0])
+        assert from_buffer(data).to_order() == valid_order
+
+    def test_reads_version_1(self):
+        """Test that buffers without padding before the string table still decode"""
+        data = b"".join(
+            [
+                struct.pack("<4sHHIIQ", b"ORDR", 1, 4, 1, 1, 9),
+                b"open",
+                struct.pack("<II", 0, 1),
+                b"A",
+                bytes(3),
+                struct.pack("<I", 0),
+                bytes(4),
+                struct.pack("<qq", 2, 3),
+            ]
+        )
+
+        view = from_buffer(data)
+
+        assert view.items == ["A"]
+        assert view.status == "open"
+        assert view.total_price() == 6
+
+    @pytest.mark.parametrize(
+        "corrupt",
+        [
+            lambda data: data[:10],
+            lambda data: b"JSON" + data[4:],
+            lambda data: data[:4] + b"\x03\x00" + data[6:],
+            lambda data: data + b"\x00" * 8,
+        ],
+    )
+    def test_rejects_bad_buffers(self, valid_order, corrupt):
+        """Test that truncated, foreign and newer buffers are rejected"""
+        with pytest.raises(ValueError):
+            from_buffer(corrupt(to_bytes(valid_order)))
@@ -0,0 +1,121 @@
+"""This module tests the functionality of the SOLID files"""
+import json
+import tracemalloc
+from typing import Iterator
+
+import pytest
+
+from SOLID.dependency_inversion_after import AuthorizerSMS, DebitPaymentProcessor
+from SOLID.events import NullSink
+from SOLID.order_ingest import (
+    Row,
+    Settle,
+    StatusFilter,
+    Totals,
+    group_orders,
+    read_csv,
+    read_jsonl,
+    run,
+)
+
+ROWS: list[Row] = [
+    ("A1", "Keyboard", 1, 50),
+    ("A1", "Monitor", 2, 65),
+    ("B2", "Mouse", 1, 25),
+    ("C3", "Monitor", 1, 65),
+    ("C3", "Mouse", 4, 25),
+]
+
+
+@pytest.fixture
+def csv_path(tmp_path) -> str:
+    path = tmp_path / "orders.csv"
+    lines = ["price,order_id,item,quantity"]
+    lines += [f"{price},{order_id},{item},{quantity}" for order_id, item, quantity, price in ROWS]
+    path.write_text("\n".join(lines) + "\n")
+    return str(path)
+
+
+@pytest.fixture
+def jsonl_path(tmp_path) -> str:
+    path = tmp_path / "orders.jsonl"
+    keys = ("order_id", "item", "quantity", "price")
+    path.write_text("".join(json.dumps(dict(zip(keys, row))) + "\n" for row in ROWS))
+    return str(path)
+
+
+def generated_rows(orders: int) -> Iterator[list[Row]]:
+    for order in range(orders):
+        yield [(str(order), "Keyboard", 1, 50), (str(order), "Monitor", 2, 65)]
+
+
+class TestReaders:
+    """Test reading order lines from files"""
+
+    def test_reading_csv_in_chunks(self, csv_path):
+        """Test that CSV rows arrive in chunks, whatever the column order"""
+        assert list(read_csv(csv_path, chunk_size=2)) == [ROWS[0:2], ROWS[2:4], ROWS[4:]]
+
+    def test_reading_jsonl(self, jsonl_path):
+        """Test reading JSON lines"""
+        assert list(read_jsonl(jsonl_path)) == [ROWS]
+
+    def test_rejects_csv_without_columns(self, tmp_path):
+        """Test that a CSV file must name the order columns"""
+        path = tmp_path / "orders.csv"
+        path.write_text("id,name\n1,Keyboard\n")
+
+        with pytest.raises(ValueError):
+            list(read_csv(str(path)))
+
+
+class TestPipeline:
+    """Test running order lines through stages"""
+
+    def test_grouping_rows_into_orders(self):
+        """Test that consecutive rows of one order id become one Order"""
+        orders = dict(group_orders([ROWS[:3], ROWS[3:]]))
+
+        assert list(orders) == ["A1", "B2", "C3"]
+        assert orders["C3"].items == ["Monitor", "Mouse"]
+        assert orders["A1"].total_price() == 180
+
+    @pytest.mark.parametrize("path", ["csv_path", "jsonl_path"])
+    def test_totaling_a_file(self, request, path):
+        """Test the totaling stage over both file formats"""
+        totals = Totals()
+
+        stats = run(request.getfixturevalue(path), [totals], chunk_size=2)
+
+        assert (stats.rows, stats.orders) == (5, 3)
+        assert (totals.orders, totals.total) == (3, 180 + 25 + 165)
+        assert stats.rows_per_second > 0
+
+    def test_settling_and_filtering(self, csv_path):
+        """Test paying orders in batches and keeping only the paid ones"""
+        authorizer = AuthorizerSMS(sink=NullSink())
+        authorizer.verify_code("1234567")
+        settle = Settle(DebitPaymentProcessor("1234567", authorizer, NullSink()), batch_size=2)
+        totals = Totals()
+
+        stats = run(
+            csv_path,
+            [StatusFilter(frozenset({"open"})), settle, StatusFilter(frozenset({"paid"})), totals],
+        )
+
+        assert (settle.paid, settle.failed) == (3, 0)
+        assert stats.orders == totals.orders == 3
+
+    def test_memory_does_not_grow_with_input(self):
+        """Test that streaming ten times the orders does not use ten times the memory"""
+
+        def peak(orders: int) -> int:
+            tracemalloc.start()
+            run(generated_rows(orders), [Totals()])
+            peak = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+            return peak
+
+        small, large = peak(1_000), peak(10_000)
+
+        assert large < small * 2
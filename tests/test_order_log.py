@@ -0,0 +1,211 @@
+"""This module tests the functionality of the SOLID files"""
+import os
+
+import pytest
+
+from SOLID.dependency_inversion_after import CreditPaymentProcessor
+from SOLID.events import NullSink
+from SOLID.order import Order
+from SOLID.order_log import MAGIC, OrderLog
+
+
+class CountingFsync:
+    """Counts fsync calls instead of waiting for the disk"""
+
+    def __init__(self) -> None:
+        self.calls = 0
+
+    def __call__(self, fileno: int) -> None:
+        self.calls += 1
+
+
+@pytest.fixture
+def log_path(tmp_path) -> str:
+    return str(tmp_path / "orders.log")
+
+
+@pytest.fixture
+def fsync() -> CountingFsync:
+    return CountingFsync()
+
+
+def snapshot(order: Order) -> tuple:
+    return order.items, order.quantites, order.prices, order.status
+
+
+class TestOrderLog:
+    """Test the functionality of the OrderLog class"""
+
+    def test_recovering_tracked_orders(self, log_path):
+        """Test that a restart rebuilds every change made to tracked orders"""
+        cart = Order(["Keyboard"], [1], [50])
+        paid = Order()
+        with OrderLog(log_path) as log:
+            log.track(1, cart)
+            log.track(2, paid)
+            cart.add_items([("Monitor", 2, 65), ("Mouse", 1, 25)])
+            cart.update_quantity(0, 3)
+            cart.remove_item(2)
+            paid.add_item("Webcam", 1, 40)
+            CreditPaymentProcessor("1234567", NullSink()).pay(paid)
+
+        recovered = OrderLog(log_path).recover()
+
+        assert recovered.keys() == {1, 2}
+        assert snapshot(recovered[1]) == snapshot(cart)
+        assert snapshot(recovered[2]) == snapshot(paid)
+        assert recovered[1].total_price() == cart.total_price() == 280
+
+    @pytest.mark.parametrize("reattach", ["recover", "track"])
+    def test_tracking_recovered_orders(self, log_path, reattach):
+        """Test that orders tracked again after a restart are not duplicated"""
+        with OrderLog(log_path) as log:
+            log.track(1, Order(["Keyboard"], [1], [50]))
+
+        with OrderLog(log_path) as log:
+            if reattach == "recover":
+                order = log.recover(track=True)[1]
+            else:
+                order = log.recover()[1]
+                log.track(1, order, snapshot=False)
+            order.add_item("Mouse", 1, 25)
+            order.update_quantity(0, 2)
+
+        recovered = OrderLog(log_path).recover()
+
+        assert snapshot(recovered[1]) == (["Keyboard", "Mouse"], [2, 1], [50, 25], "open")
+
+    def test_recovering_interrupted_payment(self, log_path):
+        """Test that an order logged while authorizing can be paid after a restart"""
+        with OrderLog(log_path) as log:
+            order = Order(["Keyboard"], [1], [50])
+            log.track(1, order)
+            order.transition("open", "authorizing")
+
+        with OrderLog(log_path) as log:
+            recovered = log.recover(track=True)[1]
+            assert recovered.status == "failed"
+            CreditPaymentProcessor("1234567", NullSink()).pay(recovered)
+
+        assert OrderLog(log_path).recover()[1].status == "paid"
+
+    def test_recovering_empty_order(self, log_path):
+        """Test that an order without lines survives a restart"""
+        with OrderLog(log_path) as log:
+            log.track(1, Order())
+
+        assert snapshot(OrderLog(log_path).recover()[1]) == ([], [], [], "open")
+
+    def test_recovering_compacted_order(self, log_path):
+        """Test that merging duplicate lines is recorded"""
+        order = Order(["Mouse", "Keyboard", "Mouse", "Keyboard"], [1, 1, 2, 3], [25, 50, 25, 50])
+        with OrderLog(log_path) as log:
+            log.track(1, order)
+            order.compact()
+            order.add_item("Monitor", 1, 65)
+
+        with OrderLog(log_path) as log:
+            assert snapshot(log.recover()[1]) == snapshot(order)
+
+    def test_close_stops_tracking(self, log_path):
+        """Test that orders changed after the log is closed are not watched by it"""
+        order = Order()
+        log = OrderLog(log_path)
+        log.track(1, order)
+        log.close()
+
+        order.add_item("Keyboard", 1, 50)
+        order.status = "paid"
+
+        with OrderLog(log_path) as log:
+            assert log.recover()[1].items == []
+
+    def test_group_commit(self, log_path, fsync):
+        """Test that records are fsynced in groups"""
+        log = OrderLog(log_path, group_size=10, fsync=fsync)
+        fsync.calls = 0
+        for line in range(25):
+            log.append_item(1, "Keyboard", 1, line)
+
+        assert fsync.calls == 2
+        log.close()
+        assert fsync.calls == 3
+        assert len(OrderLog(log_path).recover()[1].items) == 25
+
+    def test_recovering_torn_write(self, log_path):
+        """Test that a partly written last record is dropped"""
+        with OrderLog(log_path) as log:
+            log.append_item(1, "Keyboard", 1, 50)
+            log.append_item(1, "Monitor", 2, 65)
+        with open(log_path, "r+b") as file:
+            file.truncate(os.path.getsize(log_path) - 3)
+
+        log = OrderLog(log_path)
+        assert log.recover()[1].items == ["Keyboard"]
+        log.append_item(1, "Mouse", 1, 25)
+        log.close()
+        assert OrderLog(log_path).recover()[1].items == ["Keyboard", "Mouse"]
+
+    @pytest.mark.parametrize("tail", [bytes(4096), b"\xff" * 3, b"\x05\x00\x00\x00junk!"])
+    def test_recovering_garbage_tail(self, log_path, tail):
+        """Test that the log ends at the first record that does not check out"""
+        with OrderLog(log_path) as log:
+            log.append_item(1, "Keyboard", 1, 50)
+        with open(log_path, "ab") as file:
+            file.write(tail)
+
+        log = OrderLog(log_path)
+        assert log.recover()[1].items == ["Keyboard"]
+        log.append_item(1, "Mouse", 1, 25)
+        log.close()
+        assert OrderLog(log_path).recover()[1].items == ["Keyboard", "Mouse"]
+
+    def test_rejects_other_files(self, log_path):
+        """Test that a file without the log header is not replayed"""
+        with open(log_path, "wb") as file:
+            file.write(b"not a log")
+
+        with pytest.raises(ValueError):
+            OrderLog(log_path).recover()
+
+    def test_compaction_keeps_orders(self, log_path):
+        """Test that compaction shrinks the log without changing the orders"""
+        order = Order()
+        log = OrderLog(log_path)
+        log.track(1, order)
+        for _ in range(100):
+            order.add_item("Keyboard", 1, 50)
+            order.remove_item(0)
+        order.add_item("Monitor", 2, 65)
+        log.track(2, Order(["Mouse"], [1], [25]))
+        log.untrack(order, drop=False)
+        log.append_drop(2)
+        log.commit()
+        before = log.size()
+
+        log.compact()
+
+        assert log.size() < before / 10
+        recovered = log.recover()
+        assert recovered.keys() == {1}
+        assert snapshot(recovered[1]) == (["Monitor"], [2], [65], "open")
+        log.close()
+
+    def test_commit_compacts_grown_log(self, log_path):
+        """Test that the log compacts itself once it doubles in size"""
+        order = Order(["Keyboard"], [1], [50])
+        log = OrderLog(log_path, group_size=1, compact_min_bytes=1024)
+        log.track(1, order)
+        for quantity in range(100):
+            order.update_quantity(0, quantity % 3)
+
+        assert log.size() < 1024
+        assert log.recover()[1].quantites == [0]
+        log.close()
+
+    def test_new_log_has_header(self, log_path):
+        """Test that a new log starts with its header"""
+        OrderLog(log_path).close()
+
+        with open(log_path, "rb") as file:
+            assert file.read() == MAGIC
@@ -0,0 +1,84 @@
+"""This module tests the functionality of the SOLID files"""
+import pytest
+
+from SOLID.dependency_inversion_after import CreditPaymentProcessor
+from SOLID.events import NullSink
+from SOLID.order import Order
+from SOLID.order_store import OrderStore
+
+
+@pytest.fixture
+def store() -> OrderStore:
+    store = OrderStore()
+    store.add(Order(["Keyboard", "Monitor"], [1, 2], [50, 65]))
+    store.add(Order(["Monitor", "Monitor"], [1, 1], [65, 65]))
+    store.add(Order(["Mouse"], [1], [25]))
+    return store
+
+
+class TestOrderStore:
+    """Test the functionality of the OrderStore class"""
+
+    def test_adding_orders_assigns_ids(self, store):
+        """Test that every stored order gets its own id"""
+        order = Order()
+        order_id = store.add(order)
+
+        assert order_id == 4
+        assert store[order_id] is order
+        assert store.id_of(order) == order_id
+        assert len(store) == 4
+
+    def test_adding_an_order_twice(self, store):
+        """Test that an order can only be stored once"""
+        with pytest.raises(ValueError):
+            store.add(store[1])
+
+    def test_finding_open_orders(self, store):
+        """Test finding orders by status"""
+        assert store.find(status="open") == [1, 2, 3]
+        assert store.find(status="paid") == []
+
+    def test_finding_orders_containing_item(self, store):
+        """Test finding orders by item name"""
+        assert store.find(item="Monitor") == [1, 2]
+        assert store.find(item="Webcam") == []
+
+    def test_paying_updates_status_index(self, store):
+        """Test that a processor paying an order moves it to the paid status"""
+        CreditPaymentProcessor("1234567", NullSink()).pay(store[2])
+
+        assert store.find(status="open") == [1, 3]
+        assert store.find(status="paid", item="Monitor") == [2]
+
+    def test_cart_edits_update_item_index(self, store):
+        """Test that adding and removing lines keeps the item index current"""
+        store[3].add_item("Monitor", 1, 65)
+        store[2].remove_item(0)
+        store[1].remove_item(1)
+
+        assert store.find(item="Monitor") == [2, 3]
+        store[2].remove_item(0)
+        store[1].add_items([("Webcam", 1, 40)])
+        assert store.find(item="Monitor") == [3]
+        assert store.find(item="Webcam") == [1]
+
+    def test_compacting_keeps_item_index(self, store):
+        """Test that merging duplicate lines keeps the order in the item index"""
+        store[2].compact()
+
+        assert store[2].items == ["Monitor"]
+        assert store.find(item="Monitor") == [1, 2]
+        store[2].remove_item(0)
+        assert store.find(item="Monitor") == [1]
+
+    def test_removing_order_cleans_indexes(self, store):
+        """Test that removed orders leave no index entries behind"""
+        order = store.remove(3)
+        order.status = "paid"
+        order.add_item("Webcam", 1, 40)
+
+        assert 3 not in store
+        assert store.find(item="Mouse") == []
+        assert store.find(status="paid") == []
+        assert store._by_item.keys() == {"Keyboard", "Monitor"}
@@ -0,0 +1,135 @@
+"""This module tests the functionality of the SOLID files"""
+import threading
+import time
+from dataclasses import dataclass, field
+from queue import Full
+
+import pytest
+
+from SOLID.dependency_inversion_after import (
+    AuthorizerSMS,
+    DebitPaymentProcessor,
+    PaymentProcessor,
+)
+from SOLID.order import Order
+from SOLID.payment_dispatcher import PaymentDispatcher
+
+
+@dataclass
+class GatewayPaymentProcessor(PaymentProcessor):
+    """Waits on a fake gateway before marking the order paid"""
+
+    delay: float = 0.0
+    gate: threading.Event = field(default_factory=threading.Event)
+
+    def pay(self, order: Order) -> None:
+        self.gate.wait()
+        time.sleep(self.delay)
+        order.status = "paid"
+
+
+@pytest.fixture
+def open_gateway() -> GatewayPaymentProcessor:
+    gateway = GatewayPaymentProcessor(delay=0.05)
+    gateway.gate.set()
+    return gateway
+
+
+@pytest.fixture
+def closed_gateway():
+    gateway = GatewayPaymentProcessor()
+    yield gateway
+    gateway.gate.set()
+
+
+class TestPaymentDispatcher:
+    """Test the functionality of the PaymentDispatcher class"""
+
+    def test_paying_orders(self, open_gateway):
+        """Test that every submitted order is paid"""
+        orders = [Order() for _ in range(8)]
+        with PaymentDispatcher(workers=8) as dispatcher:
+            started = time.perf_counter()
+            futures = [dispatcher.submit(order, open_gateway) for order in orders]
+            for future in futures:
+                future.result()
+            elapsed = time.perf_counter() - started
+
+        assert all(order.status == "paid" for order in orders)
+        assert elapsed < 8 * open_gateway.delay
+
+    def test_failure_is_reported_on_future(self):
+        """Test that a failed payment raises from its future"""
+        debit = DebitPaymentProcessor("1234567", AuthorizerSMS())
+        with PaymentDispatcher(workers=1) as dispatcher:
+            future = dispatcher.submit(Order(), debit)
+
+            with pytest.raises(Exception) as unverified:
+                future.result()
+
+        assert str(unverified.value) == "Not authorized"
+
+    def test_rejects_when_full(self, closed_gateway):
+        """Test that a non blocking dispatcher rejects jobs past the queue bound"""
+        dispatcher = PaymentDispatcher(workers=1, max_queued=2, block=False)
+        dispatcher.submit(Order(), closed_gateway)
+        while dispatcher.queue_depth():
+            time.sleep(0.001)
+        dispatcher.submit(Order(), closed_gateway)
+        dispatcher.submit(Order(), closed_gateway)
+
+        with pytest.raises(Full):
+            dispatcher.submit(Order(), closed_gateway)
+
+        assert dispatcher.queue_depth() == 2
+        closed_gateway.gate.set()
+        dispatcher.shutdown()
+        assert dispatcher.queue_depth() == 0
+
+    def test_blocking_submit_times_out(self, closed_gateway):
+        """Test that a blocking submit waits at most its timeout"""
+        dispatcher = PaymentDispatcher(workers=1, max_queued=1)
+        dispatcher.submit(Order(), closed_gateway)
+        while dispatcher.queue_depth():
+            time.sleep(0.001)
+        dispatcher.submit(Order(), closed_gateway, block=False)
+
+        with pytest.raises(Full):
+            dispatcher.submit(Order(), closed_gateway, timeout=0.01)
+
+        closed_gateway.gate.set()
+        dispatcher.shutdown()
+
+    def test_cancelling_queued_jobs_frees_their_slots(self, closed_gateway):
+        """Test that cancelled jobs leave the queue and are never paid"""
+        dispatcher = PaymentDispatcher(workers=1, max_queued=2, block=False)
+        dispatcher.submit(Order(), closed_gateway)
+        while dispatcher.queue_depth():
+            time.sleep(0.001)
+        orders = [Order(), Order()]
+        futures = [dispatcher.submit(order, closed_gateway) for order in orders]
+
+        assert all(future.cancel() for future in futures)
+        assert dispatcher.queue_depth() == 0
+        dispatcher.submit(Order(), closed_gateway)
+        dispatcher.submit(Order(), closed_gateway)
+
+        closed_gateway.gate.set()
+        dispatcher.shutdown()
+        assert dispatcher.queue_depth() == 0
+        assert [order.status for order in orders] == ["open", "open"]
+
+    def test_reports_worker_utilization(self, open_gateway):
+        """Test that busy workers report utilization"""
+        with PaymentDispatcher(workers=2) as dispatcher:
+            for future in [dispatcher.submit(Order(), open_gateway) for _ in range(4)]:
+                future.result()
+            utilization = dispatcher.utilization()
+
+        assert 1 <= len(utilization) <= 2
+        assert all(0 < busy <= 1 for busy in utilization.values())
+
+    def test_rejects_invalid_sizes(self):
+        """Test that the pool and queue need room for at least one job"""
+        with pytest.raises(ValueError):
+            PaymentDispatcher(workers=0)
@@ -0,0 +1,193 @@
+"""This module tests the functionality of the SOLID files"""
+import threading
+import time
+from dataclasses import dataclass, field
+from queue import Full
+
+import pytest
+
+from SOLID.dependency_inversion_after import (
+    AuthorizerSMS,
+    CreditPaymentProcessor,
+    DebitPaymentProcessor,
+    PaymentProcessor,
+)
+from SOLID.events import NullSink
+from SOLID.order import Order
+from SOLID.payment_pipeline import PaymentPipeline
+
+
+@dataclass
+class GatewayPaymentProcessor(PaymentProcessor):
+    """Waits on a fake gateway before marking the order paid"""
+
+    gate: threading.Event = field(default_factory=threading.Event)
+
+    def pay(self, order: Order) -> None:
+        self.gate.wait(5)
+        order.status = "paid"
+
+
+@pytest.fixture
+def valid_order() -> Order:
+    items: list[str] = ["Keyboard", "Monitor"]
+    quantites: list[int] = [1, 2]
+    prices: list[int] = [50, 65]
+
+    return Order(items, quantites, prices)
+
+
+@pytest.fixture
+def pipeline():
+    with PaymentPipeline(max_queued=4) as pipeline:
+        yield pipeline
+
+
+class TestPaymentPipeline:
+    """Test the validate, authorize and charge stages"""
+
+    def test_paying_orders(self, pipeline):
+        """Test that every valid order passes all stages and is paid"""
+        processor = DebitPaymentProcessor("0372846", AuthorizerSMS(sink=NullSink()), NullSink())
+        orders = [Order(["Keyboard"], [1], [50]) for _ in range(20)]
+
+        futures = [pipeline.submit(order, processor, "1234567") for order in orders]
+        for future in futures:
+            future.result(5)
+
+        assert all(order.status == "paid" for order in orders)
+        stats = pipeline.stats()
+        assert [stats[name].processed for name in ("validate", "authorize", "charge")] == [20] * 3
+        assert stats["charge"].mean_service_time > 0
+
+    @pytest.mark.parametrize(
+        "order, message",
+        [(Order(), "no items"), (Order(["Keyboard"], [0], [50]), "positive")],
+    )
+    def test_validation(self, pipeline, order, message):
+        """Test that empty orders and orders without a positive total are rejected"""
+        future = pipeline.submit(order, CreditPaymentProcessor("1234567", NullSink()))
+
+        with pytest.raises(ValueError, match=message):
+            future.result(5)
+        assert order.status == "open"
+        assert pipeline.stats()["validate"].failed == 1
+
+    def test_unauthorized_orders_are_not_charged(self, pipeline, valid_order):
+        """Test that the authorize stage stops orders without verification"""
+        processor = DebitPaymentProcessor("0372846", AuthorizerSMS(sink=NullSink()), NullSink())
+
+        with pytest.raises(Exception, match="Not authorized"):
+            pipeline.submit(valid_order, processor).result(5)
+
+        assert valid_order.status == "open"
+        assert pipeline.stats()["charge"].processed == 0
+
+    def test_processors_without_authorizer(self, pipeline, valid_order):
+        """Test that processors without an authorizer pass the authorize stage"""
+        pipeline.submit(valid_order, CreditPaymentProcessor("1234567", NullSink())).result(5)
+
+        assert valid_order.status == "paid"
+
+    def test_backpressure(self, valid_order):
+        """Test that a stalled charge stage fills the queues up to the front"""
+        gateway = GatewayPaymentProcessor()
+        pipeline = PaymentPipeline(1, 1, 1, max_queued=1)
+        futures = []
+        with pytest.raises(Full):
+            for _ in range(20):
+                futures.append(pipeline.submit(valid_order, gateway, timeout=0.2))
+
+        stats = pipeline.stats()
+        assert [stats[name].queue_depth for name in ("validate", "authorize", "charge")] == [1] * 3
+        assert len(futures) == 6
+        gateway.gate.set()
+        pipeline.shutdown()
+        assert all(future.done() for future in futures)
+
+    def test_non_blocking_submit_while_another_waits(self, valid_order):
+        """Test that a blocked submitter does not hold up other submitters or shutdown"""
+        gateway = GatewayPaymentProcessor()
+        pipeline = PaymentPipeline(1, 1, 1, max_queued=1)
+        futures = []
+        with pytest.raises(Full):
+            while True:
+                futures.append(pipeline.submit(Order(["Mouse"], [1], [25]), gateway, timeout=0.2))
+        blocked = threading.Thread(
+            target=lambda: futures.append(pipeline.submit(Order(["Mouse"], [1], [25]), gateway))
+        )
+        blocked.start()
+        while not pipeline._submitting:
+            time.sleep(0.001)
+        rejected = []
+
+        def submit() -> None:
+            with pytest.raises(Full):
+                pipeline.submit(valid_order, gateway, block=False)
+            with pytest.raises(Full):
+                pipeline.submit(valid_order, gateway, timeout=0.01)
+            rejected.append(True)
+
+        other = threading.Thread(target=submit)
+        other.start()
+        other.join(2)
+
+        assert rejected == [True]
+        gateway.gate.set()
+        pipeline.shutdown()
+        blocked.join(2)
+        assert not blocked.is_alive()
+        assert len(futures) == 7
+        assert all(future.result(0) is None for future in futures)
+
+    def test_shutdown_finishes_queued_payments(self):
+        """Test that shutdown pays every accepted order before stopping"""
+        orders = [Order(["Keyboard"], [1], [50]) for _ in range(10)]
+        pipeline = PaymentPipeline(max_queued=2)
+        processor = CreditPaymentProcessor("1234567", NullSink())
+        for order in orders:
+            pipeline.submit(order, processor)
+
+        pipeline.shutdown()
+        pipeline.shutdown()
+
+        assert all(order.status == "paid" for order in orders)
+
+    def test_cancelled_payments_are_skipped(self):
+        """Test that a cancelled payment is not charged and leaves the workers running"""
+        gate = threading.Event()
+
+        class GatedOrder(Order):
+            def total_price(self) -> int:
+                gate.wait(5)
+                return super().total_price()
+
+        processor = CreditPaymentProcessor("1234567", NullSink())
+        orders = [GatedOrder(["Keyboard"], [1], [50]), Order(["Mouse"], [1], [25])]
+        cancelled = Order(["Monitor"], [1], [65])
+        with PaymentPipeline(1, 1, 1) as pipeline:
+            first = pipeline.submit(orders[0], processor)
+            future = pipeline.submit(cancelled, processor)
+            last = pipeline.submit(orders[1], processor)
+            assert future.cancel()
+            gate.set()
+
+            first.result(5)
+            last.result(5)
+
+        assert [order.status for order in orders] == ["paid", "paid"]
+        assert cancelled.status == "open"
+        assert pipeline.stats()["charge"].processed == 2
+
+    def test_submitting_after_shutdown(self, valid_order):
+        """Test that a stopped pipeline refuses new payments"""
+        pipeline = PaymentPipeline()
+        pipeline.shutdown()
+
+        with pytest.raises(RuntimeError):
+            pipeline.submit(valid_order, CreditPaymentProcessor("1234567", NullSink()))
+
+    def test_invalid_settings(self):
+        """Test that every stage needs a worker and queue space"""
+        with pytest.raises(ValueError):
+            PaymentPipeline(authorize_workers=0)
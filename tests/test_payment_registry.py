@@ -0,0 +1,92 @@
+"""This module tests the functionality of the SOLID files"""
+from importlib.metadata import EntryPoint
+
+import pytest
+
+from SOLID import payment_registry
+from SOLID.dependency_inversion_after import (
+    AuthorizerGoogle,
+    CreditPaymentProcessor,
+    PaypalPaymentProcessor,
+)
+from SOLID.events import NullSink
+from SOLID.order import Order
+from SOLID.payment_registry import PaymentProcessorRegistry
+
+
+def make_credit() -> CreditPaymentProcessor:
+    return CreditPaymentProcessor("1234567", NullSink())
+
+
+@pytest.fixture
+def registry() -> PaymentProcessorRegistry:
+    registry = PaymentProcessorRegistry(entry_point_group=None)
+    registry.add("credit", make_credit)
+    return registry
+
+
+@pytest.fixture
+def valid_order() -> Order:
+    items: list[str] = ["Keyboard", "Monitor"]
+    quantites: list[int] = [1, 2]
+    prices: list[int] = [50, 65]
+
+    return Order(items, quantites, prices)
+
+
+class TestPaymentProcessorRegistry:
+    """Test the functionality of the PaymentProcessorRegistry class"""
+
+    def test_paying_with_registered_type(self, registry, valid_order):
+        """Test paying an order through the registry"""
+        registry.pay("credit", valid_order)
+
+        assert valid_order.status == "paid"
+
+    def test_processors_are_cached(self, registry):
+        """Test that a factory is only called once per payment type"""
+        assert registry.get("credit") is registry.get("credit")
+
+    def test_registering_with_decorator(self, registry, valid_order):
+        """Test registering a factory with the decorator"""
+
+        @registry.register("paypal")
+        def make_paypal() -> PaypalPaymentProcessor:
+            authorizer = AuthorizerGoogle(sink=NullSink())
+            authorizer.verify_code("payment@example.com")
+            return PaypalPaymentProcessor("payment@example.com", authorizer, NullSink())
+
+        registry.pay("paypal", valid_order)
+
+        assert valid_order.status == "paid"
+        assert registry.payment_types() == ["credit", "paypal"]
+
+    def test_reregistering_replaces_cached_processor(self, registry):
+        """Test that registering a type again drops the processor built before"""
+        first = registry.get("credit")
+        registry.add("credit", make_credit)
+
+        assert registry.get("credit") is not first
+
+    def test_unknown_payment_type(self, registry, valid_order):
+        """Test paying with a payment type nobody registered"""
+        with pytest.raises(Exception) as unknown:
+            registry.pay("cash", valid_order)
+
+        assert str(unknown.value) == "unknown payment type: cash"
+
+    def test_entry_points_are_loaded_lazily(self, monkeypatch):
+        """Test that entry points are only read once a type is missing"""
+        reads = []
+
+        def fake_entry_points(group: str) -> list[EntryPoint]:
+            reads.append(group)
+            return [EntryPoint("credit", f"{__name__}:make_credit", group)]
+
+        monkeypatch.setattr(payment_registry, "entry_points", fake_entry_points)
+        registry = PaymentProcessorRegistry()
+        assert reads == []
+
+        assert isinstance(registry.get("credit"), CreditPaymentProcessor)
+        assert "credit" in registry
+        assert reads == ["solid.payment_processors"]
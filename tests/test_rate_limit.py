@@ -0,0 +1,220 @@
+"""This module tests the functionality of the SOLID files"""
+import asyncio
+import threading
+
+import pytest
+
+from SOLID.dependency_inversion_after import AuthorizerSMS, CreditPaymentProcessor
+from SOLID.dependency_inversion_async import (
+    AsyncAuthorizerSMS,
+    AsyncCreditPaymentProcessor,
+)
+from SOLID.events import NullSink
+from SOLID.order import Order
+from SOLID.rate_limit import (
+    AsyncRateLimitedAuthorizer,
+    AsyncRateLimitedProcessor,
+    RateLimited,
+    RateLimitedAuthorizer,
+    RateLimitedProcessor,
+    TokenBucket,
+)
+
+
+class FakeTime:
+    """A clock whose sleep moves it forward instead of waiting"""
+
+    def __init__(self) -> None:
+        self.now = 0.0
+        self.slept: list[float] = []
+
+    def clock(self) -> float:
+        return self.now
+
+    def sleep(self, seconds: float) -> None:
+        self.slept.append(seconds)
+        self.now += seconds
+
+
+@pytest.fixture
+def valid_order() -> Order:
+    items: list[str] = ["Keyboard", "Monitor"]
+    quantites: list[int] = [1, 2]
+    prices: list[int] = [50, 65]
+
+    return Order(items, quantites, prices)
+
+
+@pytest.fixture
+def fake_time() -> FakeTime:
+    return FakeTime()
+
+
+@pytest.fixture
+def bucket(fake_time) -> TokenBucket:
+    return TokenBucket(rate=10, burst=3, clock=fake_time.clock, sleep=fake_time.sleep)
+
+
+class TestTokenBucket:
+    """Test the token bucket"""
+
+    def test_burst_passes_without_waiting(self, bucket, fake_time):
+        """Test that a full bucket serves a burst straight away"""
+        for _ in range(3):
+            assert bucket.acquire()
+
+        assert fake_time.slept == []
+        assert bucket.throttled == 0
+
+    def test_blocking_waits_for_refill(self, bucket, fake_time):
+        """Test that callers beyond the burst wait one token interval each"""
+        for _ in range(5):
+            bucket.acquire()
+
+        assert fake_time.slept == pytest.approx([0.1, 0.1])
+        assert bucket.throttled == 2
+        assert bucket.throttled_seconds == pytest.approx(0.2)
+
+    def test_waiting_callers_queue_up(self, bucket, fake_time):
+        """Test that reservations made at the same moment wait in turn"""
+        waits = [bucket._reserve(1, True, None) for _ in range(6)]
+
+        assert waits == pytest.approx([0, 0, 0, 0.1, 0.2, 0.3])
+        assert bucket.tokens() == pytest.approx(-3)
+
+    def test_non_blocking(self, bucket):
+        """Test that non-blocking calls fail instead of waiting"""
+        results = [bucket.acquire(block=False) for _ in range(4)]
+
+        assert results == [True, True, True, False]
+        assert bucket.rejected == 1
+
+    def test_deadline(self, bucket, fake_time):
+        """Test that a call only waits when its token comes within the timeout"""
+        for _ in range(3):
+            bucket.acquire()
+
+        assert not bucket.acquire(timeout=0.05)
+        assert bucket.acquire(timeout=0.1)
+        assert fake_time.slept == pytest.approx([0.1])
+
+    def test_refills_up_to_burst(self, bucket, fake_time):
+        """Test that idle time never stores more than the burst size"""
+        fake_time.now += 60
+
+        assert bucket.tokens() == 3
+        assert bucket.acquire(3, block=False)
+        assert not bucket.acquire(block=False)
+
+    def test_invalid_settings(self, bucket):
+        """Test that rates, bursts and token counts are checked"""
+        with pytest.raises(ValueError):
+            TokenBucket(rate=0)
+        with pytest.raises(ValueError):
+            TokenBucket(rate=1, burst=0)
+        with pytest.raises(ValueError):
+            bucket.acquire(4)
+
+    def test_thread_safety(self):
+        """Test that threads sharing a bucket never take more than the rate allows"""
+        bucket = TokenBucket(rate=1000, burst=10)
+        taken = []
+
+        def worker() -> None:
+            for _ in range(25):
+                if bucket.acquire(block=False):
+                    taken.append(1)
+
+        threads = [threading.Thread(target=worker) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert len(taken) == bucket.acquired
+        assert bucket.acquired + bucket.rejected == 200
+
+    def test_async_acquire(self):
+        """Test that coroutines wait on the event loop for their tokens"""
+        bucket = TokenBucket(rate=200, burst=1)
+
+        async def acquire_all() -> list[bool]:
+            return await asyncio.gather(*(bucket.acquire_async() for _ in range(5)))
+
+        assert asyncio.run(acquire_all()) == [True] * 5
+        assert bucket.throttled == 4
+        assert bucket.throttled_seconds == pytest.approx(0.05, rel=0.2)
+
+    def test_cancelled_wait_returns_tokens(self):
+        """Test that a cancelled coroutine gives back the tokens it reserved"""
+        bucket = TokenBucket(rate=1, burst=1)
+
+        async def cancel() -> None:
+            await bucket.acquire_async()
+            with pytest.raises(asyncio.TimeoutError):
+                await asyncio.wait_for(bucket.acquire_async(), 0.01)
+
+        asyncio.run(cancel())
+        assert bucket.tokens() > -0.5
+        assert bucket.acquired == 1
+
+
+class TestRateLimitedWrappers:
+    """Test limiting processors and authorizers"""
+
+    def test_processor(self, bucket, fake_time, valid_order):
+        """Test that a limited processor pays once it gets a token"""
+        processor = RateLimitedProcessor(CreditPaymentProcessor("1234567", NullSink()), bucket)
+        orders = [Order() for _ in range(4)]
+        for order in orders:
+            processor.pay(order)
+
+        assert all(order.status == "paid" for order in orders)
+        assert fake_time.slept == pytest.approx([0.1])
+
+    def test_processor_rejects_without_waiting(self, bucket, valid_order):
+        """Test that a non-blocking processor raises once the bucket is empty"""
+        processor = RateLimitedProcessor(
+            CreditPaymentProcessor("1234567", NullSink()), bucket, block=False
+        )
+        for _ in range(3):
+            processor.pay(Order())
+
+        with pytest.raises(RateLimited):
+            processor.pay(valid_order)
+        assert processor.pay_many([valid_order, Order()]) == [False, False]
+        assert valid_order.status == "open"
+
+    def test_processor_reports_paid_orders(self, bucket, valid_order):
+        """Test that a limited processor does not report a paid order as paid again"""
+        processor = RateLimitedProcessor(CreditPaymentProcessor("1234567", NullSink()), bucket)
+
+        assert processor.pay_many([valid_order, valid_order]) == [True, False]
+
+    def test_authorizer(self, bucket):
+        """Test that a limited authorizer verifies within the deadline"""
+        authorizer = RateLimitedAuthorizer(AuthorizerSMS(sink=NullSink()), bucket, max_wait=0)
+        for _ in range(3):
+            authorizer.verify_code("1234567")
+
+        assert authorizer.is_authorized()
+        with pytest.raises(RateLimited):
+            authorizer.verify_code("1234567")
+
+    def test_async_wrappers(self, valid_order):
+        """Test the limited async processor and authorizer"""
+        bucket = TokenBucket(rate=1, burst=2)
+        authorizer = AsyncRateLimitedAuthorizer(AsyncAuthorizerSMS(), bucket, block=False)
+        processor = AsyncRateLimitedProcessor(
+            AsyncCreditPaymentProcessor("1234567"), bucket, block=False
+        )
+
+        async def run() -> None:
+            await authorizer.verify_code("1234567")
+            await processor.pay(valid_order)
+            with pytest.raises(RateLimited):
+                await processor.pay(valid_order)
+
+        asyncio.run(run())
+        assert authorizer.is_authorized()
+        assert valid_order.status == "paid"
@@ -0,0 +1,198 @@
+"""This module tests the functionality of the SOLID files"""
+import threading
+
+import pytest
+
+from SOLID.dependency_inversion_after import (
+    AuthorizerSMS,
+    CreditPaymentProcessor,
+    DebitPaymentProcessor,
+)
+from SOLID.events import NullSink
+from SOLID.sharded_store import HashRing, ShardedOrderService, ShardError
+
+
+@pytest.fixture
+def service():
+    with ShardedOrderService(workers=3) as service:
+        yield service
+
+
+@pytest.fixture
+def lines() -> list[tuple[int, str, int, int]]:
+    return [(order_id, f"Item {line}", line + 1, 10) for order_id in range(60) for line in range(3)]
+
+
+class TestHashRing:
+    """Test the consistent hash ring"""
+
+    def test_keys_spread_over_nodes(self):
+        """Test that every node gets a fair share of the keys"""
+        ring = HashRing([f"node-{number}" for number in range(4)])
+        owners = [ring.node_for(key) for key in range(10_000)]
+
+        for number in range(4):
+            assert 1500 < owners.count(f"node-{number}") < 3500
+
+    def test_adding_a_node_moves_few_keys(self):
+        """Test that a fifth node only takes about a fifth of the keys"""
+        ring = HashRing([f"node-{number}" for number in range(4)])
+        before = {key: ring.node_for(key) for key in range(10_000)}
+
+        ring.add("node-4")
+        moved = [key for key in before if ring.node_for(key) != before[key]]
+
+        assert 0.1 < len(moved) / len(before) < 0.3
+        assert all(ring.node_for(key) == "node-4" for key in moved)
+
+    def test_removing_a_node_only_moves_its_keys(self):
+        """Test that keys of the other nodes stay where they are"""
+        ring = HashRing(["a", "b", "c"])
+        before = {key: ring.node_for(key) for key in range(1000)}
+
+        ring.remove("b")
+
+        assert len(ring) == 2
+        for key, node in before.items():
+            if node != "b":
+                assert ring.node_for(key) == node
+
+    def test_empty_ring(self):
+        """Test that an empty ring cannot place keys"""
+        with pytest.raises(ValueError):
+            HashRing().node_for("order")
+
+
+class TestShardedOrderService:
+    """Test orders spread over worker processes"""
+
+    def test_totals(self, service, lines):
+        """Test that totals are computed on the shards"""
+        service.add_items(lines)
+        service.add_item(7, "Mouse", 1, 25)
+
+        totals = service.total_prices(range(60))
+
+        assert totals[0] == 60
+        assert totals[7] == 85
+        assert service.total_price(59) == 60
+        assert sorted(service.order_ids()) == list(range(60))
+
+    def test_orders_are_spread_over_shards(self, service, lines):
+        """Test that every shard holds some orders"""
+        service.add_items(lines)
+
+        keys = service._call({name: ("keys", None) for name in service._shards})
+
+        assert all(keys.values())
+
+    def test_paying(self, service, lines):
+        """Test paying one order and a batch of orders"""
+        service.add_items(lines)
+        service.pay(3, CreditPaymentProcessor("1234567", NullSink()))
+
+        paid = service.pay_many(range(10, 20), CreditPaymentProcessor("1234567", NullSink()))
+
+        assert paid == {order_id: True for order_id in range(10, 20)}
+        statuses = service.statuses([2, 3, 10])
+        assert statuses == {2: "open", 3: "paid", 10: "paid"}
+
+    def test_errors_come_back_to_the_caller(self, service, lines):
+        """Test that shard errors are raised by the client"""
+        service.add_items(lines)
+        processor = DebitPaymentProcessor("0372846", AuthorizerSMS(sink=NullSink()), NullSink())
+
+        with pytest.raises(Exception, match="Not authorized"):
+            service.pay(1, processor)
+        with pytest.raises(KeyError):
+            service.total_price(1000)
+        assert service.pay_many([1, 2], processor) == {1: False, 2: False}
+
+    def test_partial_failures_name_their_shards(self, service, lines):
+        """Test that a request failing on one shard reports which shards applied it"""
+        bad_order = 1000
+        bad_shard = service.ring.node_for(bad_order)
+
+        with pytest.raises(ShardError) as failed:
+            service.add_items(lines + [(bad_order, "Mouse", "one", 25)])
+
+        assert set(failed.value.errors) == {bad_shard}
+        assert isinstance(failed.value.errors[bad_shard], TypeError)
+        assert set(failed.value.results) == set(service._shards) - {bad_shard}
+        applied = [
+            order_id for order_id in range(60) if service.ring.node_for(order_id) != bad_shard
+        ]
+        assert set(service.total_prices(applied).values()) == {60}
+
+    def test_unpicklable_request_sends_nothing(self, service, lines):
+        """Test that a request that cannot be sent leaves no answer behind in the pipes"""
+        with pytest.raises(TypeError):
+            service.add_items([(0, "Mouse", 1, 25), (1, threading.Lock(), 1, 30)])
+
+        service.add_items(lines)
+        assert set(service.total_prices(range(60)).values()) == {60}
+
+    def test_failed_move_keeps_orders(self, service, lines):
+        """Test that orders stay on their old shard until the new one has them"""
+        service.add_items(lines)
+        call = service._call
+
+        def failing_import(requests):
+            if any(request == "import" for request, _ in requests.values()):
+                raise OSError("import failed")
+            return call(requests)
+
+        service._call = failing_import
+        with pytest.raises(OSError):
+            service.add_worker()
+        service._call = call
+
+        assert sorted(service.order_ids()) == list(range(60))
+
+    def test_calls_during_rebalancing(self, service, lines):
+        """Test that calls made while workers come and go always find their orders"""
+        service.add_items(lines)
+        errors = []
+        done = threading.Event()
+
+        def read() -> None:
+            while not done.is_set():
+                try:
+                    assert set(service.total_prices(range(60)).values()) == {60}
+                except Exception as error:
+                    errors.append(error)
+                    return
+
+        reader = threading.Thread(target=read)
+        reader.start()
+        for _ in range(2):
+            service.add_worker()
+            service.remove_worker()
+        done.set()
+        reader.join()
+
+        assert errors == []
+
+    def test_adding_a_worker_rebalances(self, service, lines):
+        """Test that a new worker takes about a quarter of the orders"""
+        service.add_items(lines)
+        totals = service.total_prices(range(60))
+
+        moved = service.add_worker()
+
+        assert len(service) == 4
+        assert 0 < moved < 30
+        assert service.total_prices(range(60)) == totals
+
+    def test_removing_a_worker_rebalances(self, service, lines):
+        """Test that the orders of a removed worker move to the others"""
+        service.add_items(lines)
+        totals = service.total_prices(range(60))
+
+        service.remove_worker("shard-0")
+
+        assert len(service) == 2
+        assert service.total_prices(range(60)) == totals
+        with pytest.raises(ValueError):
+            service.remove_worker()
+            service.remove_worker()